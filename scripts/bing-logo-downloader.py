@@ -5,11 +5,19 @@ Bing Casino Logo Downloader 2025
 Downloads real casino logos using Bing Image Search for our 79 cleaned casino brands
 """
 
+import argparse
 import json
 import os
 import shutil
 from pathlib import Path
+import threading
 import time
+from functools import partial
+
+from logo_pipeline import (
+    BatchLogoScorer, CasinoScheduler, EncodingStage, LogoManifest, LogoPublisher, ResultStream,
+    add_incremental_arguments, add_publishing_arguments, add_scheduling_arguments, decode_logo, stream_path
+)
 
 # Import bing image downloader
 try:
@@ -26,8 +34,17 @@ class BingCasinoLogoDownloader:
         self.temp_dir = self.project_root / 'temp-bing-downloads'
         self.results_file = self.project_root / 'data' / 'bing-logo-results.json'
         
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(str(self.project_root / 'data' / 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, self.project_root / 'data' / 'casinos.json')
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'bing-logo-downloader')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        self.scorer = BatchLogoScorer()
+        
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'bing-logo-downloader', 'results')
         
         self.stats = {
             'total_casinos': 0,
@@ -37,6 +54,8 @@ class BingCasinoLogoDownloader:
             'logos_downloaded': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
     def load_casino_data(self):
         """Load our cleaned casino brand data"""
@@ -69,10 +88,11 @@ class BingCasinoLogoDownloader:
         print("\n🔍 Starting Bing Image Search for casino logos...")
         print("=" * 50)
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             print(f"\n[{i}/{len(self.casinos)}] Processing: {casino['brand']}")
             
-            self.stats['attempted'] += 1
+            with self.stats_lock:
+                self.stats['attempted'] += 1
             
             # Try multiple search queries for better results
             search_queries = self.build_search_queries(casino)
@@ -90,12 +110,9 @@ class BingCasinoLogoDownloader:
                                       force_replace=False,
                                       timeout=15)
                     
-                    # Process downloaded images
-                    if self.process_downloaded_images(casino, query):
+                    # Process downloaded images; the outcome is recorded once the logo is published
+                    if self.process_downloaded_images(casino, query, search_queries):
                         success = True
-                        self.stats['successful'] += 1
-                        self.stats['logos_downloaded'] += 1
-                        print(f"  ✅ Logo downloaded successfully!")
                         break
                         
                 except Exception as e:
@@ -106,17 +123,7 @@ class BingCasinoLogoDownloader:
                 time.sleep(1)
             
             if not success:
-                self.stats['failed'] += 1
-                print(f"  ❌ No suitable logo found for {casino['brand']}")
-                
-                # Add to results with failure info
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'status': 'failed',
-                    'searched_queries': search_queries,
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+                self.record_outcome(casino, None, queries=search_queries)
             
             # Progress report every 10 casinos
             if i % 10 == 0:
@@ -145,7 +152,41 @@ class BingCasinoLogoDownloader:
         
         return queries[:3]  # Limit to 3 queries per casino
     
-    def process_downloaded_images(self, casino, query):
+    def record_outcome(self, casino, path, query=None, original_file=None, file_size=None, queries=None):
+        """Record the published logo, or the casino's failure when path is None"""
+        if path:
+            with self.stats_lock:
+                self.stats['successful'] += 1
+                self.stats['logos_downloaded'] += 1
+            print(f"  ✅ Logo downloaded successfully!")
+            
+            # Add to results
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'success',
+                'search_query': query,
+                'logo_file': os.path.basename(path),
+                'original_file': original_file,
+                'file_size': file_size,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        else:
+            with self.stats_lock:
+                self.stats['failed'] += 1
+            self.manifest.record_failure(casino['slug'], 'bing-logo-downloader')
+            print(f"  ❌ No suitable logo found for {casino['brand']}")
+            
+            # Add to results with failure info
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'failed',
+                'searched_queries': queries,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+    
+    def process_downloaded_images(self, casino, query, search_queries=None):
         """Process and select the best downloaded image"""
         try:
             # Find the downloaded folder
@@ -173,27 +214,17 @@ class BingCasinoLogoDownloader:
             if not best_image:
                 return False
             
-            # Copy to our logos directory
-            destination = self.logos_dir / f"{casino['slug']}.png"
-            
-            # Convert to PNG if needed (using basic copy for now)
-            shutil.copy2(best_image, destination)
+            # Decode (RGBA, max 800px) and queue for PNG encoding into our logos directory
+            img = decode_logo(str(best_image), 800)
+            self.encoder.submit(casino['slug'], img, query, self.scorer.score_file(best_image),
+                                on_done=partial(self.record_outcome, casino, query=query,
+                                                original_file=str(best_image), file_size=best_image.stat().st_size,
+                                                queries=search_queries),
+                                optimize=True)
             
             # Clean up temp folder
             shutil.rmtree(query_folder, ignore_errors=True)
             
-            # Add to results
-            self.results.append({
-                'slug': casino['slug'],
-                'brand': casino['brand'],
-                'status': 'success',
-                'search_query': query,
-                'logo_file': f"{casino['slug']}.png",
-                'original_file': str(best_image),
-                'file_size': best_image.stat().st_size,
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
             return True
             
         except Exception as e:
@@ -221,15 +252,11 @@ class BingCasinoLogoDownloader:
     def save_results(self):
         """Save final results"""
         try:
-            final_results = {
+            self.results.finish({
                 'stats': self.stats,
-                'results': self.results,
                 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                 'total_runtime': time.time() - self.stats['start_time']
-            }
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(final_results, f, indent=2, ensure_ascii=False)
+            })
                 
             print(f"💾 Results saved to: {self.results_file}")
             
@@ -287,7 +314,15 @@ class BingCasinoLogoDownloader:
         print("4. Your casino portal now has real logos from Bing!")
 
 def main():
+    parser = argparse.ArgumentParser(description="Bing Casino Logo Downloader")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    args = parser.parse_args()
+    
     downloader_tool = BingCasinoLogoDownloader()
+    downloader_tool.encoder.configure(args)
+    downloader_tool.scheduler.configure(args)
     
     try:
         # Initialize
@@ -296,8 +331,15 @@ def main():
             
         downloader_tool.setup_directories()
         
-        # Download logos
-        downloader_tool.download_casino_logos()
+        if args.incremental:
+            downloader_tool.casinos = downloader_tool.manifest.pending(
+                downloader_tool.casinos, str(downloader_tool.logos_dir), args.max_age_days, args.min_score)
+            downloader_tool.stats['total_casinos'] = len(downloader_tool.casinos)
+        
+        # Download logos, with one manifest write for the whole run
+        with downloader_tool.manifest.batch():
+            downloader_tool.download_casino_logos()
+            downloader_tool.encoder.drain()
         
         # Generate report
         downloader_tool.generate_final_report()
@@ -311,6 +353,8 @@ def main():
     except Exception as e:
         print(f"\n💥 Fatal error: {e}")
     finally:
+        downloader_tool.encoder.close()
+        downloader_tool.results.close()
         downloader_tool.cleanup()
 
 if __name__ == '__main__':
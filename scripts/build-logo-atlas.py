@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+"""
+Logo Atlas Builder 2025
+Packs the homepage top-10 casino logos into sprite atlases with a coordinate map
+
+No front-end component reads src/data/logoAtlas.json yet; until the top-10
+cards render from it they keep requesting each {slug}.png.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+from logo_pipeline import (
+    LogoOptimizer, atomic_write, compose_atlas, decode_logo, file_digest, overall_rating, pack_shelves, read_header
+)
+
+ATLAS_VERSION = 1
+ATLAS_PREFIX = 'top-logos'
+
+class LogoAtlasBuilder:
+    def __init__(self, top=10, cell=128, max_size=1024, padding=2, byte_budget=60_000, max_error=2.0):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.project_root = os.path.dirname(script_dir)
+        self.casinos_file = os.path.join(self.project_root, 'data', 'casinos.json')
+        self.public_dir = os.path.join(self.project_root, 'public')
+        self.logos_dir = os.path.join(self.public_dir, 'images', 'casinos')
+        self.atlas_dir = os.path.join(self.public_dir, 'images', 'atlas')
+        self.map_file = os.path.join(self.project_root, 'src', 'data', 'logoAtlas.json')
+
+        # Cards show logos at 64px, cells are sized for 2x displays
+        self.top = top
+        self.cell = cell
+        self.max_size = max_size
+        self.padding = padding
+        self.optimizer = LogoOptimizer(byte_budget, max_error, webp=True)
+
+        self.casinos = []
+        self.members = []
+
+    def load_casinos(self):
+        """Load casinos in homepage ranking order"""
+        try:
+            with open(self.casinos_file, 'r', encoding='utf-8') as f:
+                casinos = json.load(f)
+
+            # Same ordering as HomeVM.getTopThree (stable, highest overall rating first)
+            self.casinos = sorted(casinos, key=lambda c: -overall_rating(c))[:self.top]
+            print(f"✅ Loaded top {len(self.casinos)} of {len(casinos)} casinos")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error loading casinos: {e}")
+            return False
+
+    def logo_file(self, casino):
+        """Local file behind the casino's logo.url, falling back to {slug}.png"""
+        url = (casino.get('logo') or {}).get('url', '')
+        if url.startswith('/'):
+            path = os.path.join(self.public_dir, *url.lstrip('/').split('/'))
+            if os.path.exists(path):
+                return path
+
+        path = os.path.join(self.logos_dir, f"{casino['slug']}.png")
+        return path if os.path.exists(path) else None
+
+    def collect_members(self):
+        """Ranked logos that exist locally, with the digest of each source file"""
+        self.members = []
+        for rank, casino in enumerate(self.casinos, 1):
+            path = self.logo_file(casino)
+            if not path:
+                print(f"    ⚠️  No local logo for {casino['slug']}, it keeps its own image")
+                continue
+            try:
+                read_header(path)
+            except Exception:
+                print(f"    ⚠️  Unreadable logo for {casino['slug']}, it keeps its own image")
+                continue
+            self.members.append({
+                'slug': casino['slug'],
+                'rank': rank,
+                'path': path,
+                'digest': file_digest(path)
+            })
+        return self.members
+
+    def build_params(self):
+        return {
+            'version': ATLAS_VERSION,
+            'top': self.top,
+            'cell': self.cell,
+            'maxSize': self.max_size,
+            'padding': self.padding,
+            'byteBudget': self.optimizer.byte_budget,
+            'maxError': self.optimizer.max_error
+        }
+
+    def is_up_to_date(self):
+        """True when the existing map was built from the same logos and settings"""
+        try:
+            with open(self.map_file, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if current.get('params') != self.build_params():
+            return False
+
+        built = [(slug, entry['digest']) for slug, entry in current.get('logos', {}).items()]
+        wanted = [(m['slug'], m['digest']) for m in self.members]
+        if sorted(built) != sorted(wanted):
+            return False
+
+        for atlas in current.get('atlases', []):
+            for url in (atlas['png'], atlas.get('webp')):
+                if url and not os.path.exists(os.path.join(self.public_dir, *url.lstrip('/').split('/'))):
+                    return False
+        return True
+
+    def write_atlas_file(self, page, data, ext):
+        """Write a content-hashed atlas image, returns its public URL"""
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        filename = f"{ATLAS_PREFIX}-{page}.{digest}.{ext}"
+        atomic_write(os.path.join(self.atlas_dir, filename), data)
+        return f"/images/atlas/{filename}"
+
+    def prune_atlas_files(self, keep):
+        """Remove atlas images no longer referenced by the map"""
+        for path in glob.glob(os.path.join(glob.escape(self.atlas_dir), f"{ATLAS_PREFIX}-*")):
+            if f"/images/atlas/{os.path.basename(path)}" not in keep:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def build(self):
+        """Pack, encode and publish the atlases and their coordinate map"""
+        images = [decode_logo(member['path'], self.cell) for member in self.members]
+        pages, placements = pack_shelves([img.size for img in images], self.max_size, self.max_size, self.padding)
+
+        os.makedirs(self.atlas_dir, exist_ok=True)
+        atlases = []
+        for page, size in enumerate(pages):
+            on_page = [i for i, placement in enumerate(placements) if placement[0] == page]
+            atlas = compose_atlas(size, [images[i] for i in on_page], [placements[i][1:] for i in on_page])
+            encoded = self.optimizer.encode(atlas, {'optimize': True})
+
+            entry = {
+                'png': self.write_atlas_file(page, encoded['png'], 'png'),
+                'width': size[0],
+                'height': size[1]
+            }
+            if encoded.get('webp'):
+                entry['webp'] = self.write_atlas_file(page, encoded['webp'], 'webp')
+            atlases.append(entry)
+            print(f"🧩 Atlas {page}: {size[0]}x{size[1]}, {len(on_page)} logos, "
+                  f"{len(encoded['png'])} bytes ({encoded['png_choice']})")
+
+        logos = {}
+        for member, img, (page, x, y) in zip(self.members, images, placements):
+            logos[member['slug']] = {
+                'rank': member['rank'],
+                'atlas': page,
+                'x': x,
+                'y': y,
+                'width': img.size[0],
+                'height': img.size[1],
+                'digest': member['digest']
+            }
+
+        atlas_map = {
+            'generated': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+            'params': self.build_params(),
+            'atlases': atlases,
+            'logos': logos
+        }
+        atomic_write(self.map_file, json.dumps(atlas_map, indent=2, ensure_ascii=False).encode('utf-8'))
+        self.prune_atlas_files({url for atlas in atlases for url in (atlas['png'], atlas.get('webp')) if url})
+        print(f"🗺️  Coordinate map: {os.path.relpath(self.map_file, self.project_root)}")
+
+    def run(self, force=False):
+        self.collect_members()
+        if not self.members:
+            print("❌ No local logos to pack")
+            return False
+
+        if not force and self.is_up_to_date():
+            print("✅ Atlas up to date, no member logo changed")
+            return True
+
+        self.build()
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Build sprite atlases for the homepage top casino logos")
+    parser.add_argument("--top", type=int, default=10, help="Number of top-ranked casinos to pack")
+    parser.add_argument("--cell", type=int, default=128, help="Maximum logo size in the atlas (2x the 64px card logo)")
+    parser.add_argument("--max-size", type=int, default=1024, help="Maximum atlas width and height before starting another")
+    parser.add_argument("--padding", type=int, default=2, help="Transparent pixels between logos")
+    parser.add_argument("--byte-budget", type=int, default=60_000, help="Target size per atlas image")
+    parser.add_argument("--max-error", type=float, default=2.0, help="Perceptual error ceiling (mean delta E)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if no member logo changed")
+    args = parser.parse_args()
+
+    builder = LogoAtlasBuilder(args.top, args.cell, args.max_size, args.padding, args.byte_budget, args.max_error)
+
+    print("🧩 LOGO ATLAS BUILDER 2025")
+    print("=" * 40)
+
+    try:
+        if not builder.load_casinos():
+            return
+        builder.run(args.force)
+
+    except KeyboardInterrupt:
+        print("\n⚠️  Atlas build interrupted")
+    except Exception as e:
+        print(f"\n💥 Atlas build error: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,33 @@ Casino Logo Generator 2025
 Creates professional placeholder logos and attempts to fetch real ones from known sources
 """
 
+import argparse
+import asyncio
 import json
 import os
 import requests
+import threading
 import time
-from PIL import Image, ImageDraw, ImageFont
-import io
 import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from logo_pipeline import (
+    BatchLogoScorer, BoundedImageReader, CasinoScheduler, Cassette, EncodingStage, HostThrottle, LogoManifest,
+    LogoPublisher, PlaceholderRenderer, ProbeCache, ResultStream, UrlProber, add_cassette_arguments,
+    add_incremental_arguments, add_publishing_arguments, add_scheduling_arguments, campaign_markets, decode_logo,
+    default_workers, read_header, read_image_stream, read_image_stream_async, render_placeholder, stable_index,
+    stream_path
+)
+
+# Fixed PNG encoder settings, so the same logo always encodes to the same bytes
+SAVE_OPTIONS = {'optimize': True}
 
 class CasinoLogoGenerator:
     def __init__(self):
@@ -20,16 +40,30 @@ class CasinoLogoGenerator:
         self.search_list_file = os.path.join(self.project_root, 'data', 'casino-search-list.json')
         self.logos_dir = os.path.join(self.project_root, 'public', 'images', 'casinos')
         self.results_file = os.path.join(self.project_root, 'data', 'logo-generator-results.json')
+        self.countries_file = os.path.join(self.project_root, 'data', 'countries.json')
+        
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(os.path.join(self.project_root, 'data', 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, os.path.join(self.project_root, 'data', 'casinos.json'))
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'casino-logo-generator')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        self.scorer = BatchLogoScorer()
         
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'casino-logo-generator', 'generation_results')
         self.stats = {
             'total': 0,
             'real_logos': 0,
             'generated_logos': 0,
+            'unchanged_placeholders': 0,
+            'kept_logos': 0,
             'failed': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
         # Known casino logo sources
         self.known_sources = {
@@ -52,6 +86,20 @@ class CasinoLogoGenerator:
             {'bg': '#1a237e', 'text': '#ffd700', 'accent': '#ffeb3b'},  # Blue Gold
         ]
         
+        # Placeholder drawing; fonts are loaded once and reused for every brand
+        self.placeholders = PlaceholderRenderer()
+        self.placeholder_format = 'png'
+        self.placeholders_only = False
+        
+        # Shared probing engine for guessed logo URLs, backed by the cross-run probe cache
+        self.probe_cache_file = os.path.join(self.project_root, 'data', 'logo-probe-cache.json')
+        self.prober = UrlProber(timeout=5, cache=ProbeCache(self.probe_cache_file))
+        
+        # Real logo downloads are streamed under these limits (see BoundedImageReader)
+        self.max_logo_bytes = 5 * 1024 * 1024  # 5MB max
+        self.min_logo_dimensions = (20, 20)
+        self.max_logo_dimensions = (3000, 3000)
+        
     def load_casinos(self):
         """Load casino data"""
         try:
@@ -64,6 +112,27 @@ class CasinoLogoGenerator:
             print(f"❌ Error loading casinos: {e}")
             return False
     
+    def load_market_casinos(self):
+        """Add every casinos.json brand listed on a country page of data/countries.json"""
+        try:
+            with open(self.countries_file, 'r', encoding='utf-8') as f:
+                markets = {country['code'] for country in json.load(f)['countries']}
+        except Exception as e:
+            print(f"⚠️  No market list ({e}), keeping the search list only")
+            return
+        
+        # Search-list entries already cover their casinos.json records
+        covered = {id(self.scheduler.record_for(casino)) for casino in self.casinos}
+        added = 0
+        for record in self.scheduler.records:
+            if id(record) in covered or not campaign_markets(record, markets):
+                continue
+            self.casinos.append({'slug': record['slug'], 'brand': record['brand'], 'url': record.get('url', '')})
+            added += 1
+        
+        self.stats['total'] = len(self.casinos)
+        print(f"🌍 {len(markets)} markets: {added} more brands from casinos.json, {self.stats['total']} in total")
+    
     def setup_dirs(self):
         """Setup directories"""
         try:
@@ -76,18 +145,46 @@ class CasinoLogoGenerator:
     
     def try_fetch_real_logo(self, casino):
         """Try to fetch real logo from known sources"""
-        brand_lower = casino['brand'].lower().replace(' ', '')
-        
         # Check known sources
-        for key, url in self.known_sources.items():
-            if key in brand_lower:
-                try:
-                    print(f"    🎯 Trying known source: {url}")
-                    response = requests.get(url, timeout=10)
-                    if response.status_code == 200:
-                        return self.process_real_logo(response.content)
-                except:
+        for url in self.known_logo_urls(casino):
+            try:
+                print(f"    🎯 Trying known source: {url}")
+                response = requests.get(url, timeout=10, stream=True)
+                if response.status_code != 200:
+                    response.close()
                     continue
+                data = read_image_stream(response, self.new_logo_reader())
+                if data:
+                    return self.process_real_logo(data)
+            except:
+                continue
+        
+        # Probe everything at once; paths on unresolvable domains are dropped up front
+        for url in self.prober.find_images(self.guessed_logo_urls(casino)):
+            try:
+                print(f"    🎯 Real logo found: {url}")
+                full_response = self.prober.session.get(url, timeout=10, stream=True)
+                data = read_image_stream(full_response, self.new_logo_reader())
+                logo = self.process_real_logo(data) if data else None
+                if logo:
+                    return logo
+            except:
+                continue
+        
+        return None
+    
+    def new_logo_reader(self):
+        """Bounded reader enforcing the real logo size and dimension limits"""
+        return BoundedImageReader(self.max_logo_bytes, self.min_logo_dimensions, self.max_logo_dimensions)
+    
+    def known_logo_urls(self, casino):
+        """Known logo sources matching the brand"""
+        brand_lower = casino['brand'].lower().replace(' ', '')
+        return [url for key, url in self.known_sources.items() if key in brand_lower]
+    
+    def guessed_logo_urls(self, casino):
+        """Common logo paths on the domains the brand name suggests"""
+        brand_lower = casino['brand'].lower().replace(' ', '')
         
         # Try common URL patterns
         domain_variations = [
@@ -104,193 +201,143 @@ class CasinoLogoGenerator:
             "/favicon.ico"
         ]
         
-        for domain in domain_variations:
-            for path in logo_paths:
-                try:
-                    url = f"https://{domain}{path}"
-                    response = requests.head(url, timeout=5)
-                    if response.status_code == 200:
-                        content_type = response.headers.get('content-type', '').lower()
-                        if content_type.startswith('image/'):
-                            print(f"    🎯 Real logo found: {url}")
-                            full_response = requests.get(url, timeout=10)
-                            return self.process_real_logo(full_response.content)
-                except:
-                    continue
-        
-        return None
+        return [f"https://{domain}{path}" for domain in domain_variations for path in logo_paths]
     
     def process_real_logo(self, image_data):
         """Process real logo data"""
         try:
-            img = Image.open(io.BytesIO(image_data))
-            
-            # Validate dimensions
-            width, height = img.size
+            # Validate dimensions from the header before decoding anything
+            width, height, _ = read_header(image_data)
             if width < 20 or height < 20:
                 return None
             
-            # Convert to RGBA
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Resize if needed
-            if width > 400 or height > 400:
-                img.thumbnail((400, 400), Image.Resampling.LANCZOS)
-            
-            return img
+            # Decode only as large as the 400px logo needs (RGBA)
+            return decode_logo(image_data, 400)
             
         except:
             return None
     
-    def generate_professional_logo(self, casino):
+    def placeholder_colors(self, casino):
+        """Color scheme for a brand's placeholder, the same on every run"""
+        return self.color_schemes[stable_index(casino['brand'], len(self.color_schemes))]
+    
+    def placeholder_fingerprint(self, casino, colors):
+        """Digest of the placeholder's inputs, stored in the manifest to skip unchanged re-renders"""
+        encoding = None
+        if self.placeholder_format == 'png':
+            optimizer = self.encoder.optimizer
+            encoding = {'save_options': SAVE_OPTIONS, 'optimizer': vars(optimizer) if optimizer else None}
+        return self.placeholders.fingerprint(casino['brand'], colors, self.placeholder_format, encoding)
+    
+    def generate_professional_logo(self, casino, colors=None):
         """Generate professional-looking logo"""
         try:
-            brand = casino['brand']
-            
-            # Choose color scheme based on brand name hash
-            color_index = hash(brand) % len(self.color_schemes)
-            colors = self.color_schemes[color_index]
-            
-            # Create image
-            width, height = 300, 100
-            img = Image.new('RGBA', (width, height), (255, 255, 255, 0))
-            draw = ImageDraw.Draw(img)
-            
-            # Background with rounded corners effect
-            margin = 5
-            bg_color = colors['bg']
-            draw.rectangle([margin, margin, width-margin, height-margin], 
-                          fill=bg_color, outline=colors['accent'], width=2)
-            
-            # Try to use a better font (fallback to default if not available)
-            try:
-                # Try to find system fonts
-                font_size = 24
-                if len(brand) > 10:
-                    font_size = 20
-                elif len(brand) > 15:
-                    font_size = 18
-                
-                # Try common Windows fonts
-                font_paths = [
-                    "C:/Windows/Fonts/arial.ttf",
-                    "C:/Windows/Fonts/calibri.ttf",
-                    "C:/Windows/Fonts/tahoma.ttf"
-                ]
-                
-                font = None
-                for font_path in font_paths:
-                    if os.path.exists(font_path):
-                        font = ImageFont.truetype(font_path, font_size)
-                        break
-                
-                if not font:
-                    font = ImageFont.load_default()
-                    
-            except:
-                font = ImageFont.load_default()
-            
-            # Calculate text position for centering
-            text_bbox = draw.textbbox((0, 0), brand, font=font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            
-            x = (width - text_width) // 2
-            y = (height - text_height) // 2
-            
-            # Add shadow effect
-            shadow_offset = 2
-            draw.text((x + shadow_offset, y + shadow_offset), brand, 
-                     fill=(0, 0, 0, 128), font=font)
-            
-            # Main text
-            draw.text((x, y), brand, fill=colors['text'], font=font)
-            
-            # Add decorative elements
-            accent_color = colors['accent']
-            
-            # Left accent line
-            draw.rectangle([margin+5, margin+5, margin+8, height-margin-5], 
-                          fill=accent_color)
-            
-            # Right accent line  
-            draw.rectangle([width-margin-8, margin+5, width-margin-5, height-margin-5], 
-                          fill=accent_color)
-            
-            # Small decorative dots
-            dot_size = 3
-            draw.ellipse([margin+15, margin+height//2-dot_size//2, 
-                         margin+15+dot_size, margin+height//2+dot_size//2], 
-                        fill=accent_color)
-            
-            draw.ellipse([width-margin-15-dot_size, margin+height//2-dot_size//2, 
-                         width-margin-15, margin+height//2+dot_size//2], 
-                        fill=accent_color)
-            
-            return img
+            return self.placeholders.png(casino['brand'], colors or self.placeholder_colors(casino))
             
         except Exception as e:
             print(f"    ⚠️ Logo generation error: {e}")
             return None
     
-    def save_logo(self, casino, img, is_real=False):
-        """Save logo to file"""
+    def save_png_placeholder(self, casino, colors, fingerprint):
+        """Queue the rasterized placeholder, recorded once published; it scores 0 so incremental runs retry it"""
+        generated_logo = self.generate_professional_logo(casino, colors)
+        if generated_logo and self.save_logo(casino, generated_logo, is_real=False, score=0,
+                                             details={'placeholder': fingerprint},
+                                             on_done=partial(self.record_published_placeholder, casino)):
+            return True
+        return self.record_placeholder(casino, None)
+    
+    def publish_svg_placeholder(self, casino, colors, fingerprint):
+        """Publish the placeholder as {slug}.svg and point logo.url at it"""
         try:
-            dest_path = os.path.join(self.logos_dir, f"{casino['slug']}.png")
-            img.save(dest_path, 'PNG', optimize=True)
+            svg = self.placeholders.svg(casino['brand'], colors)
+            path = self.publisher.publish(casino['slug'], svg, ext='svg')
+            self.publisher.update_casino_url(casino['slug'], f"/images/casinos/{os.path.basename(path)}")
+            self.manifest.record(casino['slug'], path, 'generated', 0, 'casino-logo-generator',
+                                 placeholder=fingerprint)
+            return os.path.basename(path)
             
-            file_size = os.path.getsize(dest_path)
-            logo_type = "REAL" if is_real else "GENERATED"
-            print(f"    💾 {logo_type} LOGO SAVED: {casino['slug']}.png ({file_size} bytes)")
+        except Exception as e:
+            print(f"    ❌ Save error: {e}")
+            return None
+    
+    def save_logo(self, casino, img, is_real=False, score=0, details=None, on_done=None):
+        """Queue logo for encoding and publishing"""
+        try:
+            source = 'real' if is_real else 'generated'
+            self.encoder.submit(casino['slug'], img, source, score, details, on_done, **SAVE_OPTIONS)
             return True
             
         except Exception as e:
             print(f"    ❌ Save error: {e}")
             return False
     
-    def process_casino_logo(self, casino, index, total):
-        """Process a single casino logo"""
-        print(f"\n[{index}/{total}] 🏭 Processing: {casino['brand']}")
+    def record_real_logo(self, casino, real_logo):
+        """Queue a fetched real logo, recorded once published; False if it couldn't be queued"""
+        return self.save_logo(casino, real_logo, is_real=True, score=self.scorer.score_one(*real_logo.size, fmt='png'),
+                              on_done=partial(self.record_published_real_logo, casino))
+    
+    def record_published_real_logo(self, casino, path):
+        """Record a published real logo, or the casino's failure when encoding it failed"""
+        if not path:
+            self.record_placeholder(casino, None)
+            return
         
-        # Step 1: Try to fetch real logo
-        real_logo = self.try_fetch_real_logo(casino)
+        with self.stats_lock:
+            self.stats['real_logos'] += 1
         
-        if real_logo:
-            if self.save_logo(casino, real_logo, is_real=True):
-                self.stats['real_logos'] += 1
-                
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'type': 'REAL_LOGO',
-                    'file': f"{casino['slug']}.png",
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
-                print(f"    🏆 REAL LOGO SUCCESS: {casino['brand']}")
-                return True
-        
-        # Step 2: Generate professional logo
-        generated_logo = self.generate_professional_logo(casino)
+        self.results.append({
+            'slug': casino['slug'],
+            'brand': casino['brand'],
+            'type': 'REAL_LOGO',
+            'file': os.path.basename(path),
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        })
         
-        if generated_logo:
-            if self.save_logo(casino, generated_logo, is_real=False):
+        print(f"    🏆 REAL LOGO SUCCESS: {casino['brand']}")
+    
+    def record_published_placeholder(self, casino, path):
+        self.record_placeholder(casino, os.path.basename(path) if path else None)
+    
+    def keeps_real_logo(self, casino):
+        """True (and counted) if the casino already shows a real logo, which a placeholder must not replace"""
+        if self.scheduler.logo_state(casino, self.scheduler.record_for(casino)) != 'ok':
+            return False
+        with self.stats_lock:
+            self.stats['kept_logos'] += 1
+        print(f"    🛡️  Keeping existing logo: {casino['brand']}")
+        return True
+    
+    def placeholder_unchanged(self, casino, fingerprint):
+        """True (and counted) if the published placeholder was made from the same inputs"""
+        if not self.manifest.unchanged(casino['slug'], self.logos_dir, source='generated', placeholder=fingerprint):
+            return False
+        with self.stats_lock:
+            self.stats['unchanged_placeholders'] += 1
+        print(f"    ♻️  Placeholder unchanged: {casino['brand']}")
+        return True
+    
+    def record_placeholder(self, casino, generated_file):
+        """Record a generated placeholder, or the casino's failure when there is none"""
+        if generated_file:
+            with self.stats_lock:
                 self.stats['generated_logos'] += 1
-                
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'type': 'GENERATED_LOGO',
-                    'file': f"{casino['slug']}.png",
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
-                print(f"    ✨ PROFESSIONAL LOGO GENERATED: {casino['brand']}")
-                return True
+            
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'type': 'GENERATED_LOGO',
+                'file': generated_file,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            
+            print(f"    ✨ PROFESSIONAL LOGO GENERATED: {casino['brand']}")
+            return True
         
         # Failed completely
-        self.stats['failed'] += 1
+        with self.stats_lock:
+            self.stats['failed'] += 1
+        self.manifest.record_failure(casino['slug'], 'casino-logo-generator')
         print(f"    ❌ LOGO FAILED: {casino['brand']}")
         
         self.results.append({
@@ -302,6 +349,29 @@ class CasinoLogoGenerator:
         
         return False
     
+    def process_casino_logo(self, casino, index, total):
+        """Process a single casino logo"""
+        print(f"\n[{index}/{total}] 🏭 Processing: {casino['brand']}")
+        
+        # Step 1: Try to fetch real logo
+        real_logo = None if self.placeholders_only else self.try_fetch_real_logo(casino)
+        
+        if real_logo and self.record_real_logo(casino, real_logo):
+            return True
+        
+        # Step 2: Generate professional logo, unless a real one is published or the placeholder is unchanged
+        if self.keeps_real_logo(casino):
+            return True
+        
+        colors = self.placeholder_colors(casino)
+        fingerprint = self.placeholder_fingerprint(casino, colors)
+        if self.placeholder_unchanged(casino, fingerprint):
+            return True
+        
+        if self.placeholder_format == 'svg':
+            return self.record_placeholder(casino, self.publish_svg_placeholder(casino, colors, fingerprint))
+        return self.save_png_placeholder(casino, colors, fingerprint)
+    
     def run_logo_generation(self):
         """Run the complete logo generation process"""
         print("🏭 STARTING CASINO LOGO GENERATION")
@@ -309,15 +379,130 @@ class CasinoLogoGenerator:
         print("Strategy: Real logos first, then professional generated logos")
         print()
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             self.process_casino_logo(casino, i, len(self.casinos))
             
             # Progress report every 10 casinos
             if i % 10 == 0:
                 self.print_progress(i)
             
-            # Small delay for rate limiting
-            time.sleep(0.5)
+            # Small delay for rate limiting (placeholder-only runs make no requests)
+            if not self.placeholders_only:
+                time.sleep(0.5)
+    
+    async def async_fetch(self, session, throttle, url):
+        """Body of a 200 response, streamed under the logo limits, or None"""
+        try:
+            async with throttle.slot(url):
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status != 200:
+                        return None
+                    return await read_image_stream_async(response, self.new_logo_reader())
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+    
+    async def async_fetch_real_logo(self, session, throttle, casino):
+        """try_fetch_real_logo without blocking: every guessed URL of the brand is probed at once"""
+        for url in self.known_logo_urls(casino):
+            print(f"    🎯 Trying known source: {url}")
+            data = await self.async_fetch(session, throttle, url)
+            if data:
+                return await asyncio.to_thread(self.process_real_logo, data)
+        
+        # Lookups run on the prober's DNS executor, never the loop's default one
+        hits = await self.prober.find_images_async(session, throttle, self.guessed_logo_urls(casino))
+        for url in hits:
+            print(f"    🎯 Real logo found: {url}")
+            data = await self.async_fetch(session, throttle, url)
+            logo = await asyncio.to_thread(self.process_real_logo, data) if data else None
+            if logo:
+                return logo
+        
+        return None
+    
+    async def async_render_png_placeholder(self, render_pool, casino, colors, fingerprint):
+        """Render and encode the PNG placeholder on the process pool, then publish it"""
+        try:
+            encoded = await asyncio.get_running_loop().run_in_executor(
+                render_pool, render_placeholder, casino['brand'], colors, 'png', SAVE_OPTIONS, self.encoder.optimizer)
+        except Exception as e:
+            print(f"    ⚠️ Logo generation error: {e}")
+            return None
+        path = await asyncio.to_thread(self.encoder.publish, casino['slug'], encoded, 'generated', 0,
+                                       {'placeholder': fingerprint})
+        return os.path.basename(path) if path else None
+    
+    async def async_process_casino_logo(self, session, throttle, render_pool, casino, index, total):
+        """process_casino_logo with network probes on the event loop and rendering on the process pool"""
+        print(f"\n[{index}/{total}] 🏭 Processing: {casino['brand']}")
+        
+        if session is not None:
+            real_logo = await self.async_fetch_real_logo(session, throttle, casino)
+            if real_logo and await asyncio.to_thread(self.record_real_logo, casino, real_logo):
+                return True
+        
+        if await asyncio.to_thread(self.keeps_real_logo, casino):
+            return True
+        
+        colors = self.placeholder_colors(casino)
+        fingerprint = self.placeholder_fingerprint(casino, colors)
+        if await asyncio.to_thread(self.placeholder_unchanged, casino, fingerprint):
+            return True
+        
+        if self.placeholder_format == 'svg':
+            generated_file = await asyncio.to_thread(self.publish_svg_placeholder, casino, colors, fingerprint)
+        else:
+            generated_file = await self.async_render_png_placeholder(render_pool, casino, colors, fingerprint)
+        
+        return await asyncio.to_thread(self.record_placeholder, casino, generated_file)
+    
+    async def async_logo_generation(self, concurrency, per_host, render_pool):
+        """Keep `concurrency` casinos in flight; placeholder-only runs open no HTTP session"""
+        throttle = HostThrottle(per_host=per_host)
+        total = len(self.casinos)
+        # Workers take the most urgent casino left whenever they free up
+        queue = enumerate(self.scheduler.queue(self.casinos), 1)
+        completed = 0
+        
+        async def worker(session):
+            nonlocal completed
+            for index, casino in queue:
+                try:
+                    await self.async_process_casino_logo(session, throttle, render_pool, casino, index, total)
+                except Exception as e:
+                    print(f"    ❌ Generation error for {casino['brand']}: {e}")
+                
+                completed += 1
+                if completed % 10 == 0:
+                    self.print_progress(completed)
+        
+        if self.placeholders_only:
+            await asyncio.gather(*(worker(None) for _ in range(concurrency)))
+            return
+        
+        connector = aiohttp.TCPConnector(limit=concurrency * 4, limit_per_host=per_host, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, headers=self.prober.headers) as session:
+            await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    
+    def run_parallel_generation(self, concurrency=16, per_host=2, render_workers=None):
+        """Run logo generation with async probing and placeholders rendered on every core"""
+        if not self.placeholders_only and not AIOHTTP_AVAILABLE:
+            print("❌ aiohttp not installed. Run: pip install aiohttp")
+            return
+        
+        render_workers = render_workers or default_workers()
+        print("🏭 STARTING PARALLEL CASINO LOGO GENERATION")
+        print("=" * 45)
+        print(f"⚡ Concurrency: {concurrency} casinos | {per_host} requests per host | {render_workers} render workers")
+        print()
+        
+        render_pool = ProcessPoolExecutor(max_workers=render_workers) if self.placeholder_format == 'png' else None
+        try:
+            asyncio.run(self.async_logo_generation(concurrency, per_host, render_pool))
+            self.encoder.drain()
+        finally:
+            if render_pool:
+                render_pool.shutdown()
     
     def print_progress(self, current):
         """Print current progress"""
@@ -332,14 +517,16 @@ class CasinoLogoGenerator:
         print(f"⏱️  Time: {duration // 60}m {duration % 60}s")
         
         if current > 0:
-            success_rate = ((self.stats['real_logos'] + self.stats['generated_logos']) / current) * 100
+            success_rate = ((self.stats['real_logos'] + self.stats['generated_logos'] +
+                             self.stats['unchanged_placeholders'] + self.stats['kept_logos']) / current) * 100
             print(f"📈 Success Rate: {success_rate:.1f}%")
         print()
     
     def generate_final_report(self):
         """Generate final report"""
         duration = int(time.time() - self.stats['start_time'])
-        total_success = self.stats['real_logos'] + self.stats['generated_logos']
+        total_success = (self.stats['real_logos'] + self.stats['generated_logos'] +
+                         self.stats['unchanged_placeholders'] + self.stats['kept_logos'])
         success_rate = (total_success / self.stats['total']) * 100 if self.stats['total'] > 0 else 0
         
         print("\n🏆 CASINO LOGO GENERATION COMPLETE!")
@@ -348,6 +535,8 @@ class CasinoLogoGenerator:
         print(f"🎰 Total Casinos: {self.stats['total']}")
         print(f"🎯 Real Logos Found: {self.stats['real_logos']}")
         print(f"✨ Professional Logos Generated: {self.stats['generated_logos']}")
+        print(f"♻️  Placeholders Unchanged: {self.stats['unchanged_placeholders']}")
+        print(f"🛡️  Existing Logos Kept: {self.stats['kept_logos']}")
         print(f"❌ Failed: {self.stats['failed']}")
         print(f"📈 Overall Success Rate: {success_rate:.1f}%")
         
@@ -380,9 +569,8 @@ class CasinoLogoGenerator:
         
         # Save results
         try:
-            final_results = {
+            self.results.finish({
                 'generation_stats': self.stats,
-                'generation_results': self.results,
                 'session_info': {
                     'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                     'duration': duration,
@@ -390,10 +578,7 @@ class CasinoLogoGenerator:
                     'success_rate': success_rate,
                     'strategy': 'Real logos first, professional generated fallback'
                 }
-            }
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(final_results, f, indent=2, ensure_ascii=False)
+            })
             
             print(f"💾 Results saved: {os.path.basename(self.results_file)}")
             
@@ -401,7 +586,32 @@ class CasinoLogoGenerator:
             print(f"⚠️  Save error: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Casino Logo Generator")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    add_cassette_arguments(parser)
+    parser.add_argument("--placeholder-format", choices=('png', 'svg'), default='png',
+                        help="Publish placeholders as rasterized PNG or as {slug}.svg referenced from logo.url")
+    parser.add_argument("--placeholders-only", action="store_true",
+                        help="Skip real logo fetching and only generate placeholders")
+    parser.add_argument("--all-markets", action="store_true",
+                        help="Also cover every casinos.json brand whose campaign targets a data/countries.json market")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Probe many casinos concurrently and render placeholders on a process pool "
+                             "(probing requires aiohttp)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Casinos in flight at once in parallel mode")
+    parser.add_argument("--per-host", type=int, default=2, help="Max in-flight requests per host in parallel mode")
+    parser.add_argument("--render-workers", type=int,
+                        help="Placeholder render processes in parallel mode (default: one per core but one)")
+    args = parser.parse_args()
+    
     generator = CasinoLogoGenerator()
+    generator.encoder.configure(args)
+    generator.placeholder_format = args.placeholder_format
+    generator.placeholders_only = args.placeholders_only
+    generator.scheduler.configure(args)
+    cassette = Cassette.from_args(args, generator)
     
     try:
         if not generator.load_casinos():
@@ -410,7 +620,20 @@ def main():
         if not generator.setup_dirs():
             return
         
-        generator.run_logo_generation()
+        if args.all_markets:
+            generator.load_market_casinos()
+        
+        if args.incremental:
+            generator.casinos = generator.manifest.pending(generator.casinos, generator.logos_dir, args.max_age_days, args.min_score)
+            generator.stats['total'] = len(generator.casinos)
+        
+        # One manifest write for the whole run instead of one per casino
+        with generator.manifest.batch():
+            if args.parallel:
+                generator.run_parallel_generation(args.concurrency, args.per_host, args.render_workers)
+            else:
+                generator.run_logo_generation()
+            generator.encoder.drain()
         generator.generate_final_report()
         
     except KeyboardInterrupt:
@@ -420,6 +643,12 @@ def main():
         print(f"\n💥 Generation error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        generator.encoder.close()
+        generator.results.close()
+        generator.prober.close()
+        if cassette:
+            cassette.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
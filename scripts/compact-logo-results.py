@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Logo Results Compactor 2025
+Rebuilds a finder's summary JSON from its append-only JSONL result stream
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+from logo_pipeline import iter_run, read_runs, run_info, write_summary
+
+def list_runs(path):
+    """Print every run in the stream"""
+    for run_id in read_runs(path):
+        header, summary = run_info(path, run_id)
+        records = sum(1 for _ in iter_run(path, run_id))
+        state = "finished" if summary is not None else "incomplete"
+        print(f"  {run_id}  {header['finder']:<26} {header['started']}  {records:4d} results  ({state})")
+
+def recovered_sections(path, header):
+    """Summary sections for a run that crashed before writing its own"""
+    outcomes = Counter()
+    total = 0
+    for record in iter_run(path, header['id']):
+        total += 1
+        outcomes[record.get('status') or record.get('type') or 'unknown'] += 1
+
+    return {
+        'stats': {'total': total, 'outcomes': dict(outcomes)},
+        'session_info': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'finder': header['finder'],
+            'started': header['started'],
+            'run': header['id'],
+            'recovered': True
+        }
+    }
+
+def compact(path, run_id=None, output=None):
+    runs = read_runs(path)
+    if not runs:
+        print(f"❌ No runs in {os.path.basename(path)}")
+        return False
+
+    run_id = run_id or runs[-1]
+    if run_id not in runs:
+        print(f"❌ Unknown run {run_id}")
+        return False
+
+    header, sections = run_info(path, run_id)
+    if sections is None:
+        print(f"⚠️  Run {run_id} did not finish, recovering its results")
+        sections = recovered_sections(path, header)
+
+    output = output or f"{os.path.splitext(path)[0]}.json"
+    count = write_summary(output, sections, header['results_key'], iter_run(path, run_id))
+    print(f"💾 {count} results from run {run_id} written to {os.path.basename(output)}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild a finder's summary JSON from its JSONL result stream")
+    parser.add_argument("stream", help="Result stream, e.g. data/smart-hunter-results.jsonl")
+    parser.add_argument("--run", help="Run id to compact (default: the last run)")
+    parser.add_argument("--output", help="Summary file to write (default: the stream path with .json)")
+    parser.add_argument("--list", action="store_true", help="List the runs in the stream and exit")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.stream):
+        print(f"❌ Stream not found: {args.stream}")
+        sys.exit(1)
+
+    if args.list:
+        print(f"📜 Runs in {os.path.basename(args.stream)}:")
+        list_runs(args.stream)
+        return
+
+    if not compact(args.stream, args.run, args.output):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
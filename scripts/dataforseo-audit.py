@@ -6,12 +6,208 @@ Uses Context7 documentation for DataForSEO API v3
 """
 
 import requests
+import asyncio
 import json
+import random
+import secrets
+import threading
 import time
 import os
+from concurrent.futures import Future, TimeoutError as FutureTimeout, wait
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Dict, List, Any, Optional
+from urllib.parse import parse_qs, urlsplit
 import base64
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# HTTP statuses worth retrying; server errors only for GET, since a POST may already have been accepted
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# DataForSEO reports some rate limits as a 200 whose body carries one of these status codes
+RATE_LIMIT_CODES = {40202, 40209}
+
+def poll_intervals(first: float = 5.0, factor: float = 1.5, cap: float = 30.0):
+    """Polling delays that start fast and back off to `cap` seconds"""
+    delay = first
+    while True:
+        yield delay
+        delay = min(cap, delay * factor)
+
+class PingbackReceiver:
+    """
+    Local HTTP endpoint DataForSEO calls back when a task completes.
+    
+    DataForSEO sends a GET to pingback_url with $id replaced by the task
+    ID. The URL carries a random token, so only callbacks for this run
+    count; each one is handed to the subscribed callbacks. Results are
+    still fetched with task_get, so no postback_url is registered. public_url is the base address
+    DataForSEO can reach: a public host, or a tunnel that forwards to the
+    local port.
+    """
+    
+    PATH = "/dataforseo"
+    
+    def __init__(self, public_url: str, port: int = 8765, host: str = "0.0.0.0"):
+        self.public_url = public_url.rstrip('/')
+        self.token = secrets.token_urlsafe(16)
+        self._subscribers = []
+        
+        receiver = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+            
+            def _reply(self, code: int):
+                self.send_response(code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                task_ids = parse_qs(parts.query).get("id", [])
+                if parts.path != f"{receiver.PATH}/{receiver.token}/pingback" or not task_ids:
+                    return self._reply(404)
+                for task_id in task_ids:
+                    receiver.notify(task_id)
+                self._reply(200)
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"📡 Listening for DataForSEO callbacks on port {self.server.server_address[1]}")
+    
+    @property
+    def pingback_url(self) -> str:
+        return f"{self.public_url}{self.PATH}/{self.token}/pingback?id=$id&tag=$tag"
+    
+    def subscribe(self, callback):
+        """Call callback(task_id) for every task DataForSEO reports complete"""
+        self._subscribers.append(callback)
+    
+    def notify(self, task_id: str):
+        for callback in self._subscribers:
+            callback(task_id)
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+# tasks_ready endpoint for each kind of task the auditor posts
+READY_ENDPOINTS = {
+    "on_page": "/on_page/tasks_ready",
+    "lighthouse": "/on_page/lighthouse/tasks_ready",
+}
+
+def ready_task_ids(result: Dict) -> set:
+    """IDs a tasks_ready response lists as complete (tasks[].result[].id; tasks[].id is the request's own)"""
+    ids = set()
+    for task in result.get("tasks") or []:
+        for ready in task.get("result") or []:
+            if ready.get("id"):
+                ids.add(ready["id"])
+    return ids
+
+class TaskWaiter:
+    """
+    Waits on any number of outstanding on-page and Lighthouse tasks at once.
+    
+    track() returns a Future per task. One background thread polls with a
+    single tasks_ready call per task kind each tick, however many tasks are
+    outstanding, and resolves every tracked task the response lists. Ticks
+    follow poll_intervals(); with a pingback receiver its callbacks resolve
+    futures directly and the thread only polls every `safety_poll` seconds.
+    The thread stops when nothing is outstanding.
+    """
+    
+    def __init__(self, request, pingback: Optional[PingbackReceiver] = None, safety_poll: float = 60.0):
+        self.request = request
+        self.pingback = pingback
+        self.safety_poll = safety_poll
+        self.stats = {"polls": 0, "resolved": 0}
+        self._pending = {}
+        # Tasks already seen complete, so tracking one again resolves at once
+        self._completed = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        if pingback:
+            pingback.subscribe(self.resolve)
+    
+    def track(self, task_id: str, kind: str = "on_page") -> Future:
+        """Future resolved with "tasks_ready" or "pingback" once the task is complete"""
+        with self._lock:
+            if task_id in self._completed:
+                future = Future()
+                future.set_result(self._completed[task_id])
+                return future
+            if task_id not in self._pending:
+                self._pending[task_id] = (kind, Future())
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+            return self._pending[task_id][1]
+    
+    def resolve(self, task_id: str, how: str = "pingback"):
+        """Complete a task; pingbacks carry this run's token, so they are kept even before track()"""
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+            # A pingback can beat track() for a task just posted
+            self._completed.setdefault(task_id, how)
+            if entry:
+                self.stats["resolved"] += 1
+        if entry:
+            entry[1].set_result(how)
+    
+    def forget(self, task_id: str):
+        """Stop waiting on a task"""
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+        if entry:
+            entry[1].cancel()
+    
+    def poll(self):
+        """One tick: one tasks_ready call for each kind with outstanding tasks"""
+        with self._lock:
+            kinds = sorted({kind for kind, _ in self._pending.values()})
+        for kind in kinds:
+            result = self.request(READY_ENDPOINTS[kind])
+            self.stats["polls"] += 1
+            if "error" in result:
+                continue
+            # tasks_ready lists the whole account's tasks; only this run's outstanding ones count
+            with self._lock:
+                ready = [task_id for task_id in ready_task_ids(result) if task_id in self._pending]
+            for task_id in ready:
+                self.resolve(task_id, "tasks_ready")
+    
+    def _run(self):
+        intervals = poll_intervals()
+        while not self._closed.is_set():
+            self.poll()
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                outstanding = len(self._pending)
+            
+            delay = self.safety_poll if self.pingback else next(intervals)
+            print(f"⏳ {outstanding} task(s) still processing... (checking again in {delay:.0f}s)")
+            self._closed.wait(delay)
+    
+    def close(self):
+        """Stop polling and cancel whatever is still outstanding"""
+        self._closed.set()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for _, future in pending.values():
+            future.cancel()
 
 class DataForSEOAuditor:
     """
@@ -19,13 +215,26 @@ class DataForSEOAuditor:
     Based on Context7 documentation
     """
     
-    def __init__(self, api_login: str, api_password: str, base_url: str = "http://localhost:3000"):
+    def __init__(self, api_login: str, api_password: str, base_url: str = "http://localhost:3000",
+                 timeout: tuple = (10, 120), max_retries: int = 4, backoff: float = 1.0, max_backoff: float = 30.0,
+                 pingback: Optional[PingbackReceiver] = None, safety_poll: float = 60.0):
         self.api_login = api_login
         self.api_password = api_password
         self.base_url = base_url.rstrip('/')
         self.api_endpoint = "https://api.dataforseo.com/v3"
         self.auth_header = self._create_auth_header()
+        # (connect, read) seconds, so a hung request fails instead of blocking the audit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = self._create_session()
+        # Completion callbacks; without them the waiter polls on a backoff schedule
+        self.pingback = pingback
+        self.waiter = TaskWaiter(self._make_api_request, pingback, safety_poll)
         self.audit_results = {}
+        # Responses fetched ahead by collect_on_page_data_async, keyed by endpoint
+        self._prefetched = {}
         
     def _create_auth_header(self) -> str:
         """Create Basic Auth header for DataForSEO API"""
@@ -33,25 +242,81 @@ class DataForSEOAuditor:
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
         return f"Basic {encoded_credentials}"
     
+    def _request_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": self.auth_header,
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate"
+        }
+    
+    def _create_session(self) -> requests.Session:
+        """Keep-alive session shared by every API call"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self._request_headers())
+        return session
+    
+    def _should_retry(self, method: str, status: int, body: Any) -> bool:
+        """Rate limits are always retried; server errors only when retrying can't repeat a POST"""
+        if status == 429 or (isinstance(body, dict) and body.get("status_code") in RATE_LIMIT_CODES):
+            return True
+        return method == "GET" and status in RETRY_STATUSES
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After when it sends one"""
+        try:
+            return min(float(retry_after), self.max_backoff)
+        except (TypeError, ValueError):
+            return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+    
+    def close(self):
+        """Stop the task waiter and release pooled connections"""
+        self.waiter.close()
+        self.session.close()
+    
     def _make_api_request(self, endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> Dict:
         """Make authenticated request to DataForSEO API"""
+        if method == "GET" and endpoint in self._prefetched:
+            return self._prefetched.pop(endpoint)
+        
         url = f"{self.api_endpoint}{endpoint}"
-        headers = {
-            "Authorization": self.auth_header,
-            "Content-Type": "application/json"
-        }
         
-        try:
-            if method == "POST":
-                response = requests.post(url, headers=headers, json=data)
-            else:
-                response = requests.get(url, headers=headers)
-            
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"API request failed: {e}")
-            return {"error": str(e)}
+        for attempt in range(self.max_retries + 1):
+            try:
+                if method == "POST":
+                    response = self.session.post(url, json=data, timeout=self.timeout)
+                else:
+                    response = self.session.get(url, timeout=self.timeout)
+                
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                
+                if attempt < self.max_retries and self._should_retry(method, response.status_code, body):
+                    delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    print(f"⏳ {endpoint} answered {response.status_code}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                
+                response.raise_for_status()
+                if body is None:
+                    raise requests.exceptions.InvalidJSONError(f"Invalid JSON from {endpoint}", response=response)
+                return body
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # A POST that may have reached the server is not sent twice
+                retryable = method == "GET" or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    print(f"API request failed: {e}")
+                    return {"error": str(e)}
+                delay = self._retry_delay(attempt)
+                print(f"⏳ {endpoint} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            except requests.exceptions.RequestException as e:
+                print(f"API request failed: {e}")
+                return {"error": str(e)}
     
     def start_comprehensive_audit(self) -> Optional[str]:
         """
@@ -77,6 +342,8 @@ class DataForSEOAuditor:
                 "tag": "casino-portal-audit"
             }]
         }
+        if self.pingback:
+            task_data["data"][0]["pingback_url"] = self.pingback.pingback_url
         
         result = self._make_api_request("/on_page/task_post", "POST", task_data)
         
@@ -92,31 +359,40 @@ class DataForSEOAuditor:
             print(f"❌ Failed to start audit: {result}")
             return None
     
-    def check_task_status(self, task_id: str) -> bool:
+    def check_task_status(self, task_id: str, kind: str = "on_page") -> bool:
         """Check if audit task is ready"""
-        result = self._make_api_request("/on_page/tasks_ready")
+        result = self._make_api_request(READY_ENDPOINTS[kind])
         
         if "error" in result:
             return False
-            
-        ready_tasks = result.get("tasks", [])
-        return any(task.get("id") == task_id for task in ready_tasks)
+        
+        return task_id in ready_task_ids(result)
     
-    def wait_for_completion(self, task_id: str, max_wait: int = 300) -> bool:
-        """Wait for audit task to complete"""
+    def wait_for_completion(self, task_id: str, max_wait: int = 300, kind: str = "on_page") -> bool:
+        """
+        Wait for audit task to complete, through the shared TaskWaiter: the
+        wait ends on a pingback or on the first tasks_ready tick that lists
+        the task, whichever comes first.
+        """
         print(f"⏳ Waiting for audit to complete (max {max_wait}s)...")
         
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            if self.check_task_status(task_id):
-                print("✅ Audit completed!")
-                return True
-            
-            print("⏳ Still processing... (checking again in 30s)")
-            time.sleep(30)
+        try:
+            how = self.waiter.track(task_id, kind).result(timeout=max_wait)
+        except FutureTimeout:
+            self.waiter.forget(task_id)
+            print(f"⏰ Timeout after {max_wait}s")
+            return False
         
-        print(f"⏰ Timeout after {max_wait}s")
-        return False
+        print("✅ Audit completed! (pingback)" if how == "pingback" else "✅ Audit completed!")
+        return True
+    
+    def wait_for_tasks(self, task_ids: List[str], max_wait: int = 300, kind: str = "on_page") -> set:
+        """Wait on many tasks at once; returns the IDs that completed within max_wait"""
+        futures = {self.waiter.track(task_id, kind): task_id for task_id in task_ids}
+        done, not_done = wait(futures, timeout=max_wait)
+        for future in not_done:
+            self.waiter.forget(futures[future])
+        return {futures[future] for future in done if not future.cancelled()}
     
     def get_audit_summary(self, task_id: str) -> Dict:
         """Get comprehensive audit summary"""
@@ -259,8 +535,84 @@ class DataForSEOAuditor:
         
         return result
     
-    def run_lighthouse_audit(self) -> Dict:
-        """Run Google Lighthouse audit for performance, SEO, accessibility"""
+    def _on_page_collectors(self, task_id: str) -> List[tuple]:
+        """Post-crawl collectors with the endpoint each one reads"""
+        return [
+            (self.get_audit_summary, f"/on_page/summary/{task_id}"),
+            (self.get_pages_analysis, f"/on_page/pages/{task_id}"),
+            (self.check_duplicate_content, f"/on_page/duplicate_content/{task_id}"),
+            (self.check_duplicate_tags, f"/on_page/duplicate_tags/{task_id}"),
+            (self.analyze_links, f"/on_page/links/{task_id}"),
+            (self.check_redirect_chains, f"/on_page/redirect_chains/{task_id}"),
+            (self.check_non_indexable, f"/on_page/non_indexable/{task_id}"),
+            (self.analyze_microdata, f"/on_page/microdata/{task_id}"),
+            (self.analyze_page_speed, f"/on_page/waterfall/{task_id}"),
+            (self.analyze_keyword_density, f"/on_page/keyword_density/{task_id}"),
+        ]
+    
+    def collect_on_page_data(self, task_id: str):
+        """Gather all post-crawl audit data, one endpoint after another"""
+        for collect, _ in self._on_page_collectors(task_id):
+            collect(task_id)
+    
+    async def _async_api_get(self, session, semaphore: asyncio.Semaphore, endpoint: str) -> Dict:
+        """Async GET against the DataForSEO API, with the same timeouts, retries and error shape as _make_api_request"""
+        url = f"{self.api_endpoint}{endpoint}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    async with session.get(url, headers=self._request_headers()) as response:
+                        try:
+                            body = await response.json(content_type=None)
+                        except ValueError:
+                            body = None
+                        retry_after = response.headers.get("Retry-After")
+                
+                if attempt < self.max_retries and self._should_retry("GET", response.status, body):
+                    delay = self._retry_delay(attempt, retry_after)
+                    print(f"⏳ {endpoint} answered {response.status}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                response.raise_for_status()
+                if body is None:
+                    raise ValueError(f"Invalid JSON from {endpoint}")
+                return body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    print(f"API request failed: {e}")
+                    return {"error": str(e) or type(e).__name__}
+                delay = self._retry_delay(attempt)
+                print(f"⏳ {endpoint} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except (aiohttp.ClientError, ValueError) as e:
+                print(f"API request failed: {e}")
+                return {"error": str(e) or type(e).__name__}
+    
+    async def collect_on_page_data_async(self, task_id: str, concurrency: int = 10):
+        """
+        Gather all post-crawl audit data with every endpoint requested at once
+        over one connection pool, at most `concurrency` in flight. Each
+        collector runs on its prefetched response as soon as it arrives, so
+        collection takes as long as the slowest endpoint.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        connect_timeout, read_timeout = self.timeout
+        timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def fetch(collect, endpoint):
+                return collect, endpoint, await self._async_api_get(session, semaphore, endpoint)
+            
+            pending = [fetch(collect, endpoint) for collect, endpoint in self._on_page_collectors(task_id)]
+            for arrival in asyncio.as_completed(pending):
+                collect, endpoint, result = await arrival
+                self._prefetched[endpoint] = result
+                collect(task_id)
+    
+    def start_lighthouse_audit(self) -> Optional[str]:
+        """Post the Lighthouse task and start tracking it; returns its task ID"""
         print("🏠 Running Google Lighthouse audit...")
         
         # Start Lighthouse task
@@ -276,31 +628,45 @@ class DataForSEOAuditor:
                 ]
             }]
         }
+        if self.pingback:
+            lighthouse_data["data"][0]["pingback_url"] = self.pingback.pingback_url
         
         result = self._make_api_request("/on_page/lighthouse/task_post", "POST", lighthouse_data)
         
         if "error" in result:
             print(f"❌ Failed to start Lighthouse audit: {result['error']}")
-            return result
+            return None
         
         if result.get("status_code") == 20000 and result.get("tasks"):
             lighthouse_task_id = result["tasks"][0]["id"]
             print(f"✅ Lighthouse audit started. Task ID: {lighthouse_task_id}")
-            
-            # Wait for Lighthouse completion (usually faster)
-            print("⏳ Waiting for Lighthouse audit...")
-            time.sleep(60)  # Lighthouse is typically faster
-            
-            # Get Lighthouse results
-            lighthouse_result = self._make_api_request(f"/on_page/lighthouse/task_get/json/{lighthouse_task_id}")
-            
-            if "error" not in lighthouse_result:
-                self.audit_results["lighthouse"] = lighthouse_result
-                print("✅ Lighthouse audit completed")
-            
-            return lighthouse_result
+            # Tracked from now on, so it completes alongside whatever else is awaited
+            self.waiter.track(lighthouse_task_id, "lighthouse")
+            return lighthouse_task_id
         
-        return result
+        print(f"❌ Failed to start Lighthouse audit: {result}")
+        return None
+    
+    def get_lighthouse_results(self, lighthouse_task_id: str, max_wait: int = 300) -> Dict:
+        """Wait for a Lighthouse task and store its results"""
+        print("⏳ Waiting for Lighthouse audit...")
+        self.wait_for_completion(lighthouse_task_id, max_wait, kind="lighthouse")
+        
+        # Get Lighthouse results
+        lighthouse_result = self._make_api_request(f"/on_page/lighthouse/task_get/json/{lighthouse_task_id}")
+        
+        if "error" not in lighthouse_result:
+            self.audit_results["lighthouse"] = lighthouse_result
+            print("✅ Lighthouse audit completed")
+        
+        return lighthouse_result
+    
+    def run_lighthouse_audit(self) -> Dict:
+        """Run Google Lighthouse audit for performance, SEO, accessibility"""
+        lighthouse_task_id = self.start_lighthouse_audit()
+        if not lighthouse_task_id:
+            return {"error": "Lighthouse task was not started"}
+        return self.get_lighthouse_results(lighthouse_task_id)
     
     def perform_live_analysis(self) -> Dict:
         """Perform live instant analysis"""
@@ -416,7 +782,8 @@ class DataForSEOAuditor:
         
         print(f"📋 Summary report saved: {filename}")
 
-def main():
+def main(async_collect: bool = False, concurrency: int = 10, pingback_url: Optional[str] = None,
+         pingback_port: int = 8765):
     """Main execution function"""
     print("🎰 DataForSEO Casino Portal SEO Audit")
     print("=" * 50)
@@ -434,8 +801,16 @@ def main():
         print("python dataforseo-audit.py --login YOUR_LOGIN --password YOUR_PASSWORD")
         return
     
+    # Completion callbacks need an address DataForSEO can reach
+    pingback = None
+    if pingback_url:
+        try:
+            pingback = PingbackReceiver(pingback_url, pingback_port)
+        except OSError as e:
+            print(f"⚠️  Pingback receiver unavailable ({e}), polling instead")
+    
     # Initialize auditor
-    auditor = DataForSEOAuditor(api_login, api_password)
+    auditor = DataForSEOAuditor(api_login, api_password, pingback=pingback)
     
     try:
         # Step 1: Start comprehensive audit
@@ -443,6 +818,9 @@ def main():
         if not task_id:
             return
         
+        # Lighthouse runs during the crawl; one waiter tracks both tasks
+        lighthouse_task_id = auditor.start_lighthouse_audit()
+        
         # Step 2: Wait for completion
         if not auditor.wait_for_completion(task_id):
             print("❌ Audit timed out. You can check results later using task ID:", task_id)
@@ -450,19 +828,16 @@ def main():
         
         # Step 3: Gather all audit data
         print("\n📊 Gathering comprehensive audit data...")
-        auditor.get_audit_summary(task_id)
-        auditor.get_pages_analysis(task_id)
-        auditor.check_duplicate_content(task_id)
-        auditor.check_duplicate_tags(task_id)
-        auditor.analyze_links(task_id)
-        auditor.check_redirect_chains(task_id)
-        auditor.check_non_indexable(task_id)
-        auditor.analyze_microdata(task_id)
-        auditor.analyze_page_speed(task_id)
-        auditor.analyze_keyword_density(task_id)
-        
-        # Step 4: Run Lighthouse audit
-        auditor.run_lighthouse_audit()
+        if async_collect and AIOHTTP_AVAILABLE:
+            asyncio.run(auditor.collect_on_page_data_async(task_id, concurrency))
+        else:
+            if async_collect:
+                print("⚠️  aiohttp not installed, collecting sequentially. Run: pip install aiohttp")
+            auditor.collect_on_page_data(task_id)
+        
+        # Step 4: Collect Lighthouse audit
+        if lighthouse_task_id:
+            auditor.get_lighthouse_results(lighthouse_task_id)
         
         # Step 5: Perform live analysis
         auditor.perform_live_analysis()
@@ -477,6 +852,10 @@ def main():
         
     except Exception as e:
         print(f"❌ Audit failed: {e}")
+    finally:
+        auditor.close()
+        if pingback:
+            pingback.close()
 
 if __name__ == "__main__":
     import argparse
@@ -485,6 +864,14 @@ if __name__ == "__main__":
     parser.add_argument("--login", help="DataForSEO API login")
     parser.add_argument("--password", help="DataForSEO API password")
     parser.add_argument("--url", default="http://localhost:3000", help="Website URL to audit")
+    parser.add_argument("--async-collect", action="store_true",
+                        help="Request all post-crawl on-page endpoints at once (requires aiohttp)")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Max on-page endpoint requests in flight with --async-collect")
+    parser.add_argument("--pingback-url",
+                        help="Public base URL DataForSEO can reach this machine at; completion callbacks then "
+                             "replace polling")
+    parser.add_argument("--pingback-port", type=int, default=8765, help="Local port for the pingback receiver")
     
     args = parser.parse_args()
     
@@ -492,4 +879,4 @@ if __name__ == "__main__":
         os.environ["DATAFORSEO_LOGIN"] = args.login
         os.environ["DATAFORSEO_PASSWORD"] = args.password
     
-    main()
\ No newline at end of file
+    main(args.async_collect, args.concurrency, args.pingback_url, args.pingback_port)
\ No newline at end of file
@@ -5,16 +5,30 @@ Direct Casino Logo Downloader 2025
 Using direct HTTP requests to find and download casino logos
 """
 
+import argparse
 import json
 import os
 import requests
+import threading
 import time
-from PIL import Image
-import io
+from functools import partial
 from urllib.parse import urlencode, quote_plus
 import re
 import hashlib
 
+from logo_pipeline import (
+    AimdController, BatchLogoScorer, BoundedImageReader, CandidatePool, CasinoScheduler, Cassette, EncodingStage,
+    LogoManifest, LogoPublisher, ResultStream, SeenUrls, add_cassette_arguments, add_incremental_arguments,
+    add_publishing_arguments, add_scheduling_arguments, decode_logo, fit_within, open_proxy, read_header,
+    read_image_stream, stream_path
+)
+
+# Thresholds on the shared BatchLogoScorer scale. Ideal dimensions and aspect
+# ratio alone score 45, so each one needs URL hints or logo-like content on top.
+EXCELLENT_SCORE = 100  # stop scanning the current query's results
+GOOD_ENOUGH_SCORE = 80  # skip the remaining queries
+MIN_SCORE = 45  # never publish a candidate on geometry alone
+
 class DirectLogoDownloader:
     def __init__(self):
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,14 +37,24 @@ class DirectLogoDownloader:
         self.logos_dir = os.path.join(self.project_root, 'public', 'images', 'casinos')
         self.results_file = os.path.join(self.project_root, 'data', 'direct-results.json')
         
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(os.path.join(self.project_root, 'data', 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, os.path.join(self.project_root, 'data', 'casinos.json'))
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'direct-logo-downloader')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'direct-logo-downloader', 'direct_results')
         self.stats = {
             'total': 0,
             'successful': 0,
             'failed': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
         # Headers to appear like a real browser
         self.headers = {
@@ -41,6 +65,22 @@ class DirectLogoDownloader:
             'Connection': 'keep-alive'
         }
         
+        # Shared candidate ranking used by every finder
+        self.scorer = BatchLogoScorer()
+        
+        # Pooled session so finished downloads hand their connection back
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
+        # Google search pacing, learned and carried across runs
+        self.search_limits = AimdController(os.path.join(self.project_root, 'data', 'search-concurrency.json'))
+        
+        # Image URLs already downloaded this run, across all of a casino's queries
+        self.seen_urls = SeenUrls()
+        
+        # Compressed candidate bytes under a memory budget, spilled to scratch storage past it
+        self.candidates = CandidatePool()
+        
     def load_casinos(self):
         """Load casino data"""
         try:
@@ -79,8 +119,13 @@ class DirectLogoDownloader:
             
             url = f"https://www.google.com/search?{urlencode(params)}"
             
-            response = requests.get(url, headers=self.headers, timeout=10)
+            with self.search_limits.sync_slot('google') as feedback:
+                response = requests.get(url, headers=self.headers, timeout=10)
+                feedback.observe(response.status_code, response.text, response.headers.get('Retry-After'))
             response.raise_for_status()
+            if feedback.outcome == 'backoff':
+                print("      🤖 Google served a CAPTCHA page")
+                return []
             
             # Extract image URLs from the response
             image_urls = re.findall(r'\"ou\":\"([^\"]+)\"', response.text)
@@ -123,22 +168,18 @@ class DirectLogoDownloader:
     def download_image(self, url):
         """Download image from URL"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10, stream=True)
-            response.raise_for_status()
+            response = self.session.get(url, timeout=10, stream=True)
             
-            # Check content type
+            # Check status and content type before reading any of the body
             content_type = response.headers.get('content-type', '').lower()
-            if not content_type.startswith('image/'):
-                return None
-            
-            # Check file size
-            content_length = response.headers.get('content-length')
-            if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB max
+            if response.status_code != 200 or not content_type.startswith('image/'):
+                response.close()
                 return None
             
-            # Download content
-            content = response.content
-            if len(content) < 2000:  # 2KB minimum
+            # Stream with a hard 5MB ceiling, rejecting bad dimensions from the header
+            reader = BoundedImageReader(5 * 1024 * 1024, min_dimensions=(50, 50), max_dimensions=(2000, 2000))
+            content = read_image_stream(response, reader)
+            if content is None or len(content) < 2000:  # 2KB minimum
                 return None
                 
             return content
@@ -147,71 +188,46 @@ class DirectLogoDownloader:
             return None
     
     def validate_and_process_image(self, image_data):
-        """Validate and process downloaded image"""
+        """Validate downloaded image from its header and build a small scoring proxy"""
         try:
-            # Open with PIL
-            img = Image.open(io.BytesIO(image_data))
-            
-            # Check dimensions
-            width, height = img.size
+            # Check dimensions (header only)
+            width, height, img_format = read_header(image_data)
             if width < 50 or height < 50:
                 return None
             
             if width > 2000 or height > 2000:
                 return None
             
-            # Convert to RGBA for PNG
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Resize if needed
-            if width > 800 or height > 800:
-                img.thumbnail((800, 800), Image.Resampling.LANCZOS)
+            # Full decoding is deferred until this candidate wins
+            image = {
+                'data': image_data,
+                'width': width,
+                'height': height,
+                'format': img_format,
+                'proxy': open_proxy(image_data)
+            }
             
             print(f"        ✅ Valid image: {width}x{height}")
-            return img
+            return image
             
         except Exception as e:
             return None
     
-    def calculate_image_score(self, img, filename_hint=""):
+    def calculate_image_score(self, image, filename_hint=""):
         """Calculate image quality score"""
-        score = 0
-        
         try:
-            width, height = img.size
-            
-            # Size scoring
-            if 100 <= width <= 600 and 100 <= height <= 600:
-                score += 20
-            
-            # Aspect ratio (prefer square-ish logos)
-            ratio = max(width, height) / min(width, height)
-            if ratio <= 2.5:
-                score += 15
-            
-            # Filename hints
-            filename_lower = filename_hint.lower()
-            if 'logo' in filename_lower:
-                score += 20
-            if 'casino' in filename_lower:
-                score += 10
-            if 'icon' in filename_lower:
-                score += 15
-            
+            # Dimensions as published (fitted into 800x800)
+            width, height = fit_within(image['width'], image['height'], 800)
+            likelihood = float(self.scorer.analyzer.analyze([image['proxy']])[1][0])
+            return self.scorer.score_one(width, height, hint=filename_hint, likelihood=likelihood)
         except:
-            score = 0
-            
-        return score
+            return 0
     
-    def save_logo(self, casino, img):
-        """Save the processed logo"""
+    def save_logo(self, casino, data, source=None, score=None, on_done=None):
+        """Decode the winning image at full resolution and queue it for encoding"""
         try:
-            dest_path = os.path.join(self.logos_dir, f"{casino['slug']}.png")
-            img.save(dest_path, 'PNG', optimize=True)
-            
-            file_size = os.path.getsize(dest_path)
-            print(f"        💾 Saved: {casino['slug']}.png ({file_size} bytes)")
+            img = decode_logo(data, 800)
+            self.encoder.submit(casino['slug'], img, source, score, on_done=on_done, optimize=True)
             return True
             
         except Exception as e:
@@ -243,60 +259,69 @@ class DirectLogoDownloader:
         
         success = False
         queries = self.get_search_queries(casino)
-        best_img = None
-        best_score = 0
-        best_query = ""
         
-        for query in queries:
-            image_urls = self.search_google_images(query)
-            
-            for url in image_urls:
-                image_data = self.download_image(url)
-                if not image_data:
-                    continue
+        # Only the leading candidate's compressed bytes are kept
+        with self.candidates.holder() as best:
+            for query in queries:
+                image_urls = self.seen_urls.fresh(self.search_google_images(query), casino['slug'])
                 
-                img = self.validate_and_process_image(image_data)
-                if not img:
-                    continue
+                for url in image_urls:
+                    image_data = self.download_image(url)
+                    if not image_data:
+                        # A later query may return the same image; let it try again
+                        self.seen_urls.release(url, casino['slug'])
+                        continue
+                    self.seen_urls.add(url, casino['slug'])
+                    
+                    image = self.validate_and_process_image(image_data)
+                    if not image:
+                        continue
+                    
+                    # Score this image
+                    score = self.calculate_image_score(image, url)
+                    if score > 0:
+                        best.offer(score, image['data'], query=query)
+                    
+                    # If we have a really good image, use it
+                    if score > EXCELLENT_SCORE:
+                        break
                 
-                # Score this image
-                score = self.calculate_image_score(img, url)
-                
-                if score > best_score:
-                    best_img = img
-                    best_score = score
-                    best_query = query
-                
-                # If we have a really good image, use it
-                if score > 40:
+                if best.best_score > GOOD_ENOUGH_SCORE:
                     break
             
-            # Rate limit between queries
-            time.sleep(2)
-            
-            if best_score > 30:  # Good enough threshold
-                break
+            best_score, best_image, meta = best.best()
+        best_query = meta.get('query', '')
         
-        # Save the best image found
-        if best_img and best_score > 15:  # Minimum threshold
-            if self.save_logo(casino, best_img):
-                success = True
-                self.stats['successful'] += 1
-                
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'status': 'SUCCESS',
-                    'query': best_query,
-                    'score': best_score,
-                    'file': f"{casino['slug']}.png",
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
-                print(f"    ✅ SUCCESS: {casino['brand']} (score: {best_score})")
+        # Save the best image found; the outcome is recorded once it is published
+        if best_image and best_score > MIN_SCORE:
+            success = self.save_logo(casino, best_image, best_query, best_score,
+                                     partial(self.record_outcome, casino, query=best_query, score=best_score,
+                                             queries=queries))
         
         if not success:
-            self.stats['failed'] += 1
+            self.record_outcome(casino, None, queries=queries)
+    
+    def record_outcome(self, casino, path, query=None, score=None, queries=None):
+        """Record the published logo, or the casino's failure when path is None"""
+        if path:
+            with self.stats_lock:
+                self.stats['successful'] += 1
+            
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'SUCCESS',
+                'query': query,
+                'score': score,
+                'file': os.path.basename(path),
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            
+            print(f"    ✅ SUCCESS: {casino['brand']} (score: {score})")
+        else:
+            with self.stats_lock:
+                self.stats['failed'] += 1
+            self.manifest.record_failure(casino['slug'], 'direct-logo-downloader')
             print(f"    ❌ FAILED: {casino['brand']}")
             
             self.results.append({
@@ -312,7 +337,7 @@ class DirectLogoDownloader:
         print("🚀 STARTING DIRECT LOGO DOWNLOAD")
         print("=" * 40)
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             self.process_casino(casino, i, len(self.casinos))
             
             # Progress report
@@ -320,9 +345,6 @@ class DirectLogoDownloader:
                 duration = int(time.time() - self.stats['start_time'])
                 success_rate = (self.stats['successful'] / i) * 100 if i > 0 else 0
                 print(f"\n📊 Progress: {i}/{len(self.casinos)} | Success: {self.stats['successful']} ({success_rate:.1f}%) | Time: {duration}s\n")
-            
-            # Respectful delay
-            time.sleep(3)
     
     def generate_final_report(self):
         """Generate final report"""
@@ -336,6 +358,7 @@ class DirectLogoDownloader:
         print(f"✅ Successful: {self.stats['successful']}")
         print(f"❌ Failed: {self.stats['failed']}")
         print(f"📈 Success Rate: {success_rate:.1f}%")
+        print(f"♻️  Duplicate Candidates Skipped: {self.seen_urls.stats['skipped']}")
         
         if self.stats['successful'] > 0:
             print(f"\n✅ SUCCESSFULLY DOWNLOADED:")
@@ -352,19 +375,15 @@ class DirectLogoDownloader:
         
         # Save results
         try:
-            final_results = {
+            self.results.finish({
                 'direct_stats': self.stats,
-                'direct_results': self.results,
                 'session_info': {
                     'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                     'duration': duration,
                     'version': 'Direct Logo Downloader v1.0',
                     'success_rate': success_rate
                 }
-            }
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(final_results, f, indent=2, ensure_ascii=False)
+            })
             
             print(f"💾 Results saved: {os.path.basename(self.results_file)}")
             
@@ -372,7 +391,17 @@ class DirectLogoDownloader:
             print(f"⚠️  Save error: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Direct Casino Logo Downloader")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    
     downloader = DirectLogoDownloader()
+    downloader.encoder.configure(args)
+    downloader.scheduler.configure(args)
+    cassette = Cassette.from_args(args, downloader)
     
     try:
         if not downloader.load_casinos():
@@ -381,7 +410,14 @@ def main():
         if not downloader.setup_dirs():
             return
         
-        downloader.run_direct_download()
+        if args.incremental:
+            downloader.casinos = downloader.manifest.pending(downloader.casinos, downloader.logos_dir, args.max_age_days, args.min_score)
+            downloader.stats['total'] = len(downloader.casinos)
+        
+        # One manifest write for the whole run instead of one per casino
+        with downloader.manifest.batch():
+            downloader.run_direct_download()
+            downloader.encoder.drain()
         downloader.generate_final_report()
         
     except KeyboardInterrupt:
@@ -392,6 +428,14 @@ def main():
         print(f"\n💥 Fatal error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        downloader.encoder.close()
+        downloader.search_limits.close()
+        downloader.results.close()
+        downloader.session.close()
+        downloader.candidates.close()
+        if cassette:
+            cassette.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -5,12 +5,19 @@ Foolproof Casino Logo Finder 2025
 Maximum simplicity and reliability
 """
 
+import argparse
 import json
 import os
 import shutil
+import threading
 import time
 import glob
-from PIL import Image
+from functools import partial
+from logo_pipeline import (
+    BatchLogoScorer, CasinoScheduler, EncodingStage, LogoManifest, LogoPublisher, ResultStream,
+    add_incremental_arguments, add_publishing_arguments, add_scheduling_arguments, decode_logo, read_header,
+    stream_path
+)
 
 # Import bing image downloader
 try:
@@ -29,14 +36,25 @@ class FoolproofLogoFinder:
         self.temp_dir = os.path.join(self.project_root, 'foolproof-downloads')
         self.results_file = os.path.join(self.project_root, 'data', 'foolproof-results.json')
         
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(os.path.join(self.project_root, 'data', 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, os.path.join(self.project_root, 'data', 'casinos.json'))
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'foolproof-logo-finder')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        self.scorer = BatchLogoScorer()
+        
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'foolproof-logo-finder', 'results')
         self.stats = {
             'total': 0,
             'successful': 0,
             'failed': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
     def load_casinos(self):
         """Load casino data"""
@@ -105,40 +123,56 @@ class FoolproofLogoFinder:
             if file_size < 2000:  # 2KB minimum
                 return False
             
-            with Image.open(image_path) as img:
-                width, height = img.size
-                if width < 50 or height < 50:
-                    return False
-                    
-                print(f"        ✅ Valid: {os.path.basename(image_path)} ({width}x{height})")
-                return True
+            # Header only, no pixel decoding
+            width, height, _ = read_header(image_path)
+            if width < 50 or height < 50:
+                return False
+                
+            print(f"        ✅ Valid: {os.path.basename(image_path)} ({width}x{height})")
+            return True
                 
         except Exception as e:
             return False
     
-    def save_logo(self, casino, image_path):
-        """Save the logo"""
+    def save_logo(self, casino, image_path, source=None, score=None, on_done=None):
+        """Decode the logo and queue it for encoding"""
         try:
-            dest_path = os.path.join(self.logos_dir, f"{casino['slug']}.png")
-            
-            with Image.open(image_path) as img:
-                # Convert to PNG
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                # Resize if too large
-                if img.width > 800 or img.height > 800:
-                    img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                
-                img.save(dest_path, 'PNG', optimize=True)
-                
-            print(f"        💾 Saved: {casino['slug']}.png")
+            # Decode (RGBA, max 800px); PNG encoding runs on the encoding stage
+            img = decode_logo(image_path, 800)
+            self.encoder.submit(casino['slug'], img, source, score, on_done=on_done, optimize=True)
             return True
             
         except Exception as e:
             print(f"        ❌ Save failed: {e}")
             return False
     
+    def record_outcome(self, casino, path, query=None):
+        """Record the published logo, or the casino's failure when path is None"""
+        if path:
+            with self.stats_lock:
+                self.stats['successful'] += 1
+            
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'SUCCESS',
+                'query': query,
+                'file': os.path.basename(path)
+            })
+            
+            print(f"    ✅ SUCCESS: {casino['brand']}")
+        else:
+            with self.stats_lock:
+                self.stats['failed'] += 1
+            self.manifest.record_failure(casino['slug'], 'foolproof-logo-finder')
+            print(f"    ❌ Failed: {casino['brand']}")
+            
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'FAILED'
+            })
+    
     def cleanup(self):
         """Simple cleanup"""
         try:
@@ -153,7 +187,7 @@ class FoolproofLogoFinder:
         print("🚀 STARTING FOOLPROOF LOGO SEARCH")
         print("=" * 40)
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             print(f"\n[{i}/{len(self.casinos)}] 🎯 {casino['brand']}")
             
             success = False
@@ -163,22 +197,12 @@ class FoolproofLogoFinder:
                 images = self.download_images(query)
                 
                 if images:
-                    # Try each image until one works
+                    # Try each image until one is queued; the outcome is recorded once it is published
                     for img_path in images[:5]:
                         if self.validate_image(img_path):
-                            if self.save_logo(casino, img_path):
+                            if self.save_logo(casino, img_path, query, self.scorer.score_file(img_path),
+                                              partial(self.record_outcome, casino, query=query)):
                                 success = True
-                                self.stats['successful'] += 1
-                                
-                                self.results.append({
-                                    'slug': casino['slug'],
-                                    'brand': casino['brand'],
-                                    'status': 'SUCCESS',
-                                    'query': query,
-                                    'file': f"{casino['slug']}.png"
-                                })
-                                
-                                print(f"    ✅ SUCCESS: {casino['brand']}")
                                 break
                     
                     if success:
@@ -188,14 +212,7 @@ class FoolproofLogoFinder:
                 time.sleep(1)
             
             if not success:
-                self.stats['failed'] += 1
-                print(f"    ❌ Failed: {casino['brand']}")
-                
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'status': 'FAILED'
-                })
+                self.record_outcome(casino, None)
             
             # Progress every 10
             if i % 10 == 0:
@@ -231,26 +248,38 @@ class FoolproofLogoFinder:
         
         # Save results
         try:
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'stats': self.stats,
-                    'results': self.results,
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }, f, indent=2)
+            self.results.finish({
+                'stats': self.stats,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
             print("💾 Results saved successfully")
         except Exception as e:
             print(f"⚠️  Save error: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Foolproof Casino Logo Finder")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    args = parser.parse_args()
+    
     finder = FoolproofLogoFinder()
+    finder.encoder.configure(args)
+    finder.scheduler.configure(args)
     
     try:
         if not finder.load_casinos():
             return
         if not finder.setup_dirs():
             return
+        if args.incremental:
+            finder.casinos = finder.manifest.pending(finder.casinos, finder.logos_dir, args.max_age_days, args.min_score)
+            finder.stats['total'] = len(finder.casinos)
             
-        finder.run_search()
+        # One manifest write for the whole run instead of one per casino
+        with finder.manifest.batch():
+            finder.run_search()
+            finder.encoder.drain()
         finder.final_report()
         
     except KeyboardInterrupt:
@@ -260,6 +289,8 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        finder.encoder.close()
+        finder.results.close()
         finder.cleanup()
 
 if __name__ == '__main__':
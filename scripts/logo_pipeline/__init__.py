@@ -0,0 +1,83 @@
+"""
+Logo Pipeline 2025
+Shared building blocks for the Python casino logo finder scripts.
+
+The finder scripts are run directly (python scripts/smart-logo-hunter.py),
+which puts scripts/ on sys.path, so they import this package without
+any installation step.
+"""
+
+from .adaptive import AimdController, classify
+from .analysis import LogoContentAnalyzer
+from .atlas import compose_atlas, pack_shelves
+from .candidates import CandidatePool, TopCandidates
+from .cassette import Cassette, add_cassette_arguments
+from .dedup import BloomFilter, SeenUrls, normalize_url
+from .decoding import decode_logo, fit_within, open_proxy, read_header
+from .encoding import EncodingStage, default_workers
+from .manifest import LogoManifest, add_incremental_arguments, file_digest
+from .optimizing import LogoOptimizer, perceptual_error
+from .placeholders import FontMetrics, PlaceholderRenderer, render_placeholder, stable_index
+from .politeness import HostThrottle
+from .probe_cache import ProbeCache
+from .probing import UrlProber
+from .publishing import LogoPublisher, add_publishing_arguments, atomic_write, encode_png, file_lock
+from .results import ResultStream, iter_run, read_runs, run_info, stream_path, write_summary
+from .scheduling import CasinoScheduler, add_scheduling_arguments, campaign_markets, overall_rating
+from .scoring import BatchLogoScorer, candidate_table, format_code, hint_flags
+from .streaming import BoundedImageReader, read_image_stream, read_image_stream_async
+
+__all__ = [
+    'AimdController',
+    'classify',
+    'BloomFilter',
+    'SeenUrls',
+    'normalize_url',
+    'decode_logo',
+    'fit_within',
+    'open_proxy',
+    'read_header',
+    'EncodingStage',
+    'default_workers',
+    'LogoContentAnalyzer',
+    'compose_atlas',
+    'pack_shelves',
+    'CandidatePool',
+    'TopCandidates',
+    'Cassette',
+    'add_cassette_arguments',
+    'LogoManifest',
+    'add_incremental_arguments',
+    'file_digest',
+    'LogoOptimizer',
+    'perceptual_error',
+    'FontMetrics',
+    'PlaceholderRenderer',
+    'render_placeholder',
+    'stable_index',
+    'HostThrottle',
+    'ProbeCache',
+    'UrlProber',
+    'LogoPublisher',
+    'add_publishing_arguments',
+    'atomic_write',
+    'encode_png',
+    'file_lock',
+    'ResultStream',
+    'iter_run',
+    'read_runs',
+    'run_info',
+    'stream_path',
+    'write_summary',
+    'CasinoScheduler',
+    'add_scheduling_arguments',
+    'campaign_markets',
+    'overall_rating',
+    'BatchLogoScorer',
+    'candidate_table',
+    'format_code',
+    'hint_flags',
+    'BoundedImageReader',
+    'read_image_stream',
+    'read_image_stream_async',
+]
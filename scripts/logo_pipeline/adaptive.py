@@ -0,0 +1,248 @@
+"""
+AIMD concurrency control per search source, learned across finder runs
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from .publishing import atomic_write, file_lock
+
+DAY = 24 * 60 * 60
+
+# Signatures of the engines' block pages only; result pages may mention captchas or robots
+CAPTCHA_MARKERS = (
+    '/sorry/index',
+    'unusual traffic',
+    'id="captcha-form"',
+    'anomaly-modal',
+    'challenge-form',
+)
+
+# Errors that mean the request timed out, whichever HTTP client raised them
+TIMEOUT_ERRORS = (asyncio.TimeoutError, TimeoutError)
+try:
+    import requests
+    TIMEOUT_ERRORS += (requests.Timeout,)
+except ImportError:
+    pass
+
+
+def classify(status, text=''):
+    """'ok', 'backoff' or 'neutral' for one search response"""
+    if status == 429 or status >= 500:
+        return 'backoff'
+    if text and any(marker in text[:200_000].lower() for marker in CAPTCHA_MARKERS):
+        return 'backoff'
+    if status == 200:
+        return 'ok'
+    return 'neutral'
+
+
+class Feedback:
+    """Filled in by the caller inside a slot with what the server answered"""
+
+    def __init__(self):
+        self.outcome = 'neutral'
+        self.retry_after = None
+
+    def observe(self, status, text='', retry_after=None):
+        self.outcome = classify(status, text)
+        try:
+            self.retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            self.retry_after = None
+        return self.outcome
+
+
+class AimdController:
+    """
+    Additive-increase / multiplicative-decrease limits for each search source.
+
+    Every source (bing, duckduckgo, google) has a concurrency limit. Async
+    callers may have that many requests in flight; serial callers are
+    paced one request per latency / limit seconds, so both speed up as
+    the limit grows. Each healthy response (200, latency under
+    latency_target, low recent error rate) adds increase / limit, about
+    +1 per round trip. A 429, 5xx, timeout or CAPTCHA page multiplies the
+    limit by decrease (at most once per round trip) and pauses the source
+    for Retry-After or a couple of round trips. Limits, latency and error
+    rate are saved to disk so the next run starts where this one ended;
+    sources another finder saved meanwhile are kept.
+    """
+
+    def __init__(self, path=None, initial=2.0, min_limit=1.0, max_limit=16.0, increase=1.0, decrease=0.5,
+                 latency_target=3.0, min_interval=0.25, stale_after=7 * DAY):
+        self.path = path
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.min_interval = min_interval
+        self.stale_after = stale_after
+        self.sources = {}
+        self._observed = set()
+        self._lock = threading.Lock()
+        self.load()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('sources', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable concurrency state {os.path.basename(self.path)}: {e}")
+        return {}
+
+    def load(self):
+        if not self.path:
+            return
+
+        now = time.time()
+        for name, learned in self._read().items():
+            state = self.state(name)
+            # Old knowledge is only a hint: start halfway back to the default
+            limit = learned.get('limit', self.initial)
+            if now - learned.get('updated', 0) > self.stale_after:
+                limit = (limit + self.initial) / 2
+            state['limit'] = min(self.max_limit, max(self.min_limit, limit))
+            state['latency'] = learned.get('latency', state['latency'])
+            state['error_rate'] = learned.get('error_rate', 0.0)
+
+    def save(self):
+        """Merge the limits learned this run into the file on disk under a cross-process lock, atomically"""
+        if not self.path:
+            return
+        with file_lock(os.path.basename(self.path)):
+            sources = self._read()
+            with self._lock:
+                for name, state in self.sources.items():
+                    if name in self._observed or name not in sources:
+                        sources[name] = {
+                            'limit': round(state['limit'], 3),
+                            'latency': round(state['latency'], 3),
+                            'error_rate': round(state['error_rate'], 4),
+                            'updated': time.time()
+                        }
+            data = {'sources': dict(sorted(sources.items()))}
+            atomic_write(self.path, json.dumps(data, indent=2).encode('utf-8'))
+
+    def state(self, source):
+        if source not in self.sources:
+            self.sources[source] = {
+                'limit': self.initial,
+                'latency': 1.0,
+                'error_rate': 0.0,
+                'in_flight': 0,
+                'next_start': 0.0,
+                'last_decrease': 0.0
+            }
+        return self.sources[source]
+
+    def limit(self, source):
+        with self._lock:
+            return self.state(source)['limit']
+
+    def _try_start(self, source):
+        """Seconds to wait before the next start, or 0 after taking a slot"""
+        with self._lock:
+            state = self.state(source)
+            now = time.monotonic()
+            if state['in_flight'] >= max(1, int(state['limit'])):
+                return 0.05
+            if now < state['next_start']:
+                return state['next_start'] - now
+
+            state['in_flight'] += 1
+            interval = max(self.min_interval, state['latency'] / state['limit'])
+            state['next_start'] = now + interval * random.uniform(0.8, 1.2)
+            return 0
+
+    def _finish(self, source, outcome, latency, retry_after=None):
+        with self._lock:
+            state = self.state(source)
+            state['in_flight'] -= 1
+            if outcome == 'neutral':
+                return
+
+            self._observed.add(source)
+            failed = outcome == 'backoff'
+            state['error_rate'] = 0.9 * state['error_rate'] + 0.1 * failed
+            if not failed:
+                state['latency'] = 0.8 * state['latency'] + 0.2 * latency
+                if latency <= self.latency_target and state['error_rate'] < 0.1:
+                    state['limit'] = min(self.max_limit, state['limit'] + self.increase / state['limit'])
+                return
+
+            now = time.monotonic()
+            # One decrease per round trip, however many requests of the same burst fail
+            if now - state['last_decrease'] >= state['latency']:
+                before = state['limit']
+                state['limit'] = max(self.min_limit, state['limit'] * self.decrease)
+                state['last_decrease'] = now
+                print(f"      🐢 {source}: backing off, concurrency {before:.1f} → {state['limit']:.1f}")
+            pause = retry_after if retry_after else 2 * state['latency']
+            state['next_start'] = max(state['next_start'], now + min(pause, 120))
+
+    def _outcome_of(self, error, feedback):
+        if isinstance(error, TIMEOUT_ERRORS):
+            return 'backoff'
+        return 'neutral' if error else feedback.outcome
+
+    @contextmanager
+    def sync_slot(self, source):
+        """Block until source has capacity; report the response through the yielded Feedback"""
+        while True:
+            wait = self._try_start(source)
+            if not wait:
+                break
+            time.sleep(wait)
+
+        feedback = Feedback()
+        started = time.monotonic()
+        error = None
+        try:
+            yield feedback
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(source, self._outcome_of(error, feedback), time.monotonic() - started, feedback.retry_after)
+
+    @asynccontextmanager
+    async def slot(self, source):
+        """Async variant of sync_slot"""
+        while True:
+            wait = self._try_start(source)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+
+        feedback = Feedback()
+        started = time.monotonic()
+        error = None
+        try:
+            yield feedback
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(source, self._outcome_of(error, feedback), time.monotonic() - started, feedback.retry_after)
+
+    def report(self):
+        """One line with each source's learned concurrency"""
+        with self._lock:
+            parts = [f"{name} {state['limit']:.1f}" for name, state in sorted(self.sources.items())]
+        if parts:
+            print(f"📈 Search concurrency learned: {', '.join(parts)}")
+
+    def close(self):
+        self.report()
+        self.save()
@@ -0,0 +1,130 @@
+"""
+Numpy image-content analysis for logo likelihood
+
+Works on small fixed-size RGBA thumbnails so a whole batch of candidates
+is analysed with a handful of array operations.
+"""
+
+import numpy as np
+from PIL import Image
+
+from .decoding import open_proxy
+
+THUMBNAIL_SIZE = 64
+
+# Quantize each channel to 4 bits for color counting (4096 bins)
+COLOR_BITS = 4
+
+
+class LogoContentAnalyzer:
+    """
+    Content features that separate logos from photos and screenshots.
+
+    alpha_coverage    fraction of visible (non-transparent) pixels
+    color_count       distinct quantized colors among visible pixels
+    color_entropy     Shannon entropy (bits) of the quantized color histogram
+    edge_density      fraction of pixels on a strong luminance edge
+    stroke_ratio      light/dark transitions per pixel along rows (text-like strokes)
+    border_uniformity 1.0 for a flat or transparent frame, towards 0 for busy borders
+    """
+
+    def __init__(self, size=THUMBNAIL_SIZE):
+        self.size = size
+
+    def thumbnail(self, img):
+        """Fixed-size RGBA thumbnail array of a PIL image"""
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        return np.asarray(img.resize((self.size, self.size), Image.Resampling.BILINEAR), dtype=np.uint8)
+
+    def thumbnails(self, images):
+        return np.stack([self.thumbnail(img) for img in images])
+
+    def features(self, batch):
+        """Feature arrays for an (N, size, size, 4) uint8 batch"""
+        n = batch.shape[0]
+        rgb = batch[..., :3].astype(np.float32)
+        alpha = batch[..., 3].astype(np.float32) / 255.0
+        visible = alpha > 0.06
+        
+        # Composite onto white so transparent areas read as background
+        luma = (rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)) * alpha + 255.0 * (1.0 - alpha)
+        
+        alpha_coverage = visible.mean(axis=(1, 2))
+        
+        # Per-image color histograms in one bincount using per-image offsets
+        shift = 8 - COLOR_BITS
+        q = batch[..., :3] >> shift
+        codes = (q[..., 0].astype(np.int32) << (2 * COLOR_BITS)) | (q[..., 1].astype(np.int32) << COLOR_BITS) | q[..., 2]
+        bins = 1 << (3 * COLOR_BITS)
+        offsets = (np.arange(n, dtype=np.int64) * bins)[:, None, None]
+        hist = np.bincount((codes + offsets)[visible], minlength=n * bins).reshape(n, bins).astype(np.float64)
+        totals = np.maximum(hist.sum(axis=1, keepdims=True), 1.0)
+        p = hist / totals
+        with np.errstate(divide='ignore', invalid='ignore'):
+            color_entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+        color_count = (hist > 0).sum(axis=1)
+        
+        # Luminance gradients
+        gx = np.abs(np.diff(luma, axis=2))[:, :-1, :]
+        gy = np.abs(np.diff(luma, axis=1))[:, :, :-1]
+        edge_density = ((gx + gy) > 48.0).mean(axis=(1, 2))
+        
+        # Row-wise light/dark transitions around each image's mean luminance
+        binary = luma > luma.mean(axis=(1, 2), keepdims=True)
+        stroke_ratio = (binary[:, :, 1:] != binary[:, :, :-1]).mean(axis=(1, 2))
+        
+        # Border frame: flat color or fully transparent
+        frame = np.concatenate([batch[:, 0, :, :], batch[:, -1, :, :], batch[:, :, 0, :], batch[:, :, -1, :]], axis=1)
+        frame = frame.astype(np.float32)
+        frame_alpha = frame[..., 3] / 255.0
+        frame_std = frame[..., :3].std(axis=1).mean(axis=1)
+        transparent_frame = frame_alpha.mean(axis=1) < 0.06
+        border_uniformity = np.where(transparent_frame, 1.0, 1.0 - np.clip(frame_std / 64.0, 0.0, 1.0))
+        
+        return {
+            'alpha_coverage': alpha_coverage,
+            'color_count': color_count,
+            'color_entropy': color_entropy,
+            'edge_density': edge_density,
+            'stroke_ratio': stroke_ratio,
+            'border_uniformity': border_uniformity,
+        }
+
+    def likelihood(self, features):
+        """Combine features into a 0..1 logo likelihood per image"""
+        flatness = 1.0 - np.clip((features['color_entropy'] - 3.0) / 5.0, 0.0, 1.0)
+        palette = 1.0 - np.clip((features['color_count'] - 16) / 240.0, 0.0, 1.0)
+        transparency = (features['alpha_coverage'] < 0.98).astype(np.float64)
+        edges = 1.0 - np.clip(np.abs(features['edge_density'] - 0.12) / 0.12, 0.0, 1.0)
+        strokes = np.clip(features['stroke_ratio'] / 0.08, 0.0, 1.0)
+        
+        score = (0.25 * flatness + 0.15 * palette + 0.25 * features['border_uniformity'] +
+                 0.10 * transparency + 0.15 * edges + 0.10 * strokes)
+        
+        # Blank images are not logos
+        blank = (features['alpha_coverage'] < 0.01) | (features['edge_density'] == 0)
+        return np.where(blank, 0.0, score)
+
+    def analyze(self, images):
+        """(features, likelihood) for a list of PIL images"""
+        if not images:
+            return {}, np.zeros(0)
+        features = self.features(self.thumbnails(images))
+        return features, self.likelihood(features)
+
+    def analyze_files(self, paths):
+        """Logo likelihood for image files; unreadable files get 0"""
+        thumbs = []
+        readable = []
+        for path in paths:
+            try:
+                thumbs.append(self.thumbnail(open_proxy(path)))
+                readable.append(True)
+            except Exception:
+                readable.append(False)
+        
+        likelihood = np.zeros(len(paths))
+        if thumbs:
+            likelihood[np.array(readable)] = self.likelihood(self.features(np.stack(thumbs)))
+        return likelihood
@@ -0,0 +1,57 @@
+"""
+Rectangle packing and compositing for logo sprite atlases
+"""
+
+from PIL import Image
+
+
+def pack_shelves(sizes, max_width=1024, max_height=1024, padding=2):
+    """
+    Shelf packing, first fit by decreasing height.
+
+    Rectangles are placed left to right on horizontal shelves, tallest
+    first, opening a new shelf (or a new page once max_height is reached)
+    when nothing fits. Returns (pages, placements): the (width, height) of
+    each page and, for each input size, its (page, x, y).
+    """
+    pages = []
+    placements = [None] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+
+    for i in order:
+        width, height = sizes[i]
+        if width > max_width or height > max_height:
+            raise ValueError(f"{width}x{height} does not fit a {max_width}x{max_height} atlas")
+        placements[i] = _place(pages, width, height, max_width, max_height, padding)
+
+    dimensions = []
+    for page in pages:
+        used_width = max(shelf['x'] for shelf in page['shelves']) - padding
+        dimensions.append((used_width, page['height'] - padding))
+    return dimensions, placements
+
+
+def _place(pages, width, height, max_width, max_height, padding):
+    for index, page in enumerate(pages):
+        for shelf in page['shelves']:
+            if height <= shelf['height'] and shelf['x'] + width <= max_width:
+                x = shelf['x']
+                shelf['x'] += width + padding
+                return index, x, shelf['y']
+
+        if page['height'] + height <= max_height:
+            y = page['height']
+            page['shelves'].append({'y': y, 'height': height, 'x': width + padding})
+            page['height'] += height + padding
+            return index, 0, y
+
+    pages.append({'shelves': [{'y': 0, 'height': height, 'x': width + padding}], 'height': height + padding})
+    return len(pages) - 1, 0, 0
+
+
+def compose_atlas(size, images, offsets):
+    """Paste RGBA images at their (x, y) offsets onto a transparent page"""
+    atlas = Image.new('RGBA', size, (0, 0, 0, 0))
+    for img, offset in zip(images, offsets):
+        atlas.paste(img, offset)
+    return atlas
@@ -0,0 +1,175 @@
+"""
+Bounded-memory top-K tracking of downloaded logo candidates, spilling to disk
+"""
+
+import heapq
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+
+MB = 1024 * 1024
+
+
+class CandidatePool:
+    """
+    Byte budget shared by every casino being hunted at once.
+
+    Candidates hold only their compressed download plus a small metadata
+    record. While the pool is under `budget` bytes they stay in memory;
+    past it, new candidates are written to a scratch directory and read
+    back only if they win. Each casino takes a TopCandidates holder from
+    the pool and closes it when the casino is done.
+    """
+
+    def __init__(self, budget=64 * MB, spill_dir=None):
+        self.budget = budget
+        self.spill_root = spill_dir
+        self.in_memory = 0
+        self.stats = {'held': 0, 'spilled': 0, 'spilled_bytes': 0, 'peak': 0}
+        self._spill_dir = None
+        self._lock = threading.Lock()
+
+    def holder(self, keep=1):
+        return TopCandidates(self, keep)
+
+    def _store(self, data):
+        """('memory', data) within budget, else ('disk', path)"""
+        with self._lock:
+            self.stats['held'] += 1
+            if self.in_memory + len(data) <= self.budget:
+                self.in_memory += len(data)
+                self.stats['peak'] = max(self.stats['peak'], self.in_memory)
+                return 'memory', data
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix='logo-candidates-', dir=self.spill_root)
+            self.stats['spilled'] += 1
+            self.stats['spilled_bytes'] += len(data)
+            spill_dir = self._spill_dir
+
+        fd, path = tempfile.mkstemp(dir=spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return 'disk', path
+
+    def _load(self, location, value):
+        if location == 'memory':
+            return value
+        with open(value, 'rb') as f:
+            return f.read()
+
+    def _release(self, location, value, size):
+        if location == 'memory':
+            with self._lock:
+                self.in_memory -= size
+        else:
+            try:
+                os.unlink(value)
+            except OSError:
+                pass
+
+    def report(self):
+        if self.stats['spilled']:
+            print(f"💽 Candidate spill: {self.stats['spilled']} of {self.stats['held']} candidates "
+                  f"({self.stats['spilled_bytes'] // 1024} KB) went to scratch storage")
+
+    def close(self):
+        self.report()
+        with self._lock:
+            spill_dir, self._spill_dir = self._spill_dir, None
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+class Candidate:
+    """One candidate's stored bytes and metadata"""
+
+    __slots__ = ('pool', 'location', 'value', 'size', 'meta', 'score', 'seq')
+
+    def __init__(self, pool, data, meta, seq):
+        self.pool = pool
+        self.location, self.value = pool._store(data)
+        self.size = len(data)
+        self.meta = meta
+        self.score = None
+        self.seq = seq
+
+    @property
+    def data(self):
+        return self.pool._load(self.location, self.value)
+
+    def release(self):
+        if self.value is not None:
+            self.pool._release(self.location, self.value, self.size)
+            self.value = None
+
+
+class TopCandidates:
+    """
+    The `keep` best-scoring candidates of one casino.
+
+    offer() scores and keeps in one step. stash() holds an unscored
+    candidate until score() is called, for callers that score a whole
+    batch at once. Lower-ranked candidates are released as soon as they
+    fall out of the top K. Equal scores keep the candidate offered (or
+    ordered) first.
+    """
+
+    def __init__(self, pool, keep=1):
+        self.pool = pool
+        self.keep = keep
+        self._heap = []
+        self._stashed = set()
+        self._seq = itertools.count()
+
+    def stash(self, data, order=None, **meta):
+        """Hold an unscored candidate; `order` breaks score ties (default: stash order)"""
+        candidate = Candidate(self.pool, data, meta, next(self._seq) if order is None else order)
+        self._stashed.add(candidate)
+        return candidate
+
+    def score(self, candidate, score):
+        """Rank a stashed candidate; returns True if it is in the top K"""
+        self._stashed.discard(candidate)
+        candidate.score = score
+        # Lowest score first, and among equals the latest offered
+        heapq.heappush(self._heap, (score, -candidate.seq, candidate))
+        while len(self._heap) > self.keep:
+            _, _, dropped = heapq.heappop(self._heap)
+            dropped.release()
+            if dropped is candidate:
+                return False
+        return True
+
+    def offer(self, score, data, **meta):
+        if len(self._heap) >= self.keep and score <= self._heap[0][0]:
+            return False
+        return self.score(self.stash(data, **meta), score)
+
+    @property
+    def best_score(self):
+        return max((score for score, _, _ in self._heap), default=0)
+
+    def ranked(self):
+        """Kept candidates, best first"""
+        return [c for _, _, c in sorted(self._heap, key=lambda item: (-item[0], -item[1]))]
+
+    def best(self):
+        """(score, data, meta) of the best candidate, or (0, None, {}) when there is none"""
+        ranked = self.ranked()
+        if not ranked:
+            return 0, None, {}
+        return ranked[0].score, ranked[0].data, ranked[0].meta
+
+    def close(self):
+        for candidate in list(self._stashed) + [c for _, _, c in self._heap]:
+            candidate.release()
+        self._stashed.clear()
+        self._heap = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,469 @@
+"""
+Record and replay every HTTP exchange of a finder run for repeatable, offline runs
+"""
+
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import aiohttp
+    from multidict import CIMultiDict, CIMultiDictProxy
+    from yarl import URL
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+INDEX_FILE = 'exchanges.jsonl'
+BODIES_DIR = 'bodies'
+
+# Replayed bodies are already decoded, so these no longer describe them
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+# Resolving hosts replay as a TEST-NET address that is never connected to
+REPLAY_ADDRESS = '192.0.2.1'
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest() if data else None
+
+
+def _request_bytes(body):
+    if body is None:
+        return b''
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    return json.dumps(body, sort_keys=True).encode('utf-8')
+
+
+class Cassette:
+    """
+    A directory of recorded HTTP exchanges.
+
+    In record mode every requests and aiohttp exchange (and every DNS
+    lookup) of the run is performed for real and appended to
+    exchanges.jsonl: method, URL, request body digest, status, headers,
+    latency and the digest of the response body. Bodies are stored once
+    per digest under bodies/, gzipped when that makes them smaller, so
+    the logo every search engine returns costs one file.
+
+    In replay mode nothing touches the network. Each request is answered
+    with the next recording of the same method, URL and body (the last
+    one once they run out), after the recorded latency when latency is
+    'original' or at once when it is 'none'. Unrecorded requests fail
+    like a refused connection.
+
+    Either way, isolate() moves the finder's shared state to a scratch
+    directory, so a cassette run never publishes logos, rewrites
+    casinos.json or the manifest, or caches what a replay miss looked like.
+    """
+
+    def __init__(self, path, mode='replay', latency='original'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = str(path)
+        self.mode = mode
+        self.latency = latency
+        self.bodies_dir = os.path.join(self.path, BODIES_DIR)
+        self.index_file = os.path.join(self.path, INDEX_FILE)
+        self.stats = {'exchanges': 0, 'bodies': 0, 'bytes': 0, 'missing': 0}
+        self._recordings = {}
+        self._cursors = {}
+        self._hosts = {}
+        self._index = None
+        self._patches = []
+        self.scratch_dir = None
+        self._lock = threading.Lock()
+
+        if mode == 'record':
+            os.makedirs(self.bodies_dir, exist_ok=True)
+            self._index = open(self.index_file, 'w', encoding='utf-8')
+        else:
+            self.load()
+
+    @classmethod
+    def from_args(cls, args, finder=None):
+        """The cassette selected by --record / --replay, installed and isolating finder; None when neither is given"""
+        if args.record:
+            cassette = cls(args.record, 'record')
+        elif args.replay:
+            cassette = cls(args.replay, 'replay', args.replay_latency)
+        else:
+            return None
+        if finder is not None:
+            cassette.isolate(finder)
+        cassette.install()
+        return cassette
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    # Storage
+
+    def load(self):
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry['method'] == 'DNS':
+                    self._hosts[entry['url']] = entry
+                else:
+                    self._recordings.setdefault(self._key(entry), []).append(entry)
+        total = sum(len(entries) for entries in self._recordings.values())
+        print(f"📼 Replaying {total} exchanges from {os.path.basename(self.path)} (latency: {self.latency})")
+
+    def _body_path(self, digest):
+        return os.path.join(self.bodies_dir, digest[:2], digest)
+
+    def _store_body(self, body):
+        digest = _digest(body)
+        if not digest:
+            return None
+        path = self._body_path(digest)
+        if os.path.exists(path) or os.path.exists(f"{path}.gz"):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        packed = gzip.compress(body, 6)
+        if len(packed) < len(body) * 0.9:
+            path, body = f"{path}.gz", packed
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(body)
+        os.replace(f"{path}.tmp", path)
+        self.stats['bodies'] += 1
+        self.stats['bytes'] += len(body)
+        return digest
+
+    def _load_body(self, digest):
+        if not digest:
+            return b''
+        path = self._body_path(digest)
+        if os.path.exists(f"{path}.gz"):
+            with open(f"{path}.gz", 'rb') as f:
+                return gzip.decompress(f.read())
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _key(entry):
+        return entry['method'], entry['url'], entry['request']
+
+    def _record(self, method, url, request_body, started, status=None, reason=None, headers=None, body=b'',
+                error=None):
+        entry = {
+            'method': method.upper(),
+            'url': url,
+            'request': _digest(request_body),
+            'status': status,
+            'reason': reason,
+            'headers': {k: v for k, v in (headers or {}).items() if k.lower() not in DROPPED_HEADERS},
+            'latency': round(time.monotonic() - started, 4),
+            'error': error
+        }
+        with self._lock:
+            entry['body'] = self._store_body(body)
+            self._index.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index.flush()
+            self.stats['exchanges'] += 1
+        return entry
+
+    def _next(self, method, url, request_body):
+        """The recording that answers this request, or None"""
+        key = (method.upper(), url, _digest(request_body))
+        with self._lock:
+            entries = self._recordings.get(key)
+            if not entries:
+                self.stats['missing'] += 1
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = min(cursor + 1, len(entries) - 1)
+            self.stats['exchanges'] += 1
+            return entries[cursor]
+
+    def _delay(self, entry):
+        return entry['latency'] if self.latency == 'original' else 0
+
+    # requests
+
+    def _requests_response(self, request, entry, body):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=entry['latency'])
+        return response
+
+    def _requests_send(self, original):
+        cassette = self
+
+        def send(adapter, request, **kwargs):
+            body = _request_bytes(request.body)
+            if cassette.mode == 'replay':
+                entry = cassette._next(request.method, request.url, body)
+                if entry is None:
+                    raise requests.ConnectionError(f"Not in cassette: {request.method} {request.url}", request=request)
+                time.sleep(cassette._delay(entry))
+                if entry['error'] == 'timeout':
+                    raise requests.Timeout(f"Recorded timeout: {request.url}", request=request)
+                if entry['error']:
+                    raise requests.ConnectionError(f"Recorded failure: {request.url}", request=request)
+                return cassette._requests_response(request, entry, cassette._load_body(entry['body']))
+
+            started = time.monotonic()
+            try:
+                response = original(adapter, request, **kwargs)
+                content = response.content
+            except requests.Timeout:
+                cassette._record(request.method, request.url, body, started, error='timeout')
+                raise
+            except requests.RequestException:
+                cassette._record(request.method, request.url, body, started, error='connection')
+                raise
+            entry = cassette._record(request.method, request.url, body, started, response.status_code,
+                                     response.reason, response.headers, content)
+            return cassette._requests_response(request, entry, content)
+
+        return send
+
+    # aiohttp
+
+    def _aiohttp_request(self, original):
+        cassette = self
+
+        async def _request(session, method, str_or_url, **kwargs):
+            url = URL(str_or_url)
+            if kwargs.get('params'):
+                url = url.update_query(kwargs['params'])
+            url = str(url)
+            body = _request_bytes(kwargs.get('data') if kwargs.get('json') is None else kwargs['json'])
+
+            if cassette.mode == 'replay':
+                entry = cassette._next(method, url, body)
+                if entry is None:
+                    raise aiohttp.ClientConnectionError(f"Not in cassette: {method} {url}")
+                await asyncio.sleep(cassette._delay(entry))
+                if entry['error'] == 'timeout':
+                    raise asyncio.TimeoutError(f"Recorded timeout: {url}")
+                if entry['error']:
+                    raise aiohttp.ClientConnectionError(f"Recorded failure: {url}")
+                return ReplayedResponse(url, entry, cassette._load_body(entry['body']))
+
+            started = time.monotonic()
+            try:
+                response = await original(session, method, str_or_url, **kwargs)
+                try:
+                    content = await response.read()
+                finally:
+                    response.release()
+            except asyncio.TimeoutError:
+                cassette._record(method, url, body, started, error='timeout')
+                raise
+            except aiohttp.ClientError:
+                cassette._record(method, url, body, started, error='connection')
+                raise
+            entry = cassette._record(method, url, body, started, response.status, response.reason,
+                                     response.headers, content)
+            return ReplayedResponse(url, entry, content)
+
+        return _request
+
+    # DNS
+
+    def _getaddrinfo(self, original):
+        cassette = self
+
+        def getaddrinfo(host, port, *args, **kwargs):
+            name = host.decode('ascii') if isinstance(host, bytes) else str(host)
+            if cassette.mode == 'replay':
+                entry = cassette._hosts.get(name)
+                if entry is None or entry['error']:
+                    raise socket.gaierror(socket.EAI_NONAME, f"Not resolvable in cassette: {name}")
+                time.sleep(cassette._delay(entry))
+                return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (REPLAY_ADDRESS, port or 0))]
+
+            started = time.monotonic()
+            try:
+                result = original(host, port, *args, **kwargs)
+            except socket.gaierror as e:
+                # Transient lookup failures are retried by the finders, so only record real answers
+                if e.errno != socket.EAI_AGAIN:
+                    cassette._record_host(name, started, 'nxdomain')
+                raise
+            cassette._record_host(name, started, None)
+            return result
+
+        return getaddrinfo
+
+    def _record_host(self, name, started, error):
+        with self._lock:
+            if name in self._hosts:
+                return
+            self._hosts[name] = True
+        self._record('DNS', name, b'', started, error=error)
+
+    # Isolation
+
+    def isolate(self, finder):
+        """
+        Point a finder's manifest, publisher, results and caches at a scratch directory.
+
+        The manifest and casinos.json are copied there, so the run starts
+        from the live state but leaves it untouched; logos are published
+        into an empty directory. The probe cache is dropped so every probe
+        goes through the cassette (and is recorded), and a replay doesn't
+        save learned search limits, since replayed latencies say nothing
+        about the live engines.
+        """
+        self.scratch_dir = tempfile.mkdtemp(prefix='cassette-run-')
+        logos_dir = os.path.join(self.scratch_dir, 'logos')
+
+        def scratch_copy(path):
+            copy = os.path.join(self.scratch_dir, os.path.basename(path))
+            if os.path.exists(path):
+                shutil.copy2(path, copy)
+            return copy
+
+        finder.manifest.path = scratch_copy(finder.manifest.path)
+        finder.publisher.logos_dir = logos_dir
+        if finder.publisher.casinos_file:
+            finder.publisher.casinos_file = scratch_copy(finder.publisher.casinos_file)
+        finder.logos_dir = logos_dir
+        finder.results.path = os.path.join(self.scratch_dir, os.path.basename(finder.results.path))
+
+        prober = getattr(finder, 'prober', None)
+        if prober is not None:
+            prober.cache = None
+        search_limits = getattr(finder, 'search_limits', None)
+        if search_limits is not None and self.replaying:
+            search_limits.path = None
+
+        print(f"📼 Cassette run writes to {self.scratch_dir}, live data is left untouched")
+
+    # Installation
+
+    def _patch(self, owner, name, replacement):
+        self._patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def install(self):
+        """Route requests, aiohttp and DNS lookups through the cassette"""
+        self._patch(HTTPAdapter, 'send', self._requests_send(HTTPAdapter.send))
+        self._patch(socket, 'getaddrinfo', self._getaddrinfo(socket.getaddrinfo))
+        if AIOHTTP_AVAILABLE:
+            self._patch(aiohttp.ClientSession, '_request', self._aiohttp_request(aiohttp.ClientSession._request))
+        if self.mode == 'record':
+            print(f"📼 Recording HTTP exchanges to {self.path}")
+
+    def close(self):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+        if self.mode == 'record':
+            self._index.close()
+            print(f"📼 Recorded {self.stats['exchanges']} exchanges, {self.stats['bodies']} new bodies "
+                  f"({self.stats['bytes'] // 1024} KB)")
+        else:
+            print(f"📼 Replayed {self.stats['exchanges']} exchanges, {self.stats['missing']} not in cassette")
+        if self.scratch_dir:
+            print(f"📼 Run output kept in {self.scratch_dir}")
+
+
+class ReplayedStream:
+    """The parts of aiohttp's StreamReader the finders read from"""
+
+    def __init__(self, body):
+        self._body = io.BytesIO(body)
+
+    async def read(self, n=-1):
+        return self._body.read(n)
+
+    async def iter_chunked(self, n):
+        while True:
+            chunk = self._body.read(n)
+            if not chunk:
+                return
+            yield chunk
+
+
+class ReplayedResponse:
+    """A fully read aiohttp response served from the cassette"""
+
+    def __init__(self, url, entry, body):
+        self.url = URL(url)
+        self.method = entry['method']
+        self.status = entry['status']
+        self.reason = entry['reason']
+        self.headers = CIMultiDictProxy(CIMultiDict(entry['headers']))
+        self.content = ReplayedStream(body)
+        self._body = body
+
+    @property
+    def charset(self):
+        content_type = self.headers.get('content-type', '')
+        for part in content_type.split(';')[1:]:
+            key, _, value = part.strip().partition('=')
+            if key.lower() == 'charset':
+                return value.strip('"\' ')
+        return None
+
+    async def read(self):
+        return self._body
+
+    async def text(self, encoding=None, errors='replace'):
+        return self._body.decode(encoding or self.charset or 'utf-8', errors)
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message=self.reason or '')
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_for_close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+def add_cassette_arguments(parser):
+    """Add the --record / --replay options shared by the finder scripts"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="DIR",
+                       help="Record every HTTP exchange of this run into a cassette, e.g. data/cassettes/baseline")
+    group.add_argument("--replay", metavar="DIR", help="Serve every HTTP exchange from a recorded cassette, offline")
+    parser.add_argument("--replay-latency", choices=('original', 'none'), default='original',
+                        help="Replay with the recorded latencies or without any delay")
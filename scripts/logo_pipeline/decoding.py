@@ -0,0 +1,58 @@
+"""
+Reduced decoding for validation and scoring
+
+Validation only needs the header and scoring only needs a small proxy,
+so candidates are never fully decoded; only the winning candidate is
+decoded (and resized) when it is saved.
+"""
+
+import io
+
+from PIL import Image
+
+PROXY_SIZE = 128
+
+
+def _open(source):
+    """Open bytes or a path lazily (PIL reads only the header here)"""
+    if isinstance(source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+
+def read_header(source):
+    """(width, height, format) from the image header, without decoding pixels"""
+    with _open(source) as img:
+        return img.size[0], img.size[1], img.format
+
+
+def fit_within(width, height, max_side):
+    """Dimensions after an aspect-preserving thumbnail into a max_side box"""
+    if width <= max_side and height <= max_side:
+        return width, height
+    scale = max_side / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _reduced(img, max_side, resample):
+    """Decode at reduced size: DCT scaling for JPEG, integer reduce() elsewhere"""
+    # draft() only affects JPEG (and a few other formats); it's a no-op otherwise
+    img.draft(None, (max_side, max_side))
+    # Load now: when no conversion or resize is needed, img itself is returned after its file closes
+    img.load()
+    if img.mode in ('P', '1', 'LA', 'PA', 'I;16'):
+        img = img.convert('RGBA')
+    img.thumbnail((max_side, max_side), resample, reducing_gap=2.0)
+    return img if img.mode == 'RGBA' else img.convert('RGBA')
+
+
+def open_proxy(source, max_side=PROXY_SIZE):
+    """Small RGBA proxy (at most max_side per side) for validation and scoring"""
+    with _open(source) as img:
+        return _reduced(img, max_side, Image.Resampling.BILINEAR)
+
+
+def decode_logo(source, max_side=800):
+    """Final RGBA logo for saving, decoded only as large as max_side needs"""
+    with _open(source) as img:
+        return _reduced(img, max_side, Image.Resampling.LANCZOS)
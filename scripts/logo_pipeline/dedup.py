@@ -0,0 +1,177 @@
+"""
+URL normalisation and a per-run seen-set for cross-source candidate deduplication
+"""
+
+import hashlib
+import math
+import re
+import threading
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+# Query parameters that only track the click
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref_src'
+}
+TRACKING_PREFIXES = ('utm_', '_ga', '_hs')
+
+# Query parameters known image CDNs use to resize or re-encode the same file.
+# Elsewhere keys like size= or format= may select a different image, so they stay.
+RESIZE_PARAMS = (
+    (re.compile(r'^i[0-3]\.wp\.com$'), {'w', 'h', 'resize', 'fit', 'crop', 'quality', 'ssl', 'strip', 'zoom'}),
+    (re.compile(r'^tse\d*\.mm\.bing\.net$'), {'w', 'h', 'c', 'rs', 'qlt', 'o', 'dpr', 'pid', 'p'}),
+    (re.compile(r'(^|\.)imgix\.net$'), {'w', 'h', 'fit', 'crop', 'auto', 'fm', 'q', 'dpr'}),
+    (re.compile(r'^cdn\.shopify\.com$'), {'v', 'width', 'height'}),
+)
+
+# Proxy CDNs that embed the origin URL in their path (i0.wp.com/example.com/logo.png)
+PROXY_HOSTS = re.compile(r'^i[0-3]\.wp\.com$')
+# Numbered shards of one CDN (tse1.mm.bing.net, tse4.mm.bing.net)
+SHARDED_HOST = re.compile(r'^([a-z]+)\d+\.((?:mm\.bing\.net|gstatic\.com|googleusercontent\.com))$')
+
+
+def resize_params(host):
+    """The resize parameters the CDN serving `host` ignores for identity, empty for other hosts"""
+    for pattern, params in RESIZE_PARAMS:
+        if pattern.search(host):
+            return params
+    return set()
+
+
+def normalize_url(url):
+    """
+    One key for every spelling of the same image URL.
+
+    Scheme and default ports are dropped, the host is lower-cased without
+    www., CDN shard numbers and WordPress photon proxies are collapsed,
+    tracking parameters are removed, resize parameters only on the image
+    CDNs that define them, and the remaining query is sorted. Fragments never reach the server and are dropped.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = (parts.hostname or '').lower().rstrip('.')
+    path = parts.path or '/'
+    resize = resize_params(host)
+
+    if PROXY_HOSTS.match(host):
+        origin, _, rest = path.lstrip('/').partition('/')
+        if '.' in origin:
+            host, path = origin.lower(), '/' + rest
+
+    host = SHARDED_HOST.sub(r'\1.\2', host)
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and key.lower() not in resize
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = re.sub(r'/{2,}', '/', unquote(path))
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, about `error_rate` false positives"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key):
+        return all(self.array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+class SeenUrls:
+    """
+    Candidate URLs already fetched during this run.
+
+    Keys are normalize_url() spellings scoped to a casino, so a logo that
+    DuckDuckGo, Bing and Google all return is downloaded once per casino.
+    fresh() only reserves the URLs it picks; the caller marks each one
+    with add() once it downloaded, or release()s it after a failure so a
+    later source may try it again. An exact set is used up to
+    `exact_limit` keys; past that it moves to a Bloom filter sized for
+    `capacity` keys, so very large runs stay at a fixed few megabytes. A
+    false positive only skips one more candidate.
+    """
+
+    def __init__(self, exact_limit=200_000, capacity=5_000_000, error_rate=0.001):
+        self.exact_limit = exact_limit
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.keys = set()
+        self.pending = set()
+        self.stats = {'fresh': 0, 'skipped': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, scope=''):
+        return f"{scope}\n{normalize_url(url)}"
+
+    def add(self, url, scope=''):
+        """Mark a URL as fetched; False if it (or another spelling of it) already was"""
+        key = self.key(url, scope)
+        with self._lock:
+            self.pending.discard(key)
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+            if isinstance(self.keys, set) and len(self.keys) > self.exact_limit:
+                self._switch_to_bloom()
+            return True
+
+    def release(self, url, scope=''):
+        """Drop fresh()'s reservation of a URL that failed to download, without marking it"""
+        with self._lock:
+            self.pending.discard(self.key(url, scope))
+
+    def _reserve(self, url, scope):
+        key = self.key(url, scope)
+        with self._lock:
+            if key in self.pending or key in self.keys:
+                self.stats['skipped'] += 1
+                return False
+            self.pending.add(key)
+            self.stats['fresh'] += 1
+            return True
+
+    def _switch_to_bloom(self):
+        bloom = BloomFilter(max(self.capacity, self.exact_limit * 2), self.error_rate)
+        for key in self.keys:
+            bloom.add(key)
+        self.keys = bloom
+
+    def fresh(self, urls, scope='', limit=None):
+        """Up to `limit` URLs from `urls`, in order, neither fetched nor reserved before; they are reserved"""
+        picked = []
+        for url in urls:
+            if limit is not None and len(picked) >= limit:
+                break
+            if self._reserve(url, scope):
+                picked.append(url)
+        return picked
+
+    def __len__(self):
+        return len(self.keys)
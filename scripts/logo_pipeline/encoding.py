@@ -0,0 +1,147 @@
+"""
+Process-pool PNG encoding stage, so zlib work overlaps with fetching
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .optimizing import LogoOptimizer
+from .publishing import encode_png
+
+
+def default_workers():
+    """Leave one core for the fetching thread"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def _encode(img, save_options, optimizer):
+    # Runs in a worker process; the image arrives pickled (mode, size, raw pixels)
+    if optimizer is None:
+        return {'png': encode_png(img, **save_options)}
+    return optimizer.encode(img, save_options)
+
+
+class EncodingStage:
+    """
+    Encodes decoded logos to PNG on a process pool and publishes them.
+
+    submit() hands the image to a worker and returns immediately, so the
+    finder can move on to the next casino while optimize=True runs on
+    another core. At most max_pending images (default twice the workers) are in flight; submit()
+    blocks beyond that, which keeps memory bounded when fetching outruns
+    encoding. The optimizer picks each logo's encoding in the worker.
+    When an encode finishes, the PNG is published, the result recorded
+    in the manifest and the submitter's on_done callback called with the
+    published path (None on failure), before drain() returns. Finders
+    count a logo as found there, not when it is queued. workers=0
+    encodes inline.
+    """
+
+    def __init__(self, publisher, manifest=None, finder=None, workers=None, max_pending=None, optimizer=None):
+        self.publisher = publisher
+        self.manifest = manifest
+        self.finder = finder
+        self.workers = default_workers() if workers is None else workers
+        self.max_pending = max_pending
+        self.optimizer = optimizer or LogoOptimizer()
+        self.stats = {'published': 0, 'failed': 0}
+        self._pool = None
+        self._pending = 0
+        self._done = threading.Condition()
+
+    def configure(self, args):
+        """Apply the options added by add_publishing_arguments"""
+        self.publisher.hashed_names = args.hashed_names
+        if args.encode_workers is not None:
+            self.workers = args.encode_workers
+        if args.optimize:
+            self.optimizer = LogoOptimizer(args.byte_budget, args.max_error, args.webp, args.max_side)
+        else:
+            self.optimizer = None
+
+    def submit(self, slug, img, source=None, score=None, details=None, on_done=None, **save_options):
+        """Queue an image for encoding; source, score and details are recorded in the manifest"""
+        if self.workers == 0:
+            path = None
+            try:
+                encoded = _encode(img, save_options, self.optimizer)
+            except Exception as e:
+                self._failed(slug, e)
+            else:
+                path = self.publish(slug, encoded, source, score, details)
+            if on_done:
+                on_done(path)
+            return
+
+        limit = self.max_pending or max(2, self.workers * 2)
+        with self._done:
+            while self._pending >= limit:
+                self._done.wait()
+            self._pending += 1
+
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._pool.submit(_encode, img, save_options, self.optimizer)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda f: self._finish(f, slug, source, score, details, on_done))
+
+    def _finish(self, future, slug, source, score, details, on_done):
+        try:
+            path = None
+            error = future.exception()
+            if error:
+                self._failed(slug, error)
+            else:
+                path = self.publish(slug, future.result(), source, score, details)
+            if on_done:
+                on_done(path)
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._done:
+            self._pending -= 1
+            self._done.notify_all()
+
+    def publish(self, slug, encoded, source=None, score=None, details=None):
+        """Publish an encoded result (as the workers return it) and record it; returns the path or None"""
+        try:
+            path = self.publisher.publish(slug, encoded['png'])
+            if encoded.get('webp'):
+                self.publisher.publish(slug, encoded['webp'], ext='webp')
+        except Exception as e:
+            self._failed(slug, e)
+            return None
+        with self._done:
+            self.stats['published'] += 1
+        choice = f", {encoded['png_choice']}" if 'png_choice' in encoded else ''
+        print(f"        💾 Published: {os.path.basename(path)} ({len(encoded['png'])} bytes{choice})")
+        if self.manifest:
+            self.manifest.record(slug, path, source, score, self.finder, **(details or {}))
+        return path
+
+    def _failed(self, slug, error):
+        with self._done:
+            self.stats['failed'] += 1
+        print(f"        ❌ Encode error for {slug}: {error}")
+        if self.manifest:
+            self.manifest.record_failure(slug, self.finder)
+
+    def drain(self):
+        """Wait until every submitted logo is published"""
+        with self._done:
+            while self._pending:
+                self._done.wait()
+
+    def close(self):
+        """Drain the queue and stop the worker processes"""
+        self.drain()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.stats['published'] or self.stats['failed']:
+            print(f"⚙️  Encoding stage: {self.stats['published']} published, {self.stats['failed']} failed")
@@ -0,0 +1,176 @@
+"""
+Logo manifest for public/images/casinos and incremental refresh runs
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .publishing import atomic_write, file_lock
+
+DAY = 24 * 60 * 60
+
+
+def file_digest(path):
+    """sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LogoManifest:
+    """
+    One entry per casino slug: source, digest, score, fetch time and status.
+
+    A logo is fresh when its last fetch succeeded, the file on disk still
+    has the recorded digest, its score meets the quality threshold and it
+    isn't older than the maximum age. Incremental runs only process the
+    casinos whose logo is not fresh. save() merges the slugs this run
+    touched into the file on disk, so concurrent finders don't drop each
+    other's records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._touched = set()
+        self._lock = threading.Lock()
+        self._batching = 0
+        self.load()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('logos', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable logo manifest {os.path.basename(self.path)}: {e}")
+        return {}
+
+    def load(self):
+        self.entries = self._read()
+
+    def save(self):
+        """Merge this run's records into the file on disk under a cross-process lock, atomically"""
+        with file_lock(os.path.basename(self.path)):
+            with self._lock:
+                touched = self._touched
+                self._touched = set()
+                ours = {slug: self.entries[slug] for slug in touched}
+            
+            try:
+                entries = self._read()
+                entries.update(ours)
+                data = {'logos': dict(sorted(entries.items()))}
+                atomic_write(self.path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+            except BaseException:
+                with self._lock:
+                    self._touched |= touched
+                raise
+            
+            with self._lock:
+                # Pick up other finders' records without losing ones made while writing
+                for slug, entry in entries.items():
+                    if slug not in self._touched:
+                        self.entries[slug] = entry
+
+    @contextmanager
+    def batch(self):
+        """Save once when the block ends instead of after every record, for runs over thousands of slugs"""
+        with self._lock:
+            self._batching += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batching -= 1
+                done = not self._batching
+            if done:
+                self.save()
+
+    def _changed(self):
+        if not self._batching:
+            self.save()
+
+    def record(self, slug, logo_path, source, score, finder, **details):
+        """Record a successfully saved logo; details are stored on the entry as-is"""
+        entry = {
+            'slug': slug,
+            'status': 'ok',
+            'file': os.path.basename(logo_path),
+            'source': source,
+            'digest': file_digest(logo_path),
+            'score': score,
+            'finder': finder,
+            'fetched_at': time.time(),
+            'fetched': time.strftime('%Y-%m-%d %H:%M:%S'),
+            **details
+        }
+        with self._lock:
+            self.entries[slug] = entry
+            self._touched.add(slug)
+        self._changed()
+
+    def record_failure(self, slug, finder):
+        """Record a failed attempt, keeping what is known about the existing logo"""
+        with self._lock:
+            entry = dict(self.entries.get(slug, {'slug': slug}))
+            entry['last_failure'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            entry['last_failure_finder'] = finder
+            if entry.get('status') != 'ok':
+                entry['status'] = 'failed'
+            self.entries[slug] = entry
+            self._touched.add(slug)
+        self._changed()
+
+    def unchanged(self, slug, logos_dir, **details):
+        """True if the slug's logo was recorded with these details and is still on disk as recorded"""
+        entry = self.entries.get(slug)
+        if not entry or entry.get('status') != 'ok':
+            return False
+        if any(entry.get(key) != value for key, value in details.items()):
+            return False
+        try:
+            return file_digest(os.path.join(logos_dir, entry['file'])) == entry['digest']
+        except OSError:
+            return False
+
+    def is_fresh(self, slug, logos_dir, max_age_days=30, min_score=50):
+        entry = self.entries.get(slug)
+        if not entry or entry.get('status') != 'ok':
+            return False
+        
+        if entry.get('score') is None or entry['score'] < min_score:
+            return False
+        
+        if time.time() - entry.get('fetched_at', 0) > max_age_days * DAY:
+            return False
+        
+        logo_path = os.path.join(logos_dir, entry['file'])
+        try:
+            return file_digest(logo_path) == entry['digest']
+        except OSError:
+            return False
+
+    def pending(self, casinos, logos_dir, max_age_days=30, min_score=50):
+        """Casinos whose logo is new, failed, stale, low quality or changed on disk"""
+        todo = [c for c in casinos if not self.is_fresh(c['slug'], logos_dir, max_age_days, min_score)]
+        print(f"♻️  Incremental mode: {len(casinos) - len(todo)} fresh logos skipped, {len(todo)} to process")
+        return todo
+
+
+def add_incremental_arguments(parser):
+    """Add the shared incremental-refresh options to a finder's argument parser"""
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process casinos whose logo is new, failed or stale")
+    parser.add_argument("--max-age-days", type=float, default=30,
+                        help="Logos older than this are refreshed in incremental mode")
+    parser.add_argument("--min-score", type=float, default=50,
+                        help="Logos scoring below this are refreshed in incremental mode")
+    return parser
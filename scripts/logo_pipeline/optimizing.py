@@ -0,0 +1,122 @@
+"""
+Per-logo output encoding chosen against a byte budget and a perceptual-error ceiling
+"""
+
+import io
+
+import numpy as np
+from PIL import Image, features
+
+from .publishing import encode_png
+
+PALETTE_SIZES = (256, 64, 16)
+WEBP_QUALITIES = (90, 75, 60)
+
+# sRGB (D65) to XYZ, rows normalised by the reference white
+_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+], dtype=np.float32) / np.array([[0.95047], [1.0], [1.08883]], dtype=np.float32)
+
+
+def _lab(rgb):
+    """CIELAB for an (..., 3) array of sRGB values in 0..1"""
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _XYZ.T
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def perceptual_error(reference, candidate):
+    """
+    Mean CIE76 delta E over the logo's visible pixels, composited over white
+    and over black since cards use both; the worse of the two is returned.
+    Around 2.3 is a just-noticeable difference.
+    """
+    ref = np.asarray(reference.convert('RGBA'), dtype=np.float32) / 255
+    cand = np.asarray(candidate.convert('RGBA'), dtype=np.float32) / 255
+    visible = np.maximum(ref[..., 3], cand[..., 3]) > 0
+    if not visible.any():
+        return 0.0
+
+    worst = 0.0
+    for background in (1.0, 0.0):
+        ref_lab = _lab(ref[..., :3] * ref[..., 3:] + background * (1 - ref[..., 3:]))
+        cand_lab = _lab(cand[..., :3] * cand[..., 3:] + background * (1 - cand[..., 3:]))
+        delta = np.sqrt(((ref_lab - cand_lab) ** 2).sum(axis=-1))
+        worst = max(worst, float(delta[visible].mean()))
+    return worst
+
+
+class LogoOptimizer:
+    """
+    Picks the encoding of each published logo.
+
+    Candidates are tried from best to worst quality: lossless RGBA (or RGB
+    when fully opaque), then palette PNGs with fewer and fewer colours, and
+    with webp also WebP lossless and lossy. The best-quality candidate that
+    fits byte_budget and stays under max_error (mean delta E) wins; when
+    none fits the budget, the smallest one under max_error is used.
+    Optimizers are pickled to the encoding workers, so keep them plain.
+    """
+
+    def __init__(self, byte_budget=30_000, max_error=2.0, webp=False, max_side=None):
+        self.byte_budget = byte_budget
+        self.max_error = max_error
+        self.webp = webp
+        self.max_side = max_side
+
+    def prepare(self, img):
+        rgba = img.convert('RGBA')
+        if self.max_side and max(rgba.size) > self.max_side:
+            rgba.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS)
+        return rgba
+
+    def png_candidates(self, rgba, save_options):
+        """(label, bytes) from best to worst quality"""
+        opaque = rgba.getextrema()[3] == (255, 255)
+        if opaque:
+            yield 'rgb', encode_png(rgba.convert('RGB'), **save_options)
+        else:
+            yield 'rgba', encode_png(rgba, **save_options)
+
+        for colors in PALETTE_SIZES:
+            # Fast octree is the quantizer that keeps the alpha channel
+            quantized = rgba.quantize(colors, method=Image.Quantize.FASTOCTREE)
+            yield f'palette-{colors}', encode_png(quantized, **save_options)
+
+    def webp_candidates(self, rgba):
+        buffer = io.BytesIO()
+        rgba.save(buffer, 'WEBP', lossless=True)
+        yield 'webp-lossless', buffer.getvalue()
+
+        for quality in WEBP_QUALITIES:
+            buffer = io.BytesIO()
+            rgba.save(buffer, 'WEBP', quality=quality, alpha_quality=100)
+            yield f'webp-{quality}', buffer.getvalue()
+
+    def choose(self, rgba, candidates):
+        """Best-quality candidate within budget, else the smallest acceptable one"""
+        acceptable = []
+        for label, data in candidates:
+            if acceptable:
+                with Image.open(io.BytesIO(data)) as decoded:
+                    error = perceptual_error(rgba, decoded)
+                if error > self.max_error:
+                    continue
+            if len(data) <= self.byte_budget:
+                return label, data
+            acceptable.append((len(data), label, data))
+
+        # The first candidate is lossless, so something is always acceptable
+        _, label, data = min(acceptable)
+        return label, data
+
+    def encode(self, img, save_options):
+        rgba = self.prepare(img)
+        result = {}
+        result['png_choice'], result['png'] = self.choose(rgba, self.png_candidates(rgba, save_options))
+        if self.webp and features.check('webp'):
+            result['webp_choice'], result['webp'] = self.choose(rgba, self.webp_candidates(rgba))
+        return result
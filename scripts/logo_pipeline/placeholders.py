@@ -0,0 +1,188 @@
+"""
+Placeholder logos as parameterized SVG, with a batch PNG path that loads its font once
+"""
+
+import hashlib
+import json
+import os
+from xml.sax.saxutils import escape
+
+import PIL
+from PIL import Image, ImageDraw, ImageFont
+
+from .publishing import encode_png
+
+# Helvetica advance widths (1/1000 em) for ASCII 32-126; Arial and Liberation Sans share them
+HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+)
+
+# Tried in order; the first that exists is loaded once per renderer
+FONT_PATHS = (
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/calibri.ttf",
+    "C:/Windows/Fonts/tahoma.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+)
+
+WIDTH, HEIGHT = 300, 100
+MARGIN = 5
+TEXT_PADDING = 30
+
+# Bump whenever the design changes so every placeholder is rendered again once
+TEMPLATE_VERSION = 1
+
+
+def stable_index(text, count):
+    """Index in range(count) picked by a digest of text; unlike hash(), the same in every process"""
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+class FontMetrics:
+    """Text widths from a per-character advance table, without loading any font"""
+
+    def __init__(self, widths=HELVETICA_WIDTHS, first=32, default=556):
+        self.widths = {chr(first + i): width for i, width in enumerate(widths)}
+        self.default = default
+
+    def width(self, text, size):
+        """Rendered width of text in pixels at a font size"""
+        return sum(self.widths.get(ch, self.default) for ch in text) * size / 1000
+
+
+def base_font_size(brand):
+    """The size the generator has always used: 24px, 20px for long names"""
+    return 20 if len(brand) > 10 else 24
+
+
+def fit_font_size(brand, measure, max_width=WIDTH - 2 * TEXT_PADDING, min_size=10):
+    """Largest size up to base_font_size whose text width fits max_width"""
+    size = base_font_size(brand)
+    width = measure(brand, size)
+    if width > max_width:
+        size = max(min_size, int(size * max_width / width))
+    return size
+
+
+class PlaceholderRenderer:
+    """
+    Draws the generator's placeholder design: a filled, outlined panel
+    with accent bars and dots and the centered brand name with a shadow.
+
+    svg() emits the design as a few hundred bytes of SVG, sizing the text
+    with the metrics table so nothing is measured at render time. png()
+    rasterizes the same design with PIL; the TrueType font is looked up
+    and loaded once per renderer and cached per size, so batches of
+    placeholders skip the font probing entirely.
+    """
+
+    def __init__(self, font_path=None, metrics=None):
+        self.metrics = metrics or FontMetrics()
+        self.font_path = font_path or next((path for path in FONT_PATHS if os.path.exists(path)), None)
+        self._fonts = {}
+
+    def font(self, size):
+        if size not in self._fonts:
+            try:
+                self._fonts[size] = ImageFont.truetype(self.font_path, size)
+            except (OSError, TypeError, ValueError):
+                self._fonts[size] = ImageFont.load_default(size)
+        return self._fonts[size]
+
+    def fingerprint(self, brand, colors, fmt, encoding=None):
+        """
+        Digest of everything that decides a placeholder's bytes: brand,
+        colors, template version and format, plus for PNG the font, the
+        Pillow version and the encoder settings.
+        """
+        parts = {'template': TEMPLATE_VERSION, 'brand': brand, 'colors': colors, 'format': fmt}
+        if fmt == 'png':
+            parts.update(font=os.path.basename(self.font_path or 'default'), pillow=PIL.__version__,
+                         encoding=encoding)
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def svg(self, brand, colors):
+        """Placeholder as SVG bytes"""
+        size = fit_font_size(brand, self.metrics.width)
+        # Baseline so the cap height (about 0.72 em) is centered
+        baseline = round(HEIGHT / 2 + size * 0.36, 1)
+        text = escape(brand)
+        accent = colors['accent']
+        inner = HEIGHT - 2 * MARGIN - 10
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+            f'viewBox="0 0 {WIDTH} {HEIGHT}">'
+            f'<rect x="{MARGIN}" y="{MARGIN}" width="{WIDTH - 2 * MARGIN}" height="{HEIGHT - 2 * MARGIN}" '
+            f'fill="{colors["bg"]}" stroke="{accent}" stroke-width="2"/>'
+            f'<g fill="{accent}">'
+            f'<rect x="{MARGIN + 5}" y="{MARGIN + 5}" width="3" height="{inner}"/>'
+            f'<rect x="{WIDTH - MARGIN - 8}" y="{MARGIN + 5}" width="3" height="{inner}"/>'
+            f'<circle cx="{MARGIN + 16.5}" cy="{MARGIN + HEIGHT // 2}" r="1.5"/>'
+            f'<circle cx="{WIDTH - MARGIN - 16.5}" cy="{MARGIN + HEIGHT // 2}" r="1.5"/></g>'
+            f'<g font-family="Arial,Helvetica,sans-serif" font-size="{size}" text-anchor="middle">'
+            f'<text x="{WIDTH // 2 + 2}" y="{baseline + 2}" fill="#000" fill-opacity=".5">{text}</text>'
+            f'<text x="{WIDTH // 2}" y="{baseline}" fill="{colors["text"]}">{text}</text></g></svg>'
+        )
+        return svg.encode('utf-8')
+
+    def png(self, brand, colors):
+        """Placeholder as an RGBA PIL image"""
+        img = Image.new('RGBA', (WIDTH, HEIGHT), (255, 255, 255, 0))
+        draw = ImageDraw.Draw(img)
+        accent = colors['accent']
+
+        draw.rectangle([MARGIN, MARGIN, WIDTH - MARGIN, HEIGHT - MARGIN], fill=colors['bg'], outline=accent, width=2)
+
+        size = fit_font_size(brand, lambda text, size: self.font(size).getlength(text))
+        font = self.font(size)
+        left, top, right, bottom = draw.textbbox((0, 0), brand, font=font)
+        x = (WIDTH - (right - left)) // 2 - left
+        y = (HEIGHT - (bottom - top)) // 2 - top
+
+        draw.text((x + 2, y + 2), brand, fill=(0, 0, 0, 128), font=font)
+        draw.text((x, y), brand, fill=colors['text'], font=font)
+
+        # Accent bars and dots
+        draw.rectangle([MARGIN + 5, MARGIN + 5, MARGIN + 8, HEIGHT - MARGIN - 5], fill=accent)
+        draw.rectangle([WIDTH - MARGIN - 8, MARGIN + 5, WIDTH - MARGIN - 5, HEIGHT - MARGIN - 5], fill=accent)
+        dot = 3
+        middle = MARGIN + HEIGHT // 2
+        draw.ellipse([MARGIN + 15, middle - dot // 2, MARGIN + 15 + dot, middle + dot // 2], fill=accent)
+        draw.ellipse([WIDTH - MARGIN - 15 - dot, middle - dot // 2, WIDTH - MARGIN - 15, middle + dot // 2],
+                     fill=accent)
+        return img
+
+    def pngs(self, items):
+        """Rasterize (brand, colors) pairs in one pass over the shared fonts"""
+        for brand, colors in items:
+            yield self.png(brand, colors)
+
+
+# One renderer per worker process, so each worker loads its font once
+_worker_renderer = None
+
+
+def render_placeholder(brand, colors, fmt='png', save_options=None, optimizer=None):
+    """
+    Render one placeholder in a worker process. SVG comes back as
+    {'svg': bytes}; PNG is encoded in the worker too (with the optimizer
+    when given) and comes back in EncodingStage's {'png': bytes, ...} form.
+    """
+    global _worker_renderer
+    if _worker_renderer is None:
+        _worker_renderer = PlaceholderRenderer()
+    if fmt == 'svg':
+        return {'svg': _worker_renderer.svg(brand, colors)}
+    img = _worker_renderer.png(brand, colors)
+    if optimizer is None:
+        return {'png': encode_png(img, **(save_options or {}))}
+    return optimizer.encode(img, save_options or {})
@@ -0,0 +1,52 @@
+"""
+Per-host politeness limits for concurrent logo hunting
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+
+class HostThrottle:
+    """Cap in-flight requests per host and space out consecutive requests to it"""
+
+    def __init__(self, per_host=2, min_interval=0.5, jitter=0.5):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._semaphores = {}
+        self._locks = {}
+        self._next_slot = {}
+
+    @staticmethod
+    def host_of(url):
+        """Lower-cased host of a URL (the throttling key)"""
+        return (urlparse(url).hostname or '').lower()
+
+    def _state(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+            self._locks[host] = asyncio.Lock()
+            self._next_slot[host] = 0.0
+        return self._semaphores[host], self._locks[host]
+
+    async def _wait_turn(self, host, lock):
+        """Reserve the next start time for this host and sleep until it"""
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot[host])
+            self._next_slot[host] = start + self.min_interval + random.uniform(0, self.jitter)
+        delay = start - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Hold one of the host's request slots for the duration of the block"""
+        host = self.host_of(url)
+        semaphore, lock = self._state(host)
+        async with semaphore:
+            await self._wait_turn(host, lock)
+            yield
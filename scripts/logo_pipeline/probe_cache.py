@@ -0,0 +1,134 @@
+"""
+Persistent probe-result cache shared across finder runs
+"""
+
+import json
+import os
+import threading
+import time
+
+from .publishing import atomic_write, file_lock
+
+DAY = 24 * 60 * 60
+
+
+class ProbeCache:
+    """
+    Remember which guessed domains resolve and what guessed URLs returned.
+
+    Positive results (resolving domains, 200 responses) live for
+    `positive_ttl` seconds, negative ones (dead domains, 4xx) for
+    `negative_ttl`. Transient failures (timeouts, 429, 5xx) are never
+    cached so the next run retries them. save() merges with whatever
+    concurrently running finders wrote meanwhile, newest check winning.
+    """
+
+    def __init__(self, path, positive_ttl=7 * DAY, negative_ttl=3 * DAY):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.domains = {}
+        self.urls = {}
+        self.dirty = False
+        self._changes = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable probe cache {os.path.basename(self.path)}: {e}")
+        return {}
+
+    def load(self):
+        data = self._read()
+        self.domains = data.get('domains', {})
+        self.urls = data.get('urls', {})
+
+    @staticmethod
+    def _merge(theirs, ours):
+        merged = dict(theirs)
+        for key, entry in ours.items():
+            if key not in merged or merged[key].get('checked_at', 0) <= entry['checked_at']:
+                merged[key] = entry
+        return merged
+
+    def save(self):
+        """Merge with the file on disk under a cross-process lock and write it atomically"""
+        with self._lock:
+            if not self.dirty:
+                return
+            changes = self._changes
+            domains = dict(self.domains)
+            urls = dict(self.urls)
+        
+        with file_lock(os.path.basename(self.path)):
+            on_disk = self._read()
+            now = time.time()
+            data = {
+                'domains': {k: v for k, v in self._merge(on_disk.get('domains', {}), domains).items()
+                            if v['expires_at'] > now},
+                'urls': {k: v for k, v in self._merge(on_disk.get('urls', {}), urls).items()
+                         if v['expires_at'] > now}
+            }
+            atomic_write(self.path, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
+        
+        with self._lock:
+            # Entries set while writing keep the cache dirty for the next save
+            self.domains = self._merge(data['domains'], self.domains)
+            self.urls = self._merge(data['urls'], self.urls)
+            self.dirty = self._changes != changes
+
+    def _fresh(self, table, key):
+        with self._lock:
+            entry = table.get(key)
+        if entry and entry['expires_at'] > time.time():
+            return entry
+        return None
+
+    def get_domain(self, host):
+        """True/False if the host's resolvability is known, None if it must be checked"""
+        entry = self._fresh(self.domains, host)
+        return entry['resolves'] if entry else None
+
+    def set_domain(self, host, resolves):
+        ttl = self.positive_ttl if resolves else self.negative_ttl
+        now = time.time()
+        with self._lock:
+            self.domains[host] = {'resolves': resolves, 'checked_at': now, 'expires_at': now + ttl}
+            self.dirty = True
+            self._changes += 1
+
+    def get_url(self, url):
+        """Cached probe result for a URL, or None if it must be probed"""
+        entry = self._fresh(self.urls, url)
+        if not entry:
+            return None
+        return {
+            'status': entry['status'],
+            'content_type': entry['content_type'],
+            'etag': entry.get('etag'),
+            'error': None
+        }
+
+    def set_url(self, url, result):
+        status = result['status']
+        if status is None or status == 429 or status >= 500:
+            return
+        
+        ttl = self.positive_ttl if status < 400 else self.negative_ttl
+        now = time.time()
+        with self._lock:
+            self.urls[url] = {
+                'status': status,
+                'content_type': result['content_type'],
+                'etag': result.get('etag'),
+                'checked_at': now,
+                'expires_at': now + ttl
+            }
+            self.dirty = True
+            self._changes += 1
@@ -0,0 +1,216 @@
+"""
+Concurrent URL probing with a per-domain DNS short-circuit
+"""
+
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class UrlProber:
+    """
+    HEAD-probe guessed logo URLs in parallel.
+
+    Every host is resolved once up front; URLs on hosts that don't resolve
+    are dropped without any HTTP traffic. The remaining URLs are probed
+    concurrently over one pooled keep-alive session. With a ProbeCache,
+    known domains and URLs are answered from the cache without touching
+    the network.
+
+    Lookups run on their own executor, so getaddrinfo calls that outlive
+    dns_timeout never hold up HEAD probes. probe_async() does the same
+    from an event loop, over the caller's aiohttp session and HostThrottle.
+    """
+
+    def __init__(self, headers=None, timeout=5, dns_timeout=3, max_workers=16, per_host=4, cache=None):
+        self.headers = headers or {}
+        self.cache = cache
+        self.timeout = timeout
+        self.dns_timeout = dns_timeout
+        self.max_workers = max_workers
+        self.per_host = per_host
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._dns_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dns')
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url):
+        return (urlparse(url).hostname or '').lower()
+
+    def _host_slot(self, host):
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _resolve(self, host):
+        """True if the host resolves, False if it doesn't exist, None on a transient failure"""
+        try:
+            return bool(socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM))
+        except socket.gaierror as e:
+            return None if e.errno == socket.EAI_AGAIN else False
+        except (UnicodeError, OSError):
+            return False
+
+    def resolve_domains(self, hosts):
+        """Resolve each host once, concurrently; unresolved or slow hosts count as dead"""
+        alive = {}
+        futures = {}
+        for host in set(hosts):
+            known = self.cache.get_domain(host) if self.cache else None
+            if known is None:
+                futures[host] = self._dns_executor.submit(self._resolve, host)
+            else:
+                alive[host] = known
+        
+        if futures:
+            wait(futures.values(), timeout=self.dns_timeout)
+        
+        for host, future in futures.items():
+            resolved = future.result() if future.done() else None
+            # Lookups still queued are dropped; running ones finish on the DNS executor
+            future.cancel()
+            alive[host] = bool(resolved)
+            if self.cache and resolved is not None:
+                self.cache.set_domain(host, resolved)
+        
+        return alive
+
+    async def resolve_domains_async(self, hosts):
+        """resolve_domains without blocking the event loop or its default executor"""
+        loop = asyncio.get_running_loop()
+        alive = {}
+        futures = {}
+        for host in set(hosts):
+            known = self.cache.get_domain(host) if self.cache else None
+            if known is None:
+                futures[host] = loop.run_in_executor(self._dns_executor, self._resolve, host)
+            else:
+                alive[host] = known
+        
+        if futures:
+            await asyncio.wait(futures.values(), timeout=self.dns_timeout)
+        
+        for host, future in futures.items():
+            resolved = future.result() if future.done() else None
+            future.cancel()
+            alive[host] = bool(resolved)
+            if self.cache and resolved is not None:
+                self.cache.set_domain(host, resolved)
+        
+        return alive
+
+    def _head(self, url, headers):
+        with self._host_slot(self.host_of(url)):
+            try:
+                response = self.session.head(url, headers=headers, timeout=self.timeout)
+                return {
+                    'status': response.status_code,
+                    'content_type': response.headers.get('content-type', '').lower(),
+                    'etag': response.headers.get('etag'),
+                    'error': None
+                }
+            except requests.RequestException as e:
+                return {'status': None, 'content_type': '', 'etag': None, 'error': type(e).__name__}
+
+    async def _head_async(self, session, throttle, url, headers):
+        try:
+            async with throttle.slot(url):
+                async with session.head(url, headers=headers,
+                                        timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    return {
+                        'status': response.status,
+                        'content_type': response.headers.get('content-type', '').lower(),
+                        'etag': response.headers.get('etag'),
+                        'error': None
+                    }
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return {'status': None, 'content_type': '', 'etag': None, 'error': type(e).__name__}
+
+    async def probe_async(self, session, throttle, urls, headers=None):
+        """probe() over an aiohttp session, each request inside the HostThrottle's per-host slots"""
+        headers = headers or self.headers
+        urls = list(dict.fromkeys(urls))
+        alive = await self.resolve_domains_async(self.host_of(url) for url in urls)
+        
+        results = {}
+        pending = []
+        for url in urls:
+            cached = self.cache.get_url(url) if self.cache else None
+            if cached:
+                results[url] = cached
+            elif alive.get(self.host_of(url)):
+                pending.append(url)
+            else:
+                results[url] = {'status': None, 'content_type': '', 'etag': None, 'error': 'dns'}
+        
+        probed = await asyncio.gather(*(self._head_async(session, throttle, url, headers) for url in pending))
+        for url, result in zip(pending, probed):
+            results[url] = result
+            if self.cache:
+                self.cache.set_url(url, result)
+        
+        return results
+
+    def probe(self, urls, headers=None):
+        """Probe URLs and return {url: {'status', 'content_type', 'etag', 'error'}}"""
+        headers = headers or self.headers
+        urls = list(dict.fromkeys(urls))
+        alive = self.resolve_domains(self.host_of(url) for url in urls)
+        
+        results = {}
+        futures = {}
+        for url in urls:
+            cached = self.cache.get_url(url) if self.cache else None
+            if cached:
+                results[url] = cached
+            elif alive.get(self.host_of(url)):
+                futures[url] = self._executor.submit(self._head, url, headers)
+            else:
+                results[url] = {'status': None, 'content_type': '', 'etag': None, 'error': 'dns'}
+        
+        for url, future in futures.items():
+            results[url] = future.result()
+            if self.cache:
+                self.cache.set_url(url, results[url])
+        
+        return results
+
+    @staticmethod
+    def is_image_hit(result):
+        return result['status'] == 200 and result['content_type'].startswith('image/')
+
+    def find_images(self, urls, headers=None):
+        """URLs (in input order) that answered 200 with an image content type"""
+        results = self.probe(urls, headers)
+        return [url for url in dict.fromkeys(urls) if self.is_image_hit(results[url])]
+
+    async def find_images_async(self, session, throttle, urls, headers=None):
+        """find_images over an aiohttp session"""
+        results = await self.probe_async(session, throttle, urls, headers)
+        return [url for url in dict.fromkeys(urls) if self.is_image_hit(results[url])]
+
+    def close(self):
+        """Release pooled connections and persist the probe cache"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._dns_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        if self.cache:
+            self.cache.save()
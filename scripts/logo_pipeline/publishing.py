@@ -0,0 +1,204 @@
+"""
+Atomic, content-addressed publishing of logo files into public/images/casinos
+"""
+
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+HASH_LENGTH = 10
+LOCK_DIR = os.path.join(tempfile.gettempdir(), 'casino-logo-locks')
+
+_thread_locks = {}
+_guard = threading.Lock()
+
+
+def encode_png(img, **save_options):
+    """Encode an image to PNG bytes in memory"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', **save_options)
+    return buffer.getvalue()
+
+
+def atomic_write(path, data):
+    """Write bytes to a temp file in the same directory, fsync it and rename it into place"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the target's mode so the web server can still read it
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(name, lock_dir=LOCK_DIR):
+    """Hold a lock on name across threads and processes"""
+    with _guard:
+        thread_lock = _thread_locks.setdefault((lock_dir, name), threading.Lock())
+
+    with thread_lock:
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, f"{name}.lock"), 'a+b') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _digest_of(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class LogoPublisher:
+    """
+    Publishes logos so the site never serves a half-written file.
+
+    Every write goes to a temp file that is renamed over the target, under
+    a per-slug lock shared by threads and by concurrently running finders.
+    Writes whose content digest matches the file on disk are skipped, so
+    unchanged logos keep their mtime and ETag. With hashed_names the logo
+    is also published as {slug}.{hash}.png and the casino's logo.url in
+    data/casinos.json points at it, which lets it be cached as immutable.
+    The stable {slug}.png is always kept for the site's local fallbacks.
+    """
+
+    def __init__(self, logos_dir, casinos_file=None, hashed_names=False, lock_dir=LOCK_DIR):
+        self.logos_dir = str(logos_dir)
+        self.casinos_file = str(casinos_file) if casinos_file else None
+        self.hashed_names = hashed_names
+        self.lock_dir = lock_dir
+        self.stats = {'written': 0, 'unchanged': 0}
+
+    def lock(self, name):
+        """Hold a lock on name across threads and processes"""
+        return file_lock(name, self.lock_dir)
+
+    def stable_path(self, slug, ext='png'):
+        return os.path.join(self.logos_dir, f"{slug}.{ext}")
+
+    def hashed_path(self, slug, digest, ext='png'):
+        return os.path.join(self.logos_dir, f"{slug}.{digest[:HASH_LENGTH]}.{ext}")
+
+    def publish(self, slug, data, ext='png'):
+        """Publish encoded bytes for slug, returns the published path"""
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self.lock(slug):
+            os.makedirs(self.logos_dir, exist_ok=True)
+            changed = self._write_if_changed(self.stable_path(slug, ext), data, digest)
+            path = self.stable_path(slug, ext)
+
+            if self.hashed_names:
+                path = self.hashed_path(slug, digest, ext)
+                changed = self._write_if_changed(path, data, digest) or changed
+                self._prune_hashed(slug, path, ext)
+
+        # logo.url always points at the PNG; other formats are optional siblings
+        if self.casinos_file and ext == 'png':
+            url = f"/images/casinos/{os.path.basename(path)}"
+            # Without hashed names only an SVG placeholder URL needs replacing
+            self.update_casino_url(slug, url, None if self.hashed_names else '.svg')
+
+        self.stats['written' if changed else 'unchanged'] += 1
+        return path
+
+    def _write_if_changed(self, path, data, digest):
+        if _digest_of(path) == digest:
+            return False
+        atomic_write(path, data)
+        return True
+
+    def _prune_hashed(self, slug, keep, ext):
+        """Remove earlier content-hashed versions of a slug's logo"""
+        pattern = re.compile(rf"^{re.escape(slug)}\.[0-9a-f]{{{HASH_LENGTH}}}\.{ext}$")
+        for old_path in glob.glob(os.path.join(glob.escape(self.logos_dir), f"{glob.escape(slug)}.*.{ext}")):
+            if old_path != keep and pattern.match(os.path.basename(old_path)):
+                try:
+                    os.unlink(old_path)
+                except OSError:
+                    pass
+
+    def update_casino_url(self, slug, url, replacing=None):
+        """
+        Point a casino's logo.url at the published file, rewriting casinos.json atomically.
+        With `replacing`, only a logo.url ending in it is changed.
+        """
+        with self.lock('casinos.json'):
+            with open(self.casinos_file, 'r', encoding='utf-8') as f:
+                casinos = json.load(f)
+
+            for casino in casinos:
+                if casino.get('slug') != slug:
+                    continue
+                logo = casino.setdefault('logo', {})
+                if logo.get('url') == url:
+                    return False
+                if replacing and not logo.get('url', '').endswith(replacing):
+                    return False
+                logo['url'] = url
+                logo['updatedAt'] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+                break
+            else:
+                return False
+
+            atomic_write(self.casinos_file, json.dumps(casinos, indent=2, ensure_ascii=False).encode('utf-8'))
+            return True
+
+
+def add_publishing_arguments(parser):
+    """Add the shared publishing options to a finder's argument parser"""
+    parser.add_argument("--hashed-names", action="store_true",
+                        help="Also publish logos as {slug}.{hash}.png and point logo.url in data/casinos.json at them")
+    parser.add_argument("--encode-workers", type=int, default=None,
+                        help="PNG encoding processes (default: CPU count - 1, 0 encodes inline)")
+    parser.add_argument("--byte-budget", type=int, default=30_000,
+                        help="Target size per published logo; the best quality that fits is kept")
+    parser.add_argument("--max-error", type=float, default=2.0,
+                        help="Perceptual error ceiling (mean delta E) for palette and lossy encodings, 0 keeps logos lossless")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="Downscale published logos so neither side exceeds this many pixels")
+    parser.add_argument("--webp", action="store_true",
+                        help="Also publish a {slug}.webp alongside each PNG")
+    parser.add_argument("--no-optimize", dest="optimize", action="store_false",
+                        help="Publish plain lossless PNGs without choosing an encoding per logo")
+    return parser
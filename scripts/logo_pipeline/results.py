@@ -0,0 +1,189 @@
+"""
+Append-only JSONL result streams and their compaction into summary JSON
+"""
+
+import json
+import os
+import threading
+import time
+
+RUN_KEY = '_run'
+SUMMARY_KEY = '_summary'
+
+
+def stream_path(results_file):
+    """data/foo-results.json -> data/foo-results.jsonl"""
+    root, _ = os.path.splitext(str(results_file))
+    return f"{root}.jsonl"
+
+
+def read_lines(path):
+    """Parsed lines of a stream; lines torn by a crash are skipped"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def read_runs(path):
+    """Run ids in the stream, oldest first"""
+    return [line[RUN_KEY]['id'] for line in read_lines(path) if RUN_KEY in line]
+
+
+def run_info(path, run_id):
+    """(header, summary) of one run; summary is None if the run never finished"""
+    header, summary = None, None
+    for line in read_lines(path):
+        if RUN_KEY in line:
+            if header:
+                break
+            if line[RUN_KEY]['id'] == run_id:
+                header = line[RUN_KEY]
+        elif header and SUMMARY_KEY in line:
+            summary = line[SUMMARY_KEY]
+    return header, summary
+
+
+def iter_run(path, run_id):
+    """Stream the records of one run without holding them in memory"""
+    in_run = False
+    for line in read_lines(path):
+        if RUN_KEY in line:
+            if in_run:
+                return
+            in_run = line[RUN_KEY]['id'] == run_id
+        elif in_run and SUMMARY_KEY not in line:
+            yield line
+
+
+def _dump(value, indent):
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + ' ' * indent)
+
+
+def write_summary(summary_file, sections, results_key, records):
+    """
+    Write the summary JSON atomically, streaming records into it.
+
+    The results list follows the first section, which is the layout every
+    finder's summary already used (stats, results, session info).
+    """
+    tmp_path = f"{summary_file}.tmp"
+    items = list(sections.items())
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        if items:
+            key, value = items[0]
+            f.write(f"  {json.dumps(key)}: {_dump(value, 2)},\n")
+
+        f.write(f"  {json.dumps(results_key)}: [")
+        count = 0
+        for record in records:
+            f.write(',\n    ' if count else '\n    ')
+            f.write(_dump(record, 4))
+            count += 1
+        f.write('\n  ]' if count else ']')
+
+        for key, value in items[1:]:
+            f.write(f",\n  {json.dumps(key)}: {_dump(value, 2)}")
+        f.write('\n}')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, summary_file)
+    return count
+
+
+class ResultStream:
+    """
+    Per-casino results appended to a JSONL file as they complete.
+
+    Used in place of the finders' in-memory results list: append() writes
+    one line and flushes it, and fsyncs are batched (every fsync_every
+    lines or fsync_interval seconds), so a crash loses at most the last
+    unsynced lines while memory stays flat. Each run starts with a header
+    line and ends with a summary line, and iterating the stream yields the
+    current run's records back from disk. finish() writes the summary JSON
+    the finder used to build in memory; compact-logo-results.py rebuilds
+    it from the stream after a crash.
+    """
+
+    def __init__(self, path, finder, results_key='results', fsync_every=16, fsync_interval=2.0):
+        self.path = str(path)
+        self.finder = finder
+        self.results_key = results_key
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.count = 0
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() and not self._ends_with_newline():
+            # Terminate a line torn by a crashed run so this run starts clean
+            self._file.write('\n')
+        self._write({RUN_KEY: {
+            'id': self.run_id,
+            'finder': self.finder,
+            'results_key': self.results_key,
+            'started': time.strftime('%Y-%m-%d %H:%M:%S')
+        }})
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _write(self, line):
+        self._file.write(json.dumps(line, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.time() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def append(self, record):
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._write(record)
+            self.count += 1
+
+    def __iter__(self):
+        with self._lock:
+            if self._file is None:
+                return iter(())
+            self._file.flush()
+        return iter_run(self.path, self.run_id)
+
+    def __len__(self):
+        return self.count
+
+    def finish(self, sections):
+        """Close the run with its summary sections and write the summary JSON"""
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._write({SUMMARY_KEY: sections})
+            self._sync()
+        return write_summary(self.summary_file, sections, self.results_key, iter_run(self.path, self.run_id))
+
+    @property
+    def summary_file(self):
+        root, _ = os.path.splitext(self.path)
+        return f"{root}.json"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
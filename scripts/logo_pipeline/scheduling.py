@@ -0,0 +1,189 @@
+"""
+Visibility-first work ordering for the finder scripts
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import time
+from urllib.parse import urlparse
+
+from .decoding import read_header
+
+# How urgently each logo state needs work
+NEED_WEIGHTS = {'missing': 1.0, 'broken': 1.0, 'fallback': 0.5, 'ok': 0.05}
+
+# Logo sources that mean a stand-in rather than the brand's own logo
+FALLBACK_SOURCES = {'generated', 'placeholder', 'generic-fallback', 'clearbit-api'}
+
+# Two-letter market codes in affiliate campaign names ("SEO - SpellWin DE AT CH CA-v2")
+MARKET_CODE = re.compile(r'(?<![A-Za-z])[A-Z]{2}(?![A-Za-z])')
+
+
+def overall_rating(casino):
+    """The homepage ranking key (HomeVM.getTopThree)"""
+    if casino.get('overallRating'):
+        return casino['overallRating']
+    ratings = casino.get('ratings') or {}
+    return (ratings.get('security', 0) * 0.2 + ratings.get('payout', 0) * 0.2 +
+            ratings.get('bonusValue', 0) * 0.15 + ratings.get('games', 0) * 0.2 +
+            ratings.get('support', 0) * 0.15 + ratings.get('reputation', 0) * 0.1)
+
+
+def campaign_markets(record, markets=None):
+    """
+    Market codes the record's affiliate campaign targets.
+
+    By default the standalone two-letter codes in the campaign name. Given
+    the site's country codes, the markets whose country page lists the
+    record instead: those pages test campaignName.includes(code), so SE
+    also matches the "SEO" prefix of most campaign names.
+    """
+    campaign = ((record or {}).get('affiliate') or {}).get('campaignName', '')
+    if markets is not None:
+        return {code for code in markets if code in campaign}
+    return set(MARKET_CODE.findall(campaign))
+
+
+def _domain(url):
+    host = (urlparse(url or '').hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class CasinoScheduler:
+    """
+    Order finder work so the most visible broken logos are fixed first.
+
+    Each search-list entry is matched to its casinos.json record (by slug,
+    search variation or domain) and scored as
+        need(logo state) * visibility(rank) * campaign weight
+    where the state is missing, broken (undecodable), fallback (a
+    placeholder or stand-in) or ok, visibility falls off with the
+    homepage rank, and the campaign weight grows with the number of
+    markets the affiliate campaign targets (or affiliate.weight when the
+    record sets one). Casinos the site doesn't list rank last.
+
+    queue() yields casinos from a heap in that order and stops once the
+    time budget is spent, so a time-boxed run covers what matters.
+    """
+
+    def __init__(self, casinos_file, logos_dir, manifest=None, enabled=True, time_budget=None):
+        self.logos_dir = str(logos_dir)
+        self.public_dir = os.path.dirname(os.path.dirname(self.logos_dir))
+        self.manifest = manifest
+        self.enabled = enabled
+        self.time_budget = time_budget
+        self.records = []
+        self.ranks = {}
+        self.by_slug = {}
+        self.by_domain = {}
+        self.stats = {'queued': 0, 'started': 0, 'skipped': 0}
+
+        try:
+            with open(casinos_file, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  No casino rankings for scheduling ({e}), keeping file order")
+            self.enabled = False
+            return
+
+        # Stable sort, same ties as the homepage
+        self.records = sorted(records, key=lambda c: -overall_rating(c))
+        self.ranks = {id(record): rank for rank, record in enumerate(self.records, 1)}
+        self.by_slug = {c['slug']: c for c in self.records}
+        for record in self.records:
+            for domain in (_domain(record.get('url')), (record.get('logo') or {}).get('domain')):
+                if domain:
+                    self.by_domain.setdefault(domain, record)
+
+    def configure(self, args):
+        """Apply the --file-order / --time-budget options"""
+        self.enabled = self.enabled and not args.file_order
+        self.time_budget = args.time_budget * 60 if args.time_budget else None
+
+    def record_for(self, casino):
+        """casinos.json record behind a search-list entry, or None"""
+        if casino.get('slug') in self.by_slug:
+            return self.by_slug[casino['slug']]
+        for variation in casino.get('searchVariations', []):
+            if variation in self.by_slug:
+                return self.by_slug[variation]
+        return self.by_domain.get(_domain(casino.get('url')))
+
+    def logo_state(self, casino, record):
+        url = ((record or {}).get('logo') or {}).get('url', '')
+        if url and not url.startswith('/'):
+            return 'fallback'
+        if url:
+            path = os.path.join(self.public_dir, *url.lstrip('/').split('/'))
+        else:
+            path = os.path.join(self.logos_dir, f"{casino['slug']}.png")
+
+        if not os.path.exists(path):
+            return 'missing'
+        if path.endswith('.svg'):
+            # Only the generator publishes SVG logos
+            return 'fallback'
+        try:
+            read_header(path)
+        except Exception:
+            return 'broken'
+
+        sources = {((record or {}).get('logo') or {}).get('source')}
+        if self.manifest:
+            sources.add((self.manifest.entries.get(casino['slug']) or {}).get('source'))
+        return 'fallback' if sources & FALLBACK_SOURCES else 'ok'
+
+    @staticmethod
+    def campaign_weight(record):
+        affiliate = (record or {}).get('affiliate') or {}
+        if 'weight' in affiliate:
+            return float(affiliate['weight'])
+        if not affiliate.get('link'):
+            return 0.8
+        return 1.0 + 0.05 * min(len(campaign_markets(record)), 10)
+
+    def priority(self, casino):
+        """(score, rank, state) of one search-list entry"""
+        record = self.record_for(casino)
+        rank = self.ranks.get(id(record), len(self.records) + 1)
+        state = self.logo_state(casino, record)
+        visibility = 1 / (1 + math.log2(rank))
+        return NEED_WEIGHTS[state] * visibility * self.campaign_weight(record), rank, state
+
+    def queue(self, casinos):
+        """Yield casinos most urgent first, until the time budget runs out"""
+        if not self.enabled:
+            heap = [(0, i, casino) for i, casino in enumerate(casinos)]
+        else:
+            heap = []
+            states = {}
+            for i, casino in enumerate(casinos):
+                score, rank, state = self.priority(casino)
+                states[state] = states.get(state, 0) + 1
+                heap.append((-score, i, casino))
+            heapq.heapify(heap)
+            summary = ', '.join(f"{count} {state}" for state, count in sorted(states.items()))
+            print(f"🎯 Priority order: {summary}")
+        self.stats = {'queued': len(heap), 'started': 0, 'skipped': 0}
+
+        deadline = time.time() + self.time_budget if self.time_budget else None
+        while heap:
+            if deadline and time.time() >= deadline:
+                self.stats['skipped'] = len(heap)
+                print(f"⏰ Time budget spent, {len(heap)} lower-priority casinos left for the next run")
+                return
+            _, _, casino = heapq.heappop(heap)
+            self.stats['started'] += 1
+            yield casino
+
+
+def add_scheduling_arguments(parser):
+    """Add the shared work-ordering options to a finder's argument parser"""
+    parser.add_argument("--file-order", action="store_true",
+                        help="Process casinos in search-list order instead of most visible broken logos first")
+    parser.add_argument("--time-budget", type=float, metavar="MINUTES",
+                        help="Stop starting new casinos after this many minutes")
+    return parser
@@ -0,0 +1,179 @@
+"""
+Vectorized batch scoring of logo candidates
+
+Every finder ranks candidates with the same weights, so a logo scores
+the same whether it came from a direct URL, a search engine or a Bing
+download folder.
+"""
+
+import os
+
+import numpy as np
+
+from .analysis import LogoContentAnalyzer
+from .decoding import open_proxy, read_header
+
+# Bit flags for hint words found in the candidate's URL or filename
+HINT_FLAGS = {
+    'logo': 1,
+    'casino': 2,
+    'brand': 4,
+    'icon': 8,
+}
+
+# Format codes; 0 means unknown
+FORMAT_CODES = {
+    'png': 1,
+    'jpeg': 2,
+    'webp': 3,
+    'svg': 4,
+}
+
+DEFAULT_WEIGHTS = {
+    # Dimensions: both sides within the ideal range, else within the acceptable one
+    'ideal_dimensions': (50, 500),
+    'ideal_dimensions_score': 25,
+    'ok_dimensions': (30, 800),
+    'ok_dimensions_score': 15,
+    
+    # Aspect ratio (long side / short side)
+    'tight_ratio': 3.0,
+    'tight_ratio_score': 20,
+    'loose_ratio': 5.0,
+    'loose_ratio_score': 10,
+    
+    # Encoded size; 0 bytes means unknown and scores nothing
+    'sweet_bytes': (20_000, 300_000),
+    'sweet_bytes_score': 20,
+    'ok_min_bytes': 10_000,
+    'ok_bytes_score': 10,
+    
+    # URL / filename hints
+    'logo': 25,
+    'casino': 15,
+    'brand': 12,
+    'icon': 18,
+    
+    # Format preference
+    'png': 15,
+    'jpeg': 8,
+    'webp': 12,
+    'svg': 10,
+    
+    # Content analysis: points for a logo likelihood of 1.0 (see analysis.py)
+    'content': 40,
+}
+
+
+def hint_flags(text):
+    """Bitmask of HINT_FLAGS words present in a URL or filename"""
+    text = (text or '').lower()
+    flags = 0
+    for word, flag in HINT_FLAGS.items():
+        if word in text:
+            flags |= flag
+    return flags
+
+
+def format_code(text):
+    """Format code from a PIL format name, extension, path or URL"""
+    text = (text or '').lower()
+    for token, name in (('png', 'png'), ('svg', 'svg'), ('webp', 'webp'), ('jpeg', 'jpeg'), ('jpg', 'jpeg')):
+        if token in text:
+            return FORMAT_CODES[name]
+    return 0
+
+
+def candidate_table(rows):
+    """
+    Build the column arrays the scorer works on.
+
+    `rows` are dicts with width, height and optionally bytes, format
+    (format code), hints (hint flags) and likelihood (0..1 logo likelihood
+    from LogoContentAnalyzer).
+    """
+    return {
+        'width': np.fromiter((r['width'] for r in rows), dtype=np.int32, count=len(rows)),
+        'height': np.fromiter((r['height'] for r in rows), dtype=np.int32, count=len(rows)),
+        'bytes': np.fromiter((r.get('bytes', 0) for r in rows), dtype=np.int64, count=len(rows)),
+        'format': np.fromiter((r.get('format', 0) for r in rows), dtype=np.int8, count=len(rows)),
+        'hints': np.fromiter((r.get('hints', 0) for r in rows), dtype=np.int16, count=len(rows)),
+        'likelihood': np.fromiter((r.get('likelihood', 0.0) for r in rows), dtype=np.float32, count=len(rows)),
+    }
+
+
+class BatchLogoScorer:
+    """Score whole candidate tables in one vectorized pass"""
+
+    def __init__(self, weights=None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        
+        self.analyzer = LogoContentAnalyzer()
+        
+        w = self.weights
+        self._format_scores = np.zeros(max(FORMAT_CODES.values()) + 1, dtype=np.float64)
+        for name, code in FORMAT_CODES.items():
+            self._format_scores[code] = w[name]
+
+    def score(self, table):
+        """Scores for every row of a candidate table, as a float array"""
+        w = self.weights
+        width = table['width'].astype(np.float64)
+        height = table['height'].astype(np.float64)
+        size = table['bytes']
+        
+        def both_within(bounds):
+            low, high = bounds
+            return (width >= low) & (width <= high) & (height >= low) & (height <= high)
+        
+        scores = np.where(both_within(w['ideal_dimensions']), w['ideal_dimensions_score'],
+                          np.where(both_within(w['ok_dimensions']), w['ok_dimensions_score'], 0.0))
+        
+        ratio = np.maximum(width, height) / np.maximum(np.minimum(width, height), 1.0)
+        scores += np.where(ratio <= w['tight_ratio'], w['tight_ratio_score'],
+                           np.where(ratio <= w['loose_ratio'], w['loose_ratio_score'], 0.0))
+        
+        low, high = w['sweet_bytes']
+        scores += np.where((size > low) & (size < high), w['sweet_bytes_score'],
+                           np.where(size > w['ok_min_bytes'], w['ok_bytes_score'], 0.0))
+        
+        for word, flag in HINT_FLAGS.items():
+            scores += ((table['hints'] & flag) != 0) * w[word]
+        
+        scores += self._format_scores[np.clip(table['format'], 0, len(self._format_scores) - 1)]
+        
+        if 'likelihood' in table:
+            scores += w['content'] * table['likelihood']
+        
+        # Unreadable candidates never win
+        return np.where((width > 0) & (height > 0), scores, 0.0)
+
+    def rank(self, table):
+        """Row indices ordered best first (stable for equal scores)"""
+        return np.argsort(-self.score(table), kind='stable')
+
+    def score_one(self, width, height, size=0, hint='', fmt='', likelihood=0.0):
+        """Convenience wrapper for scoring a single candidate"""
+        table = candidate_table([{
+            'width': width,
+            'height': height,
+            'bytes': size,
+            'format': format_code(fmt or hint),
+            'hints': hint_flags(hint),
+            'likelihood': likelihood,
+        }])
+        return int(self.score(table)[0])
+
+    def score_file(self, path, hint=None):
+        """Score an image file from its header, size, extension and name"""
+        path = str(path)
+        hint = os.path.basename(path) if hint is None else hint
+        try:
+            width, height, _ = read_header(path)
+            likelihood = float(self.analyzer.analyze([open_proxy(path)])[1][0])
+            return self.score_one(width, height, os.path.getsize(path), hint=hint,
+                                  fmt=os.path.splitext(path)[1], likelihood=likelihood)
+        except Exception:
+            return 0
@@ -0,0 +1,119 @@
+"""
+Streaming, bounded-memory image downloads
+"""
+
+from PIL import ImageFile
+
+CHUNK_SIZE = 64 * 1024
+
+# Stop looking for an image header after this many bytes
+HEADER_PROBE_LIMIT = 256 * 1024
+
+
+class BoundedImageReader:
+    """
+    Accumulate a streamed image body under a hard byte ceiling.
+
+    Chunks are also fed to an incremental PIL parser until the image
+    header is known, so oversized or undersized dimensions abort the
+    download after the first few kilobytes instead of after the full body.
+    """
+
+    def __init__(self, max_bytes, min_dimensions=None, max_dimensions=None):
+        self.max_bytes = max_bytes
+        self.min_dimensions = min_dimensions
+        self.max_dimensions = max_dimensions
+        self.chunks = []
+        self.received = 0
+        self.size = None
+        self.format = None
+        self.rejected = None
+        self._parser = ImageFile.Parser()
+
+    def check_declared_length(self, content_length):
+        """Reject up front when the server announces a body over the ceiling"""
+        try:
+            if content_length and int(content_length) > self.max_bytes:
+                self.rejected = 'too-large'
+                return False
+        except ValueError:
+            pass
+        return True
+
+    def _check_header(self):
+        image = self._parser.image
+        if image is None:
+            return True
+        
+        self.size = image.size
+        self.format = image.format
+        width, height = image.size
+        if self.min_dimensions and (width < self.min_dimensions[0] or height < self.min_dimensions[1]):
+            self.rejected = 'too-small'
+            return False
+        if self.max_dimensions and (width > self.max_dimensions[0] or height > self.max_dimensions[1]):
+            self.rejected = 'too-big'
+            return False
+        return True
+
+    def feed(self, chunk):
+        """Add a chunk; returns False once the download should be abandoned"""
+        self.received += len(chunk)
+        if self.received > self.max_bytes:
+            self.rejected = 'too-large'
+            return False
+        
+        self.chunks.append(chunk)
+        
+        # Only feed the parser until the header is known; full decoding happens later
+        if self.size is None and self._parser is not None:
+            if self.received > HEADER_PROBE_LIMIT:
+                # Formats PIL can't identify (e.g. SVG) are judged after download
+                self._parser = None
+                return True
+            try:
+                self._parser.feed(chunk)
+            except Exception:
+                self._parser = None
+                return True
+            return self._check_header()
+        
+        return True
+
+    def getvalue(self):
+        return b''.join(self.chunks)
+
+
+def read_image_stream(response, reader, chunk_size=CHUNK_SIZE):
+    """
+    Read a `requests` response opened with stream=True through `reader`.
+
+    Returns the body, or None if the reader rejected it. The response is
+    always closed: a fully read body returns its connection to the pool,
+    an abandoned one is dropped instead of draining the rest of it.
+    """
+    try:
+        if not reader.check_declared_length(response.headers.get('content-length')):
+            return None
+        for chunk in response.iter_content(chunk_size):
+            if not reader.feed(chunk):
+                return None
+        return reader.getvalue()
+    finally:
+        response.close()
+
+
+async def read_image_stream_async(response, reader, chunk_size=CHUNK_SIZE):
+    """aiohttp counterpart of read_image_stream"""
+    try:
+        if not reader.check_declared_length(response.headers.get('content-length')):
+            return None
+        async for chunk in response.content.iter_chunked(chunk_size):
+            if not reader.feed(chunk):
+                return None
+        return reader.getvalue()
+    finally:
+        if reader.rejected is None:
+            response.release()
+        else:
+            response.close()
@@ -5,15 +5,23 @@ Smart Casino Logo Finder 2025 - Enhanced Version
 Advanced Bing Image Search with intelligent processing and multiple fallback strategies
 """
 
+import argparse
 import json
 import os
 import shutil
 from pathlib import Path
+import threading
 import time
 import requests
-from PIL import Image
 import io
 import hashlib
+from functools import partial
+
+from logo_pipeline import (
+    BatchLogoScorer, CasinoScheduler, EncodingStage, LogoManifest, LogoPublisher, ResultStream,
+    add_incremental_arguments, add_publishing_arguments, add_scheduling_arguments, candidate_table, decode_logo,
+    format_code, hint_flags, read_header, stream_path
+)
 
 # Import bing image downloader
 try:
@@ -30,8 +38,16 @@ class SmartCasinoLogoFinder:
         self.temp_dir = self.project_root / 'temp-smart-downloads'
         self.results_file = self.project_root / 'data' / 'smart-logo-results.json'
         
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(str(self.project_root / 'data' / 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, self.project_root / 'data' / 'casinos.json')
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'smart-casino-logo-finder')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'smart-casino-logo-finder', 'results')
         
         # Quality thresholds
         self.min_file_size = 2000  # 2KB minimum
@@ -39,6 +55,9 @@ class SmartCasinoLogoFinder:
         self.max_dimensions = (2000, 2000)  # 2000x2000 pixels maximum
         self.preferred_formats = ['.png', '.jpg', '.jpeg', '.webp']
         
+        # Shared candidate ranking used by every finder
+        self.scorer = BatchLogoScorer()
+        
         self.stats = {
             'total_casinos': 0,
             'attempted': 0,
@@ -47,6 +66,8 @@ class SmartCasinoLogoFinder:
             'logos_downloaded': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
     def load_casino_data(self):
         """Load our cleaned casino brand data"""
@@ -163,8 +184,10 @@ class SmartCasinoLogoFinder:
                 if self.validate_image(img_file):
                     valid_images.append(img_file)
                     
-            # Sort by quality score (size, dimensions, format preference)
-            valid_images.sort(key=self.calculate_image_quality_score, reverse=True)
+            # Rank by quality score (size, dimensions, format preference) in one batch
+            if valid_images:
+                table = candidate_table(self.image_candidate_rows(valid_images))
+                valid_images = [valid_images[i] for i in self.scorer.rank(table)]
             
         except Exception as e:
             print(f"      ⚠️  Error processing folder {folder_path}: {e}")
@@ -179,114 +202,121 @@ class SmartCasinoLogoFinder:
                 print(f"        ❌ Too small: {image_path.name} ({image_path.stat().st_size} bytes)")
                 return False
             
-            # Try to open and validate the image
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # Check dimensions
-                if width < self.min_dimensions[0] or height < self.min_dimensions[1]:
-                    print(f"        ❌ Dimensions too small: {image_path.name} ({width}x{height})")
-                    return False
-                
-                if width > self.max_dimensions[0] or height > self.max_dimensions[1]:
-                    print(f"        ⚠️  Large image: {image_path.name} ({width}x{height})")
-                    # Don't reject, but note it
-                
-                # Check if it's a valid image format
-                img_format = img.format.lower() if img.format else 'unknown'
-                if img_format not in ['png', 'jpeg', 'jpg', 'webp']:
-                    print(f"        ⚠️  Unusual format: {image_path.name} ({img_format})")
-                
-                print(f"        ✅ Valid: {image_path.name} ({width}x{height}, {img.format}, {image_path.stat().st_size} bytes)")
-                return True
+            # Read the header only; pixels are decoded for the winning image alone
+            width, height, header_format = read_header(image_path)
+            
+            # Check dimensions
+            if width < self.min_dimensions[0] or height < self.min_dimensions[1]:
+                print(f"        ❌ Dimensions too small: {image_path.name} ({width}x{height})")
+                return False
+            
+            if width > self.max_dimensions[0] or height > self.max_dimensions[1]:
+                print(f"        ⚠️  Large image: {image_path.name} ({width}x{height})")
+                # Don't reject, but note it
+            
+            # Check if it's a valid image format
+            img_format = header_format.lower() if header_format else 'unknown'
+            if img_format not in ['png', 'jpeg', 'jpg', 'webp']:
+                print(f"        ⚠️  Unusual format: {image_path.name} ({img_format})")
+            
+            print(f"        ✅ Valid: {image_path.name} ({width}x{height}, {header_format}, {image_path.stat().st_size} bytes)")
+            return True
                 
         except Exception as e:
             print(f"        ❌ Invalid image {image_path.name}: {e}")
             return False
     
-    def calculate_image_quality_score(self, image_path):
-        """Calculate quality score for image ranking"""
-        score = 0
+    def image_candidate_row(self, image_path):
+        """Candidate metadata row for the batch scorer"""
+        row = {
+            'width': 0,
+            'height': 0,
+            'bytes': 0,
+            'format': format_code(image_path.suffix),
+            'hints': hint_flags(image_path.name)
+        }
         
         try:
-            file_size = image_path.stat().st_size
-            
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # Size score (prefer medium to large sizes)
-                if 100000 < file_size < 500000:  # 100KB - 500KB is good
-                    score += 20
-                elif file_size > 50000:  # At least 50KB
-                    score += 10
-                
-                # Dimension score (prefer square-ish logos, reasonable size)
-                if 100 <= width <= 800 and 100 <= height <= 800:
-                    score += 15
-                
-                # Aspect ratio score (prefer logos that aren't too wide/tall)
-                ratio = max(width, height) / min(width, height)
-                if ratio <= 3:  # Not too stretched
-                    score += 10
-                
-                # Format preference
-                ext = image_path.suffix.lower()
-                if ext == '.png':
-                    score += 15  # PNG usually best for logos
-                elif ext in ['.jpg', '.jpeg']:
-                    score += 10
-                elif ext == '.webp':
-                    score += 12
-                
-                # File name hints
-                name_lower = image_path.name.lower()
-                if 'logo' in name_lower:
-                    score += 10
-                if 'casino' in name_lower:
-                    score += 5
-                if 'icon' in name_lower:
-                    score += 8
-                
+            row['bytes'] = image_path.stat().st_size
+            row['width'], row['height'], _ = read_header(image_path)
         except Exception as e:
-            score = 0
+            pass
             
-        return score
+        return row
+    
+    def image_candidate_rows(self, image_paths):
+        """Candidate rows with batch content analysis (logo likelihood)"""
+        rows = [self.image_candidate_row(path) for path in image_paths]
+        for row, likelihood in zip(rows, self.scorer.analyzer.analyze_files(image_paths)):
+            row['likelihood'] = likelihood
+        return rows
+    
+    def calculate_image_quality_score(self, image_path):
+        """Calculate quality score for image ranking"""
+        table = candidate_table(self.image_candidate_rows([image_path]))
+        return int(self.scorer.score(table)[0])
     
-    def save_best_logo(self, casino, image_path):
+    def save_best_logo(self, casino, image_path, source=None, score=None, on_done=None):
         """Save the best logo with proper naming and optimization"""
         try:
-            destination = self.logos_dir / f"{casino['slug']}.png"
+            # Decode at full resolution (RGBA, max 800px keeping aspect ratio) and save as PNG
+            max_size = 800
+            img = decode_logo(image_path, max_size)
             
-            # Open, process, and save as PNG
-            with Image.open(image_path) as img:
-                # Convert to RGBA for PNG with transparency support
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                # Resize if too large (keep aspect ratio)
-                max_size = 800
-                if img.width > max_size or img.height > max_size:
-                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                
-                # Save as high-quality PNG
-                img.save(destination, 'PNG', optimize=True)
-                
-            print(f"        💾 Saved logo: {destination.name}")
+            # Encode as high-quality PNG on the encoding stage
+            self.encoder.submit(casino['slug'], img, source, score, on_done=on_done, optimize=True)
             return True
             
         except Exception as e:
             print(f"        ❌ Error saving logo: {e}")
             return False
     
+    def record_outcome(self, casino, path, query=None, image=None, image_score=None, queries=None, images_found=0):
+        """Record the published logo, or the casino's failure when path is None"""
+        if path:
+            with self.stats_lock:
+                self.stats['successful'] += 1
+                self.stats['logos_downloaded'] += 1
+            
+            # Record success
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'success',
+                'search_query': query,
+                'logo_file': os.path.basename(path),
+                'source_image': str(image),
+                'image_score': image_score,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            
+            print(f"    ✅ SUCCESS: Found perfect logo for {casino['brand']}!")
+        else:
+            with self.stats_lock:
+                self.stats['failed'] += 1
+            self.manifest.record_failure(casino['slug'], 'smart-casino-logo-finder')
+            print(f"    ❌ No suitable logo found for {casino['brand']}")
+            
+            # Record failure
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'failed',
+                'searched_queries': queries,
+                'images_found': images_found,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+    
     def smart_casino_logo_search(self):
         """Main smart search function for all casinos"""
         print("\n🧠 Starting Smart Casino Logo Search...")
         print("=" * 50)
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             print(f"\n[{i}/{len(self.casinos)}] 🎯 Processing: {casino['brand']}")
             
-            self.stats['attempted'] += 1
+            with self.stats_lock:
+                self.stats['attempted'] += 1
             
             # Build smart search queries
             search_queries = self.build_smart_search_queries(casino)
@@ -301,26 +331,14 @@ class SmartCasinoLogoFinder:
                 if images:
                     best_images.extend(images)
                     
-                    # Try to save the best one
+                    # Try to save the best one; the outcome is recorded once it is published
                     for img in images[:2]:  # Try top 2 images
-                        if self.save_best_logo(casino, img):
+                        image_score = self.calculate_image_quality_score(img)
+                        if self.save_best_logo(casino, img, query, image_score,
+                                               partial(self.record_outcome, casino, query=query, image=img,
+                                                       image_score=image_score, queries=search_queries,
+                                                       images_found=len(best_images))):
                             success = True
-                            self.stats['successful'] += 1
-                            self.stats['logos_downloaded'] += 1
-                            
-                            # Record success
-                            self.results.append({
-                                'slug': casino['slug'],
-                                'brand': casino['brand'],
-                                'status': 'success',
-                                'search_query': query,
-                                'logo_file': f"{casino['slug']}.png",
-                                'source_image': str(img),
-                                'image_score': self.calculate_image_quality_score(img),
-                                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                            })
-                            
-                            print(f"    ✅ SUCCESS: Found perfect logo for {casino['brand']}!")
                             break
                     
                     if success:
@@ -333,18 +351,7 @@ class SmartCasinoLogoFinder:
                 time.sleep(1.5)
             
             if not success:
-                self.stats['failed'] += 1
-                print(f"    ❌ No suitable logo found for {casino['brand']}")
-                
-                # Record failure
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'status': 'failed',
-                    'searched_queries': search_queries,
-                    'images_found': len(best_images),
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+                self.record_outcome(casino, None, queries=search_queries, images_found=len(best_images))
             
             # Progress report every 10 casinos
             if i % 10 == 0:
@@ -389,19 +396,15 @@ class SmartCasinoLogoFinder:
     def save_results(self):
         """Save comprehensive results"""
         try:
-            final_results = {
+            self.results.finish({
                 'stats': self.stats,
-                'results': self.results,
                 'session_info': {
                     'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                     'total_runtime': time.time() - self.stats['start_time'],
                     'version': 'Smart Casino Logo Finder v2.0',
                     'success_rate': (self.stats['successful'] / self.stats['total_casinos']) * 100 if self.stats['total_casinos'] > 0 else 0
                 }
-            }
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(final_results, f, indent=2, ensure_ascii=False)
+            })
                 
             print(f"💾 Smart results saved to: {self.results_file}")
             
@@ -452,7 +455,15 @@ class SmartCasinoLogoFinder:
         print("4. Your casino portal now has REAL professional logos!")
 
 def main():
+    parser = argparse.ArgumentParser(description="Smart Casino Logo Finder")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    args = parser.parse_args()
+    
     finder = SmartCasinoLogoFinder()
+    finder.encoder.configure(args)
+    finder.scheduler.configure(args)
     
     try:
         # Initialize
@@ -461,8 +472,14 @@ def main():
             
         finder.setup_directories()
         
-        # Run smart logo search
-        finder.smart_casino_logo_search()
+        if args.incremental:
+            finder.casinos = finder.manifest.pending(finder.casinos, str(finder.logos_dir), args.max_age_days, args.min_score)
+            finder.stats['total_casinos'] = len(finder.casinos)
+        
+        # Run smart logo search, with one manifest write for the whole run
+        with finder.manifest.batch():
+            finder.smart_casino_logo_search()
+            finder.encoder.drain()
         
         # Generate report
         finder.generate_final_report()
@@ -478,6 +495,8 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        finder.encoder.close()
+        finder.results.close()
         finder.cleanup_temp_files()
 
 if __name__ == '__main__':
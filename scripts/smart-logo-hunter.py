@@ -5,16 +5,32 @@ Smart Casino Logo Hunter 2025
 Uses multiple strategies and sources to find real casino logos
 """
 
+import argparse
+import asyncio
 import json
 import os
 import requests
+import threading
 import time
-from PIL import Image
-import io
 import random
+from functools import partial
 from urllib.parse import quote_plus
 import re
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from logo_pipeline import (
+    AimdController, BatchLogoScorer, BoundedImageReader, CandidatePool, CasinoScheduler, Cassette, EncodingStage,
+    HostThrottle, LogoManifest, LogoPublisher, ProbeCache, ResultStream, SeenUrls, UrlProber, add_cassette_arguments,
+    add_incremental_arguments, add_publishing_arguments, add_scheduling_arguments, candidate_table, decode_logo,
+    fit_within, format_code, hint_flags, open_proxy, read_header, read_image_stream, read_image_stream_async,
+    stream_path
+)
+
 class SmartLogoHunter:
     def __init__(self):
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,14 +39,24 @@ class SmartLogoHunter:
         self.logos_dir = os.path.join(self.project_root, 'public', 'images', 'casinos')
         self.results_file = os.path.join(self.project_root, 'data', 'smart-hunter-results.json')
         
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(os.path.join(self.project_root, 'data', 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, os.path.join(self.project_root, 'data', 'casinos.json'))
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'smart-logo-hunter')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'smart-logo-hunter', 'hunt_results')
         self.stats = {
             'total': 0,
             'successful': 0,
             'failed': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
         # Rotating user agents to avoid blocking
         self.user_agents = [
@@ -41,6 +67,31 @@ class SmartLogoHunter:
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0'
         ]
         
+        # Candidate download limits, enforced while streaming
+        self.min_logo_bytes = 1000  # 1KB minimum
+        self.max_logo_bytes = 10 * 1024 * 1024  # 10MB max
+        self.min_logo_dimensions = (30, 30)
+        self.max_logo_dimensions = (3000, 3000)
+        
+        # Shared candidate ranking used by every finder
+        self.scorer = BatchLogoScorer()
+        
+        # Pooled session for candidate downloads
+        self.session = requests.Session()
+        
+        # Shared probing engine for guessed logo URLs, backed by the cross-run probe cache
+        self.probe_cache_file = os.path.join(self.project_root, 'data', 'logo-probe-cache.json')
+        self.prober = UrlProber(timeout=5, cache=ProbeCache(self.probe_cache_file))
+        
+        # Search engine pacing, learned per source and carried across runs
+        self.search_limits = AimdController(os.path.join(self.project_root, 'data', 'search-concurrency.json'))
+        
+        # Candidate URLs already downloaded this run, whichever source returned them
+        self.seen_urls = SeenUrls()
+        
+        # Compressed candidate bytes, budgeted across concurrent hunts and spilled past it
+        self.candidates = CandidatePool()
+        
     def get_headers(self):
         """Get randomized headers"""
         return {
@@ -79,13 +130,11 @@ class SmartLogoHunter:
             print(f"❌ Directory error: {e}")
             return False
     
-    def hunt_direct_logo_urls(self, casino):
-        """Hunt for direct logo URLs from known casino sites"""
-        direct_urls = []
+    def direct_logo_patterns(self, casino):
+        """Common casino logo URL patterns guessed from the brand name"""
         brand = casino['brand'].lower().replace(' ', '')
         
-        # Strategy 1: Try common casino logo URL patterns
-        common_patterns = [
+        return [
             f"https://{brand}.com/assets/images/logo.png",
             f"https://{brand}.com/images/logo.png",
             f"https://{brand}.com/logo.png",
@@ -95,17 +144,13 @@ class SmartLogoHunter:
             f"https://{brand}.net/logo.png",
             f"https://{brand}.io/logo.png"
         ]
-        
-        for url in common_patterns:
-            try:
-                response = requests.head(url, headers=self.get_headers(), timeout=5)
-                if response.status_code == 200:
-                    content_type = response.headers.get('content-type', '').lower()
-                    if content_type.startswith('image/'):
-                        direct_urls.append(url)
-                        print(f"        🎯 Direct hit: {url}")
-            except:
-                continue
+    
+    def hunt_direct_logo_urls(self, casino):
+        """Hunt for direct logo URLs from known casino sites"""
+        # Strategy 1: Try common casino logo URL patterns (dead domains are skipped)
+        direct_urls = self.prober.find_images(self.direct_logo_patterns(casino), self.get_headers())
+        for url in direct_urls:
+            print(f"        🎯 Direct hit: {url}")
         
         return direct_urls
     
@@ -118,23 +163,12 @@ class SmartLogoHunter:
             search_url = f"https://duckduckgo.com/?q={quote_plus(query)}&t=h_&iax=images&ia=images"
             
             headers = self.get_headers()
-            response = requests.get(search_url, headers=headers, timeout=10)
+            with self.search_limits.sync_slot('duckduckgo') as feedback:
+                response = requests.get(search_url, headers=headers, timeout=10)
+                feedback.observe(response.status_code, response.text, response.headers.get('Retry-After'))
             
-            if response.status_code == 200:
-                # Extract image URLs from DuckDuckGo results
-                image_urls = re.findall(r'"image":"([^"]+)"', response.text)
-                
-                # Clean and validate URLs
-                clean_urls = []
-                for url in image_urls[:10]:
-                    try:
-                        # Decode URL
-                        clean_url = url.replace('\\', '')
-                        if self.is_valid_logo_url(clean_url):
-                            clean_urls.append(clean_url)
-                    except:
-                        continue
-                
+            if feedback.outcome == 'ok':
+                clean_urls = self.extract_duckduckgo_urls(response.text)
                 print(f"      🦆 Found {len(clean_urls)} DuckDuckGo images")
                 return clean_urls
                 
@@ -152,21 +186,12 @@ class SmartLogoHunter:
             search_url = f"https://www.bing.com/images/search?q={quote_plus(query)}&form=HDRSC2"
             
             headers = self.get_headers()
-            response = requests.get(search_url, headers=headers, timeout=10)
+            with self.search_limits.sync_slot('bing') as feedback:
+                response = requests.get(search_url, headers=headers, timeout=10)
+                feedback.observe(response.status_code, response.text, response.headers.get('Retry-After'))
             
-            if response.status_code == 200:
-                # Extract image URLs from Bing
-                image_urls = re.findall(r'mediaurl":"([^"]+)"', response.text)
-                
-                clean_urls = []
-                for url in image_urls[:8]:
-                    try:
-                        clean_url = url.replace('\\u0026', '&').replace('\\', '')
-                        if self.is_valid_logo_url(clean_url):
-                            clean_urls.append(clean_url)
-                    except:
-                        continue
-                
+            if feedback.outcome == 'ok':
+                clean_urls = self.extract_bing_urls(response.text)
                 print(f"      🔍 Found {len(clean_urls)} Bing images")
                 return clean_urls
                 
@@ -175,6 +200,37 @@ class SmartLogoHunter:
             
         return []
     
+    def extract_duckduckgo_urls(self, html):
+        """Extract and clean image URLs from a DuckDuckGo results page"""
+        image_urls = re.findall(r'"image":"([^"]+)"', html)
+        
+        clean_urls = []
+        for url in image_urls[:10]:
+            try:
+                # Decode URL
+                clean_url = url.replace('\\', '')
+                if self.is_valid_logo_url(clean_url):
+                    clean_urls.append(clean_url)
+            except:
+                continue
+        
+        return clean_urls
+    
+    def extract_bing_urls(self, html):
+        """Extract and clean image URLs from a Bing results page"""
+        image_urls = re.findall(r'mediaurl":"([^"]+)"', html)
+        
+        clean_urls = []
+        for url in image_urls[:8]:
+            try:
+                clean_url = url.replace('\\u0026', '&').replace('\\', '')
+                if self.is_valid_logo_url(clean_url):
+                    clean_urls.append(clean_url)
+            except:
+                continue
+        
+        return clean_urls
+    
     def is_valid_logo_url(self, url):
         """Check if URL is valid for logo"""
         try:
@@ -200,174 +256,162 @@ class SmartLogoHunter:
         """Download and validate logo from URL"""
         try:
             headers = self.get_headers()
-            response = requests.get(url, headers=headers, timeout=8, stream=True)
-            response.raise_for_status()
+            response = self.session.get(url, headers=headers, timeout=8, stream=True)
             
-            # Check content type
+            # Check status and content type before reading any of the body
             content_type = response.headers.get('content-type', '').lower()
-            if not content_type.startswith('image/'):
+            if response.status_code != 200 or not content_type.startswith('image/'):
+                response.close()
                 return None
             
-            # Download content
-            content = response.content
-            if len(content) < 1000:  # 1KB minimum
+            # Stream the body under the byte ceiling, bailing out early on bad dimensions
+            content = read_image_stream(response, self.new_logo_reader())
+            if content is None:
+                return None
+            
+            return self.validate_logo_content(content, url)
+            
+        except Exception as e:
+            return None
+    
+    def new_logo_reader(self):
+        """Bounded reader enforcing the candidate size and dimension limits"""
+        return BoundedImageReader(self.max_logo_bytes, self.min_logo_dimensions, self.max_logo_dimensions)
+    
+    def validate_logo_content(self, content, url):
+        """Validate downloaded bytes from the header and build a small scoring proxy"""
+        try:
+            if len(content) < self.min_logo_bytes:
                 return None
             
-            if len(content) > 10 * 1024 * 1024:  # 10MB max
+            if len(content) > self.max_logo_bytes:
                 return None
             
-            # Validate with PIL
-            img = Image.open(io.BytesIO(content))
-            width, height = img.size
+            # Validate with PIL (header only)
+            width, height, img_format = read_header(content)
             
             # Size validation
-            if width < 30 or height < 30:
+            if width < self.min_logo_dimensions[0] or height < self.min_logo_dimensions[1]:
                 return None
             
-            if width > 3000 or height > 3000:
+            if width > self.max_logo_dimensions[0] or height > self.max_logo_dimensions[1]:
                 return None
             
-            # Convert to RGBA
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Resize if too large
-            if width > 800 or height > 800:
-                img.thumbnail((800, 800), Image.Resampling.LANCZOS)
+            # Scoring works on a reduced-size proxy; full decoding waits for the winner
+            logo = {
+                'data': content,
+                'width': width,
+                'height': height,
+                'format': img_format,
+                'proxy': open_proxy(content)
+            }
             
             print(f"        ✅ Valid logo: {width}x{height} from {url[:50]}...")
-            return img
+            return logo
             
         except Exception as e:
             return None
     
-    def calculate_logo_score(self, img, url_hint=""):
+    def calculate_logo_score(self, logo, url_hint=""):
         """Calculate logo quality score"""
-        score = 0
-        
         try:
-            width, height = img.size
-            
-            # Dimension scoring
-            if 50 <= width <= 500 and 50 <= height <= 500:
-                score += 25
-            elif 30 <= width <= 800 and 30 <= height <= 800:
-                score += 15
-            
-            # Aspect ratio (prefer reasonable logos)
-            ratio = max(width, height) / min(width, height)
-            if ratio <= 3:
-                score += 20
-            elif ratio <= 5:
-                score += 10
-            
-            # URL hints
-            url_lower = url_hint.lower()
-            if 'logo' in url_lower:
-                score += 25
-            if 'casino' in url_lower:
-                score += 15
-            if 'brand' in url_lower:
-                score += 12
-            if 'icon' in url_lower:
-                score += 18
-            
-            # File format bonus
-            if '.png' in url_lower:
-                score += 15
-            elif '.svg' in url_lower:
-                score += 10
-            elif '.webp' in url_lower:
-                score += 12
-            
+            # Dimensions as published (fitted into 800x800)
+            width, height = fit_within(logo['width'], logo['height'], 800)
+            likelihood = float(self.scorer.analyzer.analyze([logo['proxy']])[1][0])
+            return self.scorer.score_one(width, height, hint=url_hint, likelihood=likelihood)
         except:
-            score = 0
-            
-        return score
+            return 0
     
-    def save_logo(self, casino, img):
-        """Save the logo"""
+    def save_logo(self, casino, data, source=None, score=None, on_done=None):
+        """Decode the winning logo at full resolution and queue it for encoding"""
         try:
-            dest_path = os.path.join(self.logos_dir, f"{casino['slug']}.png")
-            img.save(dest_path, 'PNG', optimize=True)
-            
-            file_size = os.path.getsize(dest_path)
-            print(f"        💾 SAVED: {casino['slug']}.png ({file_size} bytes)")
+            img = decode_logo(data, 800)
+            self.encoder.submit(casino['slug'], img, source, score, on_done=on_done, optimize=True)
             return True
             
         except Exception as e:
             print(f"        ❌ Save error: {e}")
             return False
     
+    def offer_candidate(self, best, url, source, scope):
+        """Download, validate and score one candidate; `best` keeps it only if it wins"""
+        logo = self.download_and_validate_logo(url)
+        if not logo:
+            # Another source may return the same logo; let it try again
+            self.seen_urls.release(url, scope)
+            return
+        
+        self.seen_urls.add(url, scope)
+        score = self.calculate_logo_score(logo, url)
+        if score > 0:
+            best.offer(score, logo['data'], source=source)
+    
     def hunt_casino_logo(self, casino, index, total):
         """Hunt for a single casino logo using multiple strategies"""
         print(f"\n[{index}/{total}] 🏹 Hunting: {casino['brand']}")
         
-        best_img = None
-        best_score = 0
-        best_source = ""
-        
         brand = casino['brand']
         
-        # Strategy 1: Direct URL hunting
-        direct_urls = self.hunt_direct_logo_urls(casino)
-        for url in direct_urls:
-            img = self.download_and_validate_logo(url)
-            if img:
-                score = self.calculate_logo_score(img, url)
-                if score > best_score:
-                    best_img = img
-                    best_score = score
-                    best_source = f"Direct: {url}"
-        
-        # Strategy 2: DuckDuckGo search
-        if best_score < 50:  # If we don't have a great logo yet
-            query = f'"{brand}" casino logo png'
-            ddg_urls = self.hunt_duckduckgo_images(query)
-            for url in ddg_urls[:5]:
-                img = self.download_and_validate_logo(url)
-                if img:
-                    score = self.calculate_logo_score(img, url)
-                    if score > best_score:
-                        best_img = img
-                        best_score = score
-                        best_source = f"DuckDuckGo: {query}"
-        
-        time.sleep(1)  # Rate limiting
-        
-        # Strategy 3: Bing search
-        if best_score < 50:
-            query = f'{brand} casino official logo'
-            bing_urls = self.hunt_bing_images(query)
-            for url in bing_urls[:5]:
-                img = self.download_and_validate_logo(url)
-                if img:
-                    score = self.calculate_logo_score(img, url)
-                    if score > best_score:
-                        best_img = img
-                        best_score = score
-                        best_source = f"Bing: {query}"
+        # Only the leading candidate's compressed bytes are kept
+        with self.candidates.holder() as best:
+            # Strategy 1: Direct URL hunting
+            direct_urls = self.seen_urls.fresh(self.hunt_direct_logo_urls(casino), casino['slug'])
+            for url in direct_urls:
+                self.offer_candidate(best, url, f"Direct: {url}", casino['slug'])
+            
+            # Strategy 2: DuckDuckGo search
+            if best.best_score < 50:  # If we don't have a great logo yet
+                query = f'"{brand}" casino logo png'
+                ddg_urls = self.hunt_duckduckgo_images(query)
+                for url in self.seen_urls.fresh(ddg_urls, casino['slug'], limit=5):
+                    self.offer_candidate(best, url, f"DuckDuckGo: {query}", casino['slug'])
+            
+            # Strategy 3: Bing search
+            if best.best_score < 50:
+                query = f'{brand} casino official logo'
+                bing_urls = self.hunt_bing_images(query)
+                for url in self.seen_urls.fresh(bing_urls, casino['slug'], limit=5):
+                    self.offer_candidate(best, url, f"Bing: {query}", casino['slug'])
+            
+            best_score, best_logo, meta = best.best()
         
+        return self.record_hunt_result(casino, best_logo, best_score, meta.get('source', ''))
+    
+    def record_hunt_result(self, casino, best_logo, best_score, best_source):
+        """Queue the best logo found for a casino; the outcome is recorded once it is published"""
         # Save the best logo found
-        if best_img and best_score >= 20:  # Minimum threshold
-            if self.save_logo(casino, best_img):
-                self.stats['successful'] += 1
-                
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'status': 'HUNT_SUCCESS',
-                    'score': best_score,
-                    'source': best_source,
-                    'file': f"{casino['slug']}.png",
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
-                print(f"    🏆 HUNT SUCCESS: {brand} (score: {best_score})")
+        if best_logo and best_score >= 20:  # Minimum threshold
+            published = partial(self.record_hunt_outcome, casino, best_score=best_score, best_source=best_source)
+            if self.save_logo(casino, best_logo, best_source, best_score, published):
                 return True
         
-        # Failed to find suitable logo
-        self.stats['failed'] += 1
+        return self.record_hunt_outcome(casino, None, best_score, best_source)
+    
+    def record_hunt_outcome(self, casino, path, best_score, best_source):
+        """Record the published logo, or the casino's failure when path is None"""
+        brand = casino['brand']
+        
+        if path:
+            with self.stats_lock:
+                self.stats['successful'] += 1
+            
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'HUNT_SUCCESS',
+                'score': best_score,
+                'source': best_source,
+                'file': os.path.basename(path),
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            
+            print(f"    🏆 HUNT SUCCESS: {brand} (score: {best_score})")
+            return True
+        
+        # Failed to find (or publish) a suitable logo
+        with self.stats_lock:
+            self.stats['failed'] += 1
+        self.manifest.record_failure(casino['slug'], 'smart-logo-hunter')
         print(f"    ❌ HUNT FAILED: {brand}")
         
         self.results.append({
@@ -385,7 +429,7 @@ class SmartLogoHunter:
         print("🏹 STARTING SMART CASINO LOGO HUNT")
         print("=" * 45)
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             self.hunt_casino_logo(casino, i, len(self.casinos))
             
             # Progress report every 5 casinos
@@ -393,9 +437,171 @@ class SmartLogoHunter:
                 duration = int(time.time() - self.stats['start_time'])
                 success_rate = (self.stats['successful'] / i) * 100
                 print(f"\n🏹 Hunt Progress: {i}/{len(self.casinos)} | Success: {self.stats['successful']} ({success_rate:.1f}%) | Time: {duration}s\n")
+    
+    async def async_fetch_text(self, session, source, url, timeout=10):
+        """GET a search results page within the source's learned concurrency"""
+        async with self.search_limits.slot(source) as feedback:
+            async with session.get(url, headers=self.get_headers(),
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                text = await response.text() if response.status == 200 else ''
+                feedback.observe(response.status, text, response.headers.get('Retry-After'))
+        return text if feedback.outcome == 'ok' else None
+    
+    async def async_hunt_direct_logo_urls(self, session, throttle, casino):
+        """Probe all direct logo URL patterns over the shared session, within the per-host throttle"""
+        direct_urls = await self.prober.find_images_async(session, throttle, self.direct_logo_patterns(casino),
+                                                          self.get_headers())
+        for url in direct_urls:
+            print(f"        🎯 Direct hit: {url}")
+        
+        return direct_urls
+    
+    async def async_hunt_duckduckgo_images(self, session, query):
+        """DuckDuckGo image search without blocking other hunts"""
+        try:
+            print(f"    🦆 DuckDuckGo search: {query}")
+            search_url = f"https://duckduckgo.com/?q={quote_plus(query)}&t=h_&iax=images&ia=images"
+            html = await self.async_fetch_text(session, 'duckduckgo', search_url)
+            if html:
+                clean_urls = self.extract_duckduckgo_urls(html)
+                print(f"      🦆 Found {len(clean_urls)} DuckDuckGo images")
+                return clean_urls
+        except Exception as e:
+            print(f"      ❌ DuckDuckGo error: {e}")
+        
+        return []
+    
+    async def async_hunt_bing_images(self, session, query):
+        """Bing image search without blocking other hunts"""
+        try:
+            print(f"    🔍 Bing search: {query}")
+            search_url = f"https://www.bing.com/images/search?q={quote_plus(query)}&form=HDRSC2"
+            html = await self.async_fetch_text(session, 'bing', search_url)
+            if html:
+                clean_urls = self.extract_bing_urls(html)
+                print(f"      🔍 Found {len(clean_urls)} Bing images")
+                return clean_urls
+        except Exception as e:
+            print(f"      ❌ Bing error: {e}")
+        
+        return []
+    
+    async def async_download_and_validate_logo(self, session, throttle, url, best, order):
+        """Download a candidate concurrently, validate it off the event loop and stash its bytes in `best`"""
+        try:
+            async with throttle.slot(url):
+                async with session.get(url, headers=self.get_headers(),
+                                       timeout=aiohttp.ClientTimeout(total=8)) as response:
+                    if response.status != 200:
+                        return None
+                    
+                    content_type = response.headers.get('content-type', '').lower()
+                    if not content_type.startswith('image/'):
+                        return None
+                    
+                    content = await read_image_stream_async(response, self.new_logo_reader())
+            
+            if content is None:
+                return None
+            
+            logo = await asyncio.to_thread(self.validate_logo_content, content, url)
+            if logo:
+                # Only the scoring proxy stays on the heap; the bytes go to the budgeted pool
+                logo['candidate'] = await asyncio.to_thread(best.stash, logo.pop('data'), order)
+            return logo
             
-            # Respectful delay between hunts
-            time.sleep(random.uniform(2, 4))
+        except Exception:
+            return None
+    
+    async def async_hunt_casino_logo(self, session, throttle, casino, index, total):
+        """Hunt one casino with all three strategies fanned out in parallel"""
+        print(f"\n[{index}/{total}] 🏹 Hunting: {casino['brand']}")
+        
+        brand = casino['brand']
+        ddg_query = f'"{brand}" casino logo png'
+        bing_query = f'{brand} casino official logo'
+        
+        direct_urls, ddg_urls, bing_urls = await asyncio.gather(
+            self.async_hunt_direct_logo_urls(session, throttle, casino),
+            self.async_hunt_duckduckgo_images(session, ddg_query),
+            self.async_hunt_bing_images(session, bing_query)
+        )
+        
+        # Strategy order decides which source a URL returned by several is credited to
+        slug = casino['slug']
+        candidates = [(url, f"Direct: {url}") for url in self.seen_urls.fresh(direct_urls, slug)]
+        candidates += [(url, f"DuckDuckGo: {ddg_query}") for url in self.seen_urls.fresh(ddg_urls, slug, limit=5)]
+        candidates += [(url, f"Bing: {bing_query}") for url in self.seen_urls.fresh(bing_urls, slug, limit=5)]
+        
+        with self.candidates.holder() as best:
+            logos = await asyncio.gather(*(
+                self.async_download_and_validate_logo(session, throttle, url, best, order)
+                for order, (url, _) in enumerate(candidates)
+            ))
+            for (url, _), logo in zip(candidates, logos):
+                if logo:
+                    self.seen_urls.add(url, slug)
+                else:
+                    self.seen_urls.release(url, slug)
+            
+            # Analyse and score every valid candidate in one pass; ties keep the earliest candidate,
+            # and candidates keep strategy order, so ties resolve like the serial hunt
+            valid = [(url, source, logo) for (url, source), logo in zip(candidates, logos) if logo]
+            if valid:
+                _, likelihood = self.scorer.analyzer.analyze([logo['proxy'] for _, _, logo in valid])
+                rows = []
+                for i, (url, _, logo) in enumerate(valid):
+                    width, height = fit_within(logo['width'], logo['height'], 800)
+                    rows.append({'width': width, 'height': height, 'format': format_code(url),
+                                 'hints': hint_flags(url), 'likelihood': likelihood[i]})
+                scores = self.scorer.score(candidate_table(rows))
+                for (_, source, logo), score in zip(valid, scores):
+                    if score > 0:
+                        logo['candidate'].meta['source'] = source
+                        best.score(logo['candidate'], float(score))
+            
+            best_score, best_logo, meta = await asyncio.to_thread(best.best)
+        
+        return await asyncio.to_thread(self.record_hunt_result, casino, best_logo, int(best_score),
+                                       meta.get('source', ''))
+    
+    async def async_smart_hunt(self, concurrency, per_host):
+        """Hunt up to `concurrency` casinos at once over one shared connection pool"""
+        throttle = HostThrottle(per_host=per_host)
+        connector = aiohttp.TCPConnector(limit=concurrency * 4, limit_per_host=per_host, ttl_dns_cache=300)
+        total = len(self.casinos)
+        # Workers take the most urgent casino left whenever they free up
+        queue = enumerate(self.scheduler.queue(self.casinos), 1)
+        completed = 0
+        
+        async def worker():
+            nonlocal completed
+            for index, casino in queue:
+                try:
+                    await self.async_hunt_casino_logo(session, throttle, casino, index, total)
+                except Exception as e:
+                    print(f"    ❌ Hunt error for {casino['brand']}: {e}")
+                
+                completed += 1
+                if completed % 5 == 0:
+                    duration = int(time.time() - self.stats['start_time'])
+                    success_rate = (self.stats['successful'] / completed) * 100
+                    print(f"\n🏹 Hunt Progress: {completed}/{total} | Success: {self.stats['successful']} ({success_rate:.1f}%) | Time: {duration}s\n")
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+    
+    def run_async_hunt(self, concurrency=8, per_host=2):
+        """Run the smart logo hunt with many casinos in flight at once"""
+        if not AIOHTTP_AVAILABLE:
+            print("❌ aiohttp not installed. Run: pip install aiohttp")
+            return
+        
+        print("🏹 STARTING ASYNC SMART CASINO LOGO HUNT")
+        print("=" * 45)
+        print(f"⚡ Concurrency: {concurrency} casinos | {per_host} requests per host")
+        
+        asyncio.run(self.async_smart_hunt(concurrency, per_host))
     
     def generate_final_report(self):
         """Generate final hunting report"""
@@ -409,6 +615,7 @@ class SmartLogoHunter:
         print(f"🏹 Successful Hunts: {self.stats['successful']}")
         print(f"❌ Failed Hunts: {self.stats['failed']}")
         print(f"📈 Hunt Success Rate: {success_rate:.1f}%")
+        print(f"♻️  Duplicate Candidates Skipped: {self.seen_urls.stats['skipped']}")
         
         if self.stats['successful'] > 0:
             print(f"\n✅ SUCCESSFUL LOGO HUNTS:")
@@ -426,19 +633,15 @@ class SmartLogoHunter:
         
         # Save results
         try:
-            hunt_results = {
+            self.results.finish({
                 'hunt_stats': self.stats,
-                'hunt_results': self.results,
                 'hunt_session': {
                     'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                     'duration': duration,
                     'version': 'Smart Logo Hunter v1.0',
                     'success_rate': success_rate
                 }
-            }
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(hunt_results, f, indent=2, ensure_ascii=False)
+            })
             
             print(f"💾 Hunt results saved: {os.path.basename(self.results_file)}")
             
@@ -446,7 +649,21 @@ class SmartLogoHunter:
             print(f"⚠️  Save error: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Smart Casino Logo Hunter")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Hunt many casinos concurrently (requires aiohttp)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Casinos hunted at once in async mode")
+    parser.add_argument("--per-host", type=int, default=2, help="Max in-flight requests per host in async mode")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    
     hunter = SmartLogoHunter()
+    hunter.encoder.configure(args)
+    hunter.scheduler.configure(args)
+    cassette = Cassette.from_args(args, hunter)
     
     try:
         if not hunter.load_casinos():
@@ -455,7 +672,17 @@ def main():
         if not hunter.setup_dirs():
             return
         
-        hunter.run_smart_hunt()
+        if args.incremental:
+            hunter.casinos = hunter.manifest.pending(hunter.casinos, hunter.logos_dir, args.max_age_days, args.min_score)
+            hunter.stats['total'] = len(hunter.casinos)
+        
+        # One manifest write for the whole run instead of one per casino
+        with hunter.manifest.batch():
+            if args.use_async:
+                hunter.run_async_hunt(args.concurrency, args.per_host)
+            else:
+                hunter.run_smart_hunt()
+            hunter.encoder.drain()
         hunter.generate_final_report()
         
     except KeyboardInterrupt:
@@ -466,6 +693,15 @@ def main():
         print(f"\n💥 Hunt error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        hunter.encoder.close()
+        hunter.search_limits.close()
+        hunter.results.close()
+        hunter.prober.close()
+        hunter.session.close()
+        hunter.candidates.close()
+        if cassette:
+            cassette.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -5,15 +5,23 @@ Ultra Smart Casino Logo Finder 2025
 Simplified, bulletproof approach with maximum reliability
 """
 
+import argparse
 import json
 import os
 import shutil
+import threading
 import time
 import requests
-from PIL import Image
 import io
 import hashlib
 import glob
+from functools import partial
+
+from logo_pipeline import (
+    BatchLogoScorer, CasinoScheduler, EncodingStage, LogoManifest, LogoPublisher, ResultStream,
+    add_incremental_arguments, add_publishing_arguments, add_scheduling_arguments, candidate_table, decode_logo,
+    format_code, hint_flags, read_header, stream_path
+)
 
 # Import bing image downloader
 try:
@@ -30,8 +38,16 @@ class UltraSmartLogoFinder:
         self.temp_dir = os.path.join(self.project_root, 'temp-ultra-downloads')
         self.results_file = os.path.join(self.project_root, 'data', 'ultra-logo-results.json')
         
+        # Manifest of published logos, used for incremental refresh runs
+        self.manifest = LogoManifest(os.path.join(self.project_root, 'data', 'logo-manifest.json'))
+        self.publisher = LogoPublisher(self.logos_dir, os.path.join(self.project_root, 'data', 'casinos.json'))
+        self.encoder = EncodingStage(self.publisher, self.manifest, 'ultra-smart-logo-finder')
+        # Most visible broken logos first, see CasinoScheduler
+        self.scheduler = CasinoScheduler(self.publisher.casinos_file, self.logos_dir, self.manifest)
+        
         self.casinos = []
-        self.results = []
+        # Streamed to data/*-results.jsonl as each casino completes
+        self.results = ResultStream(stream_path(self.results_file), 'ultra-smart-logo-finder', 'ultra_results')
         
         # Quality settings
         self.min_file_size = 2000  # 2KB minimum
@@ -39,6 +55,9 @@ class UltraSmartLogoFinder:
         self.min_height = 50
         self.max_size = 2000
         
+        # Shared candidate ranking used by every finder
+        self.scorer = BatchLogoScorer()
+        
         self.stats = {
             'total_casinos': 0,
             'attempted': 0,
@@ -47,6 +66,8 @@ class UltraSmartLogoFinder:
             'logos_found': 0,
             'start_time': time.time()
         }
+        # Outcomes are also recorded from EncodingStage threads
+        self.stats_lock = threading.Lock()
         
     def load_casino_data(self):
         """Load casino data with error handling"""
@@ -171,8 +192,10 @@ class UltraSmartLogoFinder:
                 if self.ultra_validate_image(img_path):
                     quality_images.append(img_path)
             
-            # Sort by quality
-            quality_images.sort(key=self.ultra_quality_score, reverse=True)
+            # Rank by quality in one batch
+            if quality_images:
+                table = candidate_table(self.ultra_candidate_rows(quality_images))
+                quality_images = [quality_images[i] for i in self.scorer.rank(table)]
             
         except Exception as e:
             print(f"      ⚠️  Image processing error: {e}")
@@ -191,99 +214,101 @@ class UltraSmartLogoFinder:
                 print(f"        ❌ Too small: {os.path.basename(image_path)} ({file_size} bytes)")
                 return False
             
-            # Validate with PIL
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                if width < self.min_width or height < self.min_height:
-                    print(f"        ❌ Dimensions too small: {os.path.basename(image_path)} ({width}x{height})")
-                    return False
-                
-                # Check format
-                img_format = img.format if img.format else 'unknown'
-                
-                print(f"        ✅ Valid: {os.path.basename(image_path)} ({width}x{height}, {img_format}, {file_size} bytes)")
-                return True
+            # Validate with PIL (header only, no pixel decoding)
+            width, height, img_format = read_header(image_path)
+            
+            if width < self.min_width or height < self.min_height:
+                print(f"        ❌ Dimensions too small: {os.path.basename(image_path)} ({width}x{height})")
+                return False
+            
+            # Check format
+            img_format = img_format if img_format else 'unknown'
+            
+            print(f"        ✅ Valid: {os.path.basename(image_path)} ({width}x{height}, {img_format}, {file_size} bytes)")
+            return True
                 
         except Exception as e:
             print(f"        ❌ Invalid: {os.path.basename(image_path)} - {e}")
             return False
     
-    def ultra_quality_score(self, image_path):
-        """Calculate ultra quality score"""
-        score = 0
+    def ultra_candidate_row(self, image_path):
+        """Candidate metadata row for the batch scorer"""
+        row = {
+            'width': 0,
+            'height': 0,
+            'bytes': 0,
+            'format': format_code(os.path.splitext(image_path)[1]),
+            'hints': hint_flags(os.path.basename(image_path))
+        }
         
         try:
-            file_size = os.path.getsize(image_path)
-            filename = os.path.basename(image_path).lower()
-            
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # File size scoring
-                if 20000 < file_size < 300000:  # 20KB - 300KB sweet spot
-                    score += 25
-                elif file_size > 10000:
-                    score += 15
-                
-                # Dimensions scoring
-                if 100 <= width <= 600 and 100 <= height <= 600:
-                    score += 20
-                
-                # Aspect ratio (prefer square-ish logos)
-                ratio = max(width, height) / min(width, height)
-                if ratio <= 2.5:
-                    score += 15
-                
-                # Format preference
-                ext = os.path.splitext(image_path)[1].lower()
-                if ext == '.png':
-                    score += 20
-                elif ext in ['.jpg', '.jpeg']:
-                    score += 15
-                elif ext == '.webp':
-                    score += 18
-                
-                # Filename hints
-                if 'logo' in filename:
-                    score += 15
-                if 'casino' in filename:
-                    score += 10
-                if 'icon' in filename:
-                    score += 12
-                if 'brand' in filename:
-                    score += 8
-                
+            row['bytes'] = os.path.getsize(image_path)
+            row['width'], row['height'], _ = read_header(image_path)
         except:
-            score = 0
+            pass
             
-        return score
+        return row
+    
+    def ultra_candidate_rows(self, image_paths):
+        """Candidate rows with batch content analysis (logo likelihood)"""
+        rows = [self.ultra_candidate_row(path) for path in image_paths]
+        for row, likelihood in zip(rows, self.scorer.analyzer.analyze_files(image_paths)):
+            row['likelihood'] = likelihood
+        return rows
     
-    def ultra_save_logo(self, casino, image_path):
+    def ultra_quality_score(self, image_path):
+        """Calculate ultra quality score"""
+        table = candidate_table(self.ultra_candidate_rows([image_path]))
+        return int(self.scorer.score(table)[0])
+    
+    def ultra_save_logo(self, casino, image_path, source=None, score=None, on_done=None):
         """Save logo with ultra processing"""
         try:
-            destination = os.path.join(self.logos_dir, f"{casino['slug']}.png")
+            # Full decode happens only here, for the winning image (RGBA, max 800px)
+            img = decode_logo(image_path, 800)
             
-            with Image.open(image_path) as img:
-                # Convert to RGBA for PNG transparency
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                # Smart resize if needed
-                if img.width > 800 or img.height > 800:
-                    img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                
-                # Save as optimized PNG
-                img.save(destination, 'PNG', optimize=True, compress_level=6)
-                
-            file_size = os.path.getsize(destination)
-            print(f"        💾 ULTRA SAVED: {os.path.basename(destination)} ({file_size} bytes)")
+            # Encode as optimized PNG on the encoding stage
+            self.encoder.submit(casino['slug'], img, source, score, on_done=on_done, optimize=True, compress_level=6)
             return True
             
         except Exception as e:
             print(f"        ❌ Save error: {e}")
             return False
     
+    def record_ultra_outcome(self, casino, path, query=None, image=None, quality_score=None, queries=None):
+        """Record the published logo, or the casino's failure when path is None"""
+        if path:
+            with self.stats_lock:
+                self.stats['successful'] += 1
+                self.stats['logos_found'] += 1
+            
+            # Record ultra success
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'ULTRA_SUCCESS',
+                'query': query,
+                'logo_file': os.path.basename(path),
+                'source': os.path.basename(image),
+                'quality_score': quality_score,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            
+            print(f"    🏆 ULTRA SUCCESS: Perfect logo found for {casino['brand']}!")
+        else:
+            with self.stats_lock:
+                self.stats['failed'] += 1
+            self.manifest.record_failure(casino['slug'], 'ultra-smart-logo-finder')
+            print(f"    ❌ No ultra logo found for {casino['brand']}")
+            
+            self.results.append({
+                'slug': casino['slug'],
+                'brand': casino['brand'],
+                'status': 'FAILED',
+                'queries_tried': queries,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+    
     def ultra_cleanup(self):
         """Ultra-thorough cleanup"""
         try:
@@ -298,10 +323,11 @@ class UltraSmartLogoFinder:
         print("\n🚀 STARTING ULTRA-SMART LOGO SEARCH...")
         print("=" * 55)
         
-        for i, casino in enumerate(self.casinos, 1):
+        for i, casino in enumerate(self.scheduler.queue(self.casinos), 1):
             print(f"\n[{i}/{len(self.casinos)}] 🎯 ULTRA Processing: {casino['brand']}")
             
-            self.stats['attempted'] += 1
+            with self.stats_lock:
+                self.stats['attempted'] += 1
             success = False
             
             # Try ultra search queries
@@ -311,26 +337,13 @@ class UltraSmartLogoFinder:
                 images = self.ultra_download_images(query, limit=12)
                 
                 if images:
-                    # Try to save the best logo
+                    # Try to save the best logo; the outcome is recorded once it is published
                     for img in images[:3]:  # Try top 3 images
-                        if self.ultra_save_logo(casino, img):
+                        quality_score = self.ultra_quality_score(img)
+                        if self.ultra_save_logo(casino, img, query, quality_score,
+                                                partial(self.record_ultra_outcome, casino, query=query, image=img,
+                                                        quality_score=quality_score, queries=search_queries)):
                             success = True
-                            self.stats['successful'] += 1
-                            self.stats['logos_found'] += 1
-                            
-                            # Record ultra success
-                            self.results.append({
-                                'slug': casino['slug'],
-                                'brand': casino['brand'],
-                                'status': 'ULTRA_SUCCESS',
-                                'query': query,
-                                'logo_file': f"{casino['slug']}.png",
-                                'source': os.path.basename(img),
-                                'quality_score': self.ultra_quality_score(img),
-                                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                            })
-                            
-                            print(f"    🏆 ULTRA SUCCESS: Perfect logo found for {casino['brand']}!")
                             break
                     
                     if success:
@@ -341,16 +354,7 @@ class UltraSmartLogoFinder:
                 time.sleep(1)
             
             if not success:
-                self.stats['failed'] += 1
-                print(f"    ❌ No ultra logo found for {casino['brand']}")
-                
-                self.results.append({
-                    'slug': casino['slug'],
-                    'brand': casino['brand'],
-                    'status': 'FAILED',
-                    'queries_tried': search_queries,
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+                self.record_ultra_outcome(casino, None, queries=search_queries)
             
             # Progress update
             if i % 10 == 0:
@@ -413,19 +417,15 @@ class UltraSmartLogoFinder:
     def save_ultra_results(self):
         """Save ultra results"""
         try:
-            ultra_results = {
+            self.results.finish({
                 'ultra_stats': self.stats,
-                'ultra_results': self.results,
                 'ultra_session': {
                     'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                     'duration': time.time() - self.stats['start_time'],
                     'version': 'Ultra Smart Logo Finder v3.0',
                     'ultra_success_rate': (self.stats['successful'] / self.stats['total_casinos']) * 100 if self.stats['total_casinos'] > 0 else 0
                 }
-            }
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(ultra_results, f, indent=2, ensure_ascii=False)
+            })
                 
             print(f"💾 Ultra results saved to: {os.path.basename(self.results_file)}")
             
@@ -433,7 +433,15 @@ class UltraSmartLogoFinder:
             print(f"⚠️  Error saving ultra results: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Ultra Smart Casino Logo Finder")
+    add_incremental_arguments(parser)
+    add_publishing_arguments(parser)
+    add_scheduling_arguments(parser)
+    args = parser.parse_args()
+    
     finder = UltraSmartLogoFinder()
+    finder.encoder.configure(args)
+    finder.scheduler.configure(args)
     
     try:
         # Ultra initialization
@@ -443,8 +451,14 @@ def main():
         if not finder.setup_directories():
             return
             
-        # Run ultra search
-        finder.run_ultra_search()
+        if args.incremental:
+            finder.casinos = finder.manifest.pending(finder.casinos, finder.logos_dir, args.max_age_days, args.min_score)
+            finder.stats['total_casinos'] = len(finder.casinos)
+            
+        # Run ultra search, with one manifest write for the whole run
+        with finder.manifest.batch():
+            finder.run_ultra_search()
+            finder.encoder.drain()
         
         # Generate ultra report
         finder.generate_ultra_report()
@@ -460,6 +474,8 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        finder.encoder.close()
+        finder.results.close()
         finder.ultra_cleanup()
 
 if __name__ == '__main__':